@@ -0,0 +1,106 @@
+import atexit
+import threading
+from datetime import datetime
+
+from flask import has_request_context, session
+from pymongo.errors import BulkWriteError, ConnectionFailure, PyMongoError
+
+from extensions import mongo
+
+
+class ActivityBuffer:
+    """In-process buffer flushed to `activity` with batched insert_many.
+
+    Routes only append to a list; a background thread writes a batch when it
+    reaches ACTIVITY_BATCH_SIZE or every ACTIVITY_FLUSH_INTERVAL seconds, and
+    whatever is left is flushed when the worker exits.
+    """
+
+    def __init__(self):
+        self._items = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self.batch_size = 100
+        self.interval = 2.0
+        self.max_items = 10000
+        self.dropped = 0
+
+    def init_app(self, app):
+        self.batch_size = app.config.get("ACTIVITY_BATCH_SIZE", self.batch_size)
+        self.interval = app.config.get("ACTIVITY_FLUSH_INTERVAL", self.interval)
+        self.max_items = app.config.get("ACTIVITY_MAX_BUFFER", self.max_items)
+        atexit.register(self.flush)
+
+    def add(self, entry):
+        with self._lock:
+            if len(self._items) >= self.max_items:
+                # Database unreachable for a while; never grow without bound
+                self.dropped += 1
+                return
+            self._items.append(entry)
+            full = len(self._items) >= self.batch_size
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="activity-log", daemon=True)
+                self._thread.start()
+
+        if full:
+            self._wake.set()
+
+    def flush(self):
+        with self._lock:
+            items, self._items = self._items, []
+        if not items:
+            return
+
+        try:
+            mongo.db.activity.insert_many(items, ordered=False)
+        except ConnectionFailure as e:
+            # Failover or network blip: retry with the next flush. Entries
+            # keep the _id insert_many gave them, so any that did get in
+            # are rejected as duplicates then.
+            print("ACTIVITY FLUSH ERROR (will retry):", e)
+            self._requeue(items)
+        except BulkWriteError as e:
+            if any(err["code"] != 11000 for err in e.details["writeErrors"]):
+                print("ACTIVITY FLUSH ERROR:", e)
+        except PyMongoError as e:
+            print("ACTIVITY FLUSH ERROR:", e)
+
+    def _requeue(self, items):
+        with self._lock:
+            room = max(self.max_items - len(self._items), 0)
+            self.dropped += max(len(items) - room, 0)
+            self._items[:0] = items[:room]
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+
+buffer = ActivityBuffer()
+
+
+def log_activity(entity_type, entity_id, action, summary=None, refs=(), user_id=None):
+    """Record that `action` happened to an entity; never touches the database.
+
+    `refs` are related ids (client, project) whose timelines should also
+    show this entry.
+    """
+    if user_id is None and has_request_context():
+        user_id = session.get("user_id")
+    if user_id is None:
+        return
+
+    buffer.add({
+        "user_id": user_id,
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "action": action,
+        "summary": summary,
+        "refs": [ref for ref in refs if ref is not None],
+        "created_at": datetime.utcnow(),
+    })
@@ -0,0 +1,23 @@
+from flask import render_template, session, redirect, url_for
+from bson.objectid import ObjectId
+
+from repositories import activity as activity_repo
+from . import activity_bp
+
+
+@activity_bp.route("/activity")
+@activity_bp.route("/activity/<entity_type>/<entity_id>")
+def timeline(entity_type=None, entity_id=None):
+    if "user_id" not in session:
+        return redirect(url_for("auth.index"))
+
+    if entity_type:
+        entity_id = ObjectId(entity_id)
+
+    entries = activity_repo.timeline(session["user_id"], entity_type, entity_id)
+
+    return render_template(
+        "activity.html",
+        entries=entries,
+        entity_type=entity_type
+    )
@@ -1,14 +1,8 @@
-import os
 from datetime import datetime
 from flask import Flask
-from dotenv import load_dotenv
-import google.generativeai as genai
-
-if os.getenv("FLASK_ENV") != "production":
-    load_dotenv()
 
 from config import Config
-from extensions import mongo, oauth
+from extensions import end_read_session, mongo, oauth
 
 def create_app():
     app = Flask(__name__)
@@ -53,13 +47,19 @@ def create_app():
         }
 
     # EXTENSIONS 
-    mongo.init_app(app)
+    mongo.init_app(app, compressors=app.config["MONGO_COMPRESSORS"])
+    app.teardown_request(end_read_session)
     oauth.init_app(app)
 
-    # AI setup
-    genai.configure(api_key=app.config.get("GEMINI_API_KEY"))
+    # Fingerprinted static assets
+    import assets
+    assets.init_app(app)
+
+    # {% cache %} template fragments
+    import fragment_cache
+    fragment_cache.init_app(app)
 
-    # OAuth Setup 
+    # OAuth Setup (clients are built on first login, see LazyOAuth)
     oauth.register(
         name='github',
         client_id=app.config.get("GITHUB_CLIENT_ID"),
@@ -116,6 +116,44 @@ def create_app():
     from business import business_bp
     app.register_blueprint(business_bp)
 
+    # --- TIME TRACKING ---
+    from timesheets import timesheets_bp
+    app.register_blueprint(timesheets_bp)
+
+    # --- ACTIVITY LOG ---
+    from activity import activity_bp
+    from activity.log import buffer as activity_buffer
+    app.register_blueprint(activity_bp)
+    activity_buffer.init_app(app)
+
+    # --- ARCHIVE ---
+    from archive import archive_bp
+    app.register_blueprint(archive_bp)
+
+    # --- CAPACITY PLANNING ---
+    from capacity import capacity_bp
+    app.register_blueprint(capacity_bp)
+
+    # --- CALENDAR FEED ---
+    from ical import ical_bp
+    app.register_blueprint(ical_bp)
+
+    # --- BACKUP ---
+    from backup import backup_bp
+    app.register_blueprint(backup_bp)
+
+    # --- LIVE UPDATES (SSE) ---
+    from live import live_bp
+    app.register_blueprint(live_bp)
+
+    # --- PERIODIC JOBS ---
+    from scheduler import scheduler
+    scheduler.init_app(app)
+
+    # --- CLI COMMANDS ---
+    from commands import register_commands
+    register_commands(app)
+
     return app
 
 app = create_app()
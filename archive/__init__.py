@@ -0,0 +1,5 @@
+from flask import Blueprint
+
+archive_bp = Blueprint("archive", __name__)
+
+from . import routes
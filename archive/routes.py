@@ -0,0 +1,49 @@
+from flask import render_template, session, redirect, url_for, request
+from bson.objectid import ObjectId
+
+from versions import conditional
+from activity.log import log_activity
+from .store import restore_invoice, restore_project, search
+from . import archive_bp
+
+
+@archive_bp.route("/archive")
+@conditional("archive")
+def archive():
+    if "user_id" not in session:
+        return redirect(url_for("auth.index"))
+
+    q = request.args.get("q", "").strip()
+    projects, invoices = search(session["user_id"], q)
+
+    return render_template(
+        "archive.html",
+        projects=projects,
+        invoices=invoices,
+        q=q
+    )
+
+
+@archive_bp.route("/archive/projects/<project_id>/restore", methods=["POST"])
+def restore_archived_project(project_id):
+    if "user_id" not in session:
+        return redirect(url_for("auth.index"))
+
+    project = restore_project(session["user_id"], ObjectId(project_id))
+    if not project:
+        return redirect(url_for("archive.archive"))
+
+    log_activity("project", project["_id"], "restored", project["title"])
+    return redirect(url_for("projects.project_detail", project_id=project["_id"]))
+
+
+@archive_bp.route("/archive/invoices/<invoice_id>/restore", methods=["POST"])
+def restore_archived_invoice(invoice_id):
+    if "user_id" not in session:
+        return redirect(url_for("auth.index"))
+
+    invoice = restore_invoice(session["user_id"], ObjectId(invoice_id))
+    if invoice:
+        log_activity("invoice", invoice["_id"], "restored", invoice["invoice_number"])
+
+    return redirect(url_for("invoices.invoices"))
@@ -0,0 +1,178 @@
+import re
+from datetime import datetime, timedelta
+
+from pymongo.errors import BulkWriteError
+
+from extensions import mongo, read_db
+from versions import bump_versions
+
+
+# Completed projects (with their tasks) and paid invoices move from the hot
+# collections into projects_archive / tasks_archive / invoices_archive once
+# they are older than ARCHIVE_AFTER_DAYS. Documents keep their _id, so a
+# batch interrupted between copy and delete is simply redone on the next run.
+
+def _copy(target, docs):
+    if not docs:
+        return
+    try:
+        target.insert_many(docs, ordered=False)
+    except BulkWriteError as e:
+        # Already copied by an earlier, interrupted run
+        if any(err["code"] != 11000 for err in e.details["writeErrors"]):
+            raise
+
+
+def _older_than(field, cutoff):
+    # Records from before `field` was tracked fall back to created_at, and
+    # anything restored by hand stays live for another full period
+    return {
+        "$or": [
+            {field: {"$lt": cutoff}},
+            {field: {"$exists": False}, "created_at": {"$lt": cutoff}},
+        ],
+        "restored_at": {"$not": {"$gte": cutoff}},
+    }
+
+
+def archive_projects(days, batch_size=500):
+    db = mongo.db
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    query = {"status": "Completed", **_older_than("completed_at", cutoff)}
+    moved = 0
+
+    while True:
+        projects = list(db.projects.find(query).limit(batch_size))
+        if not projects:
+            return moved
+
+        now = datetime.utcnow()
+        # Task queries carry user_id, so they use the (user_id, project_id)
+        # index and stay on one shard
+        by_user = {}
+        for p in projects:
+            by_user.setdefault(p["user_id"], []).append(p["_id"])
+        tasks = [
+            task
+            for user_id, project_ids in by_user.items()
+            for task in db.tasks.find({"user_id": user_id, "project_id": {"$in": project_ids}})
+        ]
+
+        for doc in projects + tasks:
+            doc["archived_at"] = now
+
+        _copy(db.tasks_archive, tasks)
+        _copy(db.projects_archive, projects)
+        for user_id, project_ids in by_user.items():
+            db.tasks.delete_many({"user_id": user_id, "project_id": {"$in": project_ids}})
+        db.projects.delete_many({"_id": {"$in": [p["_id"] for p in projects]}})
+
+        for user_id in by_user:
+            bump_versions(user_id, "projects", "tasks", "archive")
+        moved += len(projects)
+
+
+def archive_invoices(days, batch_size=500):
+    db = mongo.db
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    query = {"status": "Paid", **_older_than("paid_at", cutoff)}
+    moved = 0
+
+    while True:
+        invoices = list(db.invoices.find(query).limit(batch_size))
+        if not invoices:
+            return moved
+
+        now = datetime.utcnow()
+        for doc in invoices:
+            doc["archived_at"] = now
+
+        _copy(db.invoices_archive, invoices)
+        db.invoices.delete_many({"_id": {"$in": [inv["_id"] for inv in invoices]}})
+
+        for user_id in {inv["user_id"] for inv in invoices}:
+            bump_versions(user_id, "invoices", "archive")
+        moved += len(invoices)
+
+
+def run_archival(days, batch_size=500):
+    return {
+        "projects": archive_projects(days, batch_size),
+        "invoices": archive_invoices(days, batch_size),
+    }
+
+
+# ---------- Restore ----------
+
+def restore_project(user_id, project_id):
+    db = mongo.db
+    project = db.projects_archive.find_one({"_id": project_id, "user_id": user_id})
+    if not project:
+        return None
+
+    tasks = list(db.tasks_archive.find({"project_id": project_id, "user_id": user_id}))
+    for doc in [project] + tasks:
+        doc.pop("archived_at", None)
+    project["restored_at"] = datetime.utcnow()
+
+    _copy(db.tasks, tasks)
+    _copy(db.projects, [project])
+    db.tasks_archive.delete_many({"project_id": project_id, "user_id": user_id})
+    db.projects_archive.delete_one({"_id": project_id, "user_id": user_id})
+
+    bump_versions(user_id, "projects", "tasks", "archive")
+    return project
+
+
+def restore_invoice(user_id, invoice_id):
+    db = mongo.db
+    invoice = db.invoices_archive.find_one({"_id": invoice_id, "user_id": user_id})
+    if not invoice:
+        return None
+
+    invoice.pop("archived_at", None)
+    invoice["restored_at"] = datetime.utcnow()
+    _copy(db.invoices, [invoice])
+    db.invoices_archive.delete_one({"_id": invoice_id, "user_id": user_id})
+
+    bump_versions(user_id, "invoices", "archive")
+    return invoice
+
+
+# ---------- Browse ----------
+
+def search(user_id, q=None, limit=100):
+    """Archived (projects, invoices) for the archive page, newest first."""
+    db = read_db()
+    project_query = {"user_id": user_id}
+    invoice_query = {"user_id": user_id}
+    if q:
+        pattern = {"$regex": re.escape(q), "$options": "i"}
+        project_query["$or"] = [{"title": pattern}, {"client_name": pattern}]
+        invoice_query["$or"] = [
+            {"invoice_number": pattern},
+            {"client_name": pattern},
+            {"project_title": pattern},
+        ]
+
+    projects = db.projects_archive.find(
+        project_query,
+        {"title": 1, "client_name": 1, "deadline": 1, "archived_at": 1}
+    ).sort("archived_at", -1).limit(limit)
+
+    invoices = db.invoices_archive.find(
+        invoice_query,
+        {"invoice_number": 1, "client_name": 1, "project_title": 1, "amount": 1, "archived_at": 1}
+    ).sort("archived_at", -1).limit(limit)
+
+    return projects, invoices
+
+
+def delete_for_client(user_id, client_id):
+    db = mongo.db
+    project_ids = [p["_id"] for p in db.projects_archive.find(
+        {"user_id": user_id, "client_id": client_id}, {"_id": 1}
+    )]
+    db.tasks_archive.delete_many({"user_id": user_id, "project_id": {"$in": project_ids}})
+    db.projects_archive.delete_many({"user_id": user_id, "client_id": client_id})
+    db.invoices_archive.delete_many({"user_id": user_id, "client_id": client_id})
@@ -0,0 +1,178 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import shutil
+
+from flask import current_app, request, send_from_directory, url_for
+
+
+DIST_DIR = "dist"
+MANIFEST_NAME = "manifest.json"
+FAR_FUTURE = "public, max-age=31536000, immutable"
+
+# Files served together on one page are bundled into a single request.
+# Everything else under static/css and static/js is fingerprinted one-to-one.
+BUNDLES = {
+    "js/invoices.bundle.js": ["js/invoice_project_filter.js", "js/invoices.js"],
+}
+
+_manifest = None
+
+
+# ---------- Minifiers ----------
+
+def minify_css(text):
+    text = re.sub(r"/\*.*?\*/", "", text, flags=re.S)
+    text = re.sub(r"\s+", " ", text)
+    text = re.sub(r"\s*([{};,>])\s*", r"\1", text)
+    text = re.sub(r":\s+", ":", text)
+    return text.replace(";}", "}").strip()
+
+
+def minify_js(text):
+    # Line based on purpose: keeps newlines so automatic semicolon insertion
+    # and string contents are never affected.
+    lines = []
+    in_comment = False
+    for line in text.splitlines():
+        stripped = line.strip()
+        # Block comments are only removed at the start of a line; whatever
+        # follows their closing */ is kept
+        while in_comment or stripped.startswith("/*"):
+            end = stripped.find("*/", 0 if in_comment else 2)
+            if end == -1:
+                in_comment, stripped = True, ""
+                break
+            in_comment, stripped = False, stripped[end + 2:].strip()
+        if not stripped or stripped.startswith("//"):
+            continue
+        lines.append(stripped)
+    return "\n".join(lines)
+
+
+MINIFIERS = {".css": minify_css, ".js": minify_js}
+
+
+# ---------- Build ----------
+
+def _read(static_folder, name):
+    with open(os.path.join(static_folder, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def _write_variants(dist, name, data):
+    path = os.path.join(dist, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with open(path, "wb") as f:
+        f.write(data)
+    with open(path + ".gz", "wb") as f:
+        f.write(gzip.compress(data, compresslevel=9, mtime=0))
+
+    import brotli
+    with open(path + ".br", "wb") as f:
+        f.write(brotli.compress(data, quality=11))
+
+
+def build_assets(static_folder):
+    """Minify, fingerprint and precompress static/css and static/js.
+
+    Writes static/dist/<name>.<hash>.<ext> with .gz and .br siblings and a
+    manifest mapping logical names (e.g. "css/login.css") to hashed ones.
+    """
+    dist = os.path.join(static_folder, DIST_DIR)
+    shutil.rmtree(dist, ignore_errors=True)
+
+    sources = {}
+    for folder in ("css", "js"):
+        for filename in sorted(os.listdir(os.path.join(static_folder, folder))):
+            if os.path.splitext(filename)[1] in MINIFIERS:
+                name = f"{folder}/{filename}"
+                sources[name] = [name]
+    sources.update(BUNDLES)
+
+    manifest = {}
+    stats = {"files": 0, "raw": 0, "min": 0, "gz": 0}
+
+    for name, parts in sources.items():
+        root, ext = os.path.splitext(name)
+        minify = MINIFIERS[ext]
+        raw = [_read(static_folder, part) for part in parts]
+        joiner = ";\n" if ext == ".js" else "\n"
+        data = joiner.join(minify(text) for text in raw).encode("utf-8")
+
+        digest = hashlib.sha256(data).hexdigest()[:10]
+        hashed = f"{root}.{digest}{ext}"
+        _write_variants(dist, hashed, data)
+        manifest[name] = f"{DIST_DIR}/{hashed}"
+
+        stats["files"] += 1
+        stats["raw"] += sum(len(text.encode("utf-8")) for text in raw)
+        stats["min"] += len(data)
+        stats["gz"] += os.path.getsize(os.path.join(dist, hashed + ".gz"))
+
+    with open(os.path.join(dist, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    return stats
+
+
+# ---------- Runtime ----------
+
+def load_manifest():
+    global _manifest
+    if _manifest is None:
+        path = os.path.join(current_app.static_folder, DIST_DIR, MANIFEST_NAME)
+        try:
+            with open(path, encoding="utf-8") as f:
+                _manifest = json.load(f)
+        except FileNotFoundError:
+            # Not built (local development): serve the source files as-is,
+            # and look again next time in case a build has run since
+            return {}
+    return _manifest
+
+
+def asset_url(filename, **values):
+    """Drop-in for url_for("static", filename=...) that prefers built assets."""
+    return url_for("static", filename=load_manifest().get(filename, filename), **values)
+
+
+def asset_urls(filename, **values):
+    """URLs to include for `filename`: the built file, or a bundle's sources."""
+    manifest = load_manifest()
+    if filename in manifest:
+        return [url_for("static", filename=manifest[filename], **values)]
+    return [url_for("static", filename=name, **values) for name in BUNDLES.get(filename, [filename])]
+
+
+def serve_dist(filename):
+    dist = os.path.join(current_app.static_folder, DIST_DIR)
+    mimetype = mimetypes.guess_type(filename)[0]
+
+    for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+        if request.accept_encodings[encoding] and os.path.isfile(
+            os.path.join(dist, filename + suffix)
+        ):
+            response = send_from_directory(dist, filename + suffix, mimetype=mimetype)
+            response.headers["Content-Encoding"] = encoding
+            break
+    else:
+        response = send_from_directory(dist, filename, mimetype=mimetype)
+
+    response.headers["Vary"] = "Accept-Encoding"
+    response.headers["Cache-Control"] = FAR_FUTURE
+    return response
+
+
+def init_app(app):
+    app.add_url_rule(
+        f"{app.static_url_path}/{DIST_DIR}/<path:filename>",
+        "dist_asset",
+        serve_dist
+    )
+    app.jinja_env.globals["asset_url"] = asset_url
+    app.jinja_env.globals["asset_urls"] = asset_urls
@@ -1,8 +1,10 @@
 from flask import render_template, session, redirect, url_for, request
-from bson.objectid import ObjectId
-from datetime import datetime
 
-from extensions import mongo, oauth
+from pymongo.errors import DuplicateKeyError
+
+from extensions import oauth
+from repositories import users as users_repo
+from versions import bump_versions, clear_versions
 from . import auth_bp
 
 
@@ -99,28 +101,23 @@ def handle_login(data):
     if not data or not data.get("oauth_id"):
         return oauth_error("Invalid login data received.")
 
-    try:
-        users = mongo.db.users
-    except Exception:
-        return oauth_error("Database connection error. Please try again.")
-
-    existing_user = None
-
-    if data.get("email"):
-        existing_user = users.find_one({"email": data["email"]})
+    # Matched by email when the provider shares it, so the same person can
+    # sign in with either provider, otherwise by provider identity. Both are
+    # unique indexes: a clash means this identity already has an account
+    # under another email (or a concurrent login just created it).
+    by_identity = {"provider": data["provider"], "oauth_id": data["oauth_id"]}
 
-    if not existing_user:
-        existing_user = users.find_one({
-            "oauth_id": data["oauth_id"],
-            "provider": data["provider"]
-        })
+    try:
+        user_id, previous = users_repo.upsert({"email": data["email"]} if data.get("email") else by_identity, data)
+    except DuplicateKeyError:
+        try:
+            user_id, previous = users_repo.upsert(by_identity, data)
+        except DuplicateKeyError:
+            return oauth_error("Could not sign you in. Please try again.")
 
-    if not existing_user:
-        user_id = users.insert_one(data).inserted_id
-        session["user_id"] = str(user_id)
-    else:
-        users.update_one({"_id": existing_user["_id"]}, {"$set": data})
-        session["user_id"] = str(existing_user["_id"])
+    session["user_id"] = str(user_id)
+    if previous and any(previous.get(key) != value for key, value in data.items()):
+        bump_versions(session["user_id"], "users")
 
     session["username"] = data["username"]
     session["avatar"] = data["avatar_url"]
@@ -150,12 +147,8 @@ def delete_account():
 
     user_id = session["user_id"]
 
-    # Delete in correct order
-    mongo.db.tasks.delete_many({"user_id": user_id})
-    mongo.db.projects.delete_many({"user_id": user_id})
-    mongo.db.clients.delete_many({"user_id": user_id})
-    mongo.db.invoices.delete_many({"user_id": user_id})
-    mongo.db.users.delete_one({"_id": ObjectId(user_id)})
+    users_repo.delete_with_data(user_id)
+    clear_versions(user_id)
 
     session.clear()
     return redirect(url_for("auth.index"))
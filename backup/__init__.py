@@ -0,0 +1,5 @@
+from flask import Blueprint
+
+backup_bp = Blueprint("backup", __name__)
+
+from . import routes
@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from flask import Response, session, redirect, url_for, request, stream_with_context
+
+from .store import iter_backup
+from . import backup_bp
+
+
+@backup_bp.route("/account/backup")
+def download_backup():
+    if "user_id" not in session:
+        return redirect(url_for("auth.index"))
+
+    # ?format=bson streams raw BSON, much cheaper for large accounts
+    format = "bson" if request.args.get("format") == "bson" else "json"
+    extension = "bson" if format == "bson" else "ndjson"
+
+    filename = f"studiobase-backup-{datetime.utcnow().strftime('%Y%m%d')}.{extension}.gz"
+    return Response(
+        stream_with_context(iter_backup(session["user_id"], format=format)),
+        mimetype="application/gzip",
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            "Cache-Control": "no-store",
+        }
+    )
@@ -0,0 +1,252 @@
+import gzip
+import hashlib
+import io
+import zlib
+from datetime import datetime
+
+import bson
+from bson import CodecOptions, json_util
+from bson.errors import InvalidBSON
+from bson.objectid import ObjectId
+from bson.raw_bson import RawBSONDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from extensions import mongo
+from versions import bump_versions
+
+
+# A backup is gzip-compressed NDJSON: one header line, then one line per
+# document as {"c": collection, "d": document} in MongoDB extended JSON.
+# Documents are read through cursors and compressed as they stream, so
+# memory stays flat however large the account is.
+#
+# The "bson" format holds the same header and records as concatenated BSON
+# documents instead. Documents are read as RawBSONDocument and copied into
+# the file as the server sent them, never decoded, which takes about a
+# quarter of the CPU (benchmarks/raw_bson_bench.py). Restore reads both.
+
+FORMAT_VERSION = 1
+
+RAW_BSON = CodecOptions(document_class=RawBSONDocument)
+
+# Everything scoped by user_id, in restore order. Running timers and
+# data_versions are transient and rebuilt as the account is used.
+COLLECTIONS = [
+    "business_profile",
+    "leads",
+    "prospects",
+    "clients",
+    "projects",
+    "tasks",
+    "invoices",
+    "projects_archive",
+    "tasks_archive",
+    "invoices_archive",
+    "time_buckets",
+    "time_rollups",
+    "activity",
+]
+
+VERSIONED = [
+    "users", "business_profile", "leads", "prospects", "clients", "projects",
+    "tasks", "invoices", "archive", "time",
+]
+
+
+def _json_line(record):
+    return (json_util.dumps(record, json_options=json_util.RELAXED_JSON_OPTIONS) + "\n").encode("utf-8")
+
+
+ENCODERS = {
+    "json": _json_line,
+    "bson": bson.encode,
+}
+
+
+def iter_backup(user_id, batch_size=1000, format="json"):
+    """Yield the gzip-compressed backup of one account in chunks."""
+    encode = ENCODERS[format]
+    db = mongo.db
+    if format == "bson":
+        db = db.with_options(codec_options=RAW_BSON)
+    gz = zlib.compressobj(6, zlib.DEFLATED, 31)
+
+    def records():
+        yield encode({
+            "format": "studiobase-backup",
+            "version": FORMAT_VERSION,
+            "user_id": user_id,
+            "created_at": datetime.utcnow(),
+        })
+
+        for doc in db.users.find({"_id": ObjectId(user_id)}):
+            yield encode({"c": "users", "d": doc})
+
+        for name in COLLECTIONS:
+            cursor = db[name].find({"user_id": user_id}).sort("_id", 1).batch_size(batch_size)
+            for doc in cursor:
+                yield encode({"c": name, "d": doc})
+
+    buf = []
+    size = 0
+    for record in records():
+        buf.append(record)
+        size += len(record)
+        if size >= 64 * 1024:
+            chunk = gz.compress(b"".join(buf))
+            buf, size = [], 0
+            if chunk:
+                yield chunk
+
+    yield gz.compress(b"".join(buf)) + gz.flush()
+
+
+# ---------- Restore ----------
+
+class IdMap:
+    """Deterministic ObjectId remapping that needs no lookup table.
+
+    The new id keeps the old id's timestamp (so ordering and generation_time
+    survive) and replaces the rest with a keyed hash of the old id. Every
+    reference to a document is rewritten the same way as the document's own
+    _id, and re-running the same restore produces the same ids. Restoring
+    into the account the backup came from keeps the original ids, so only
+    documents missing since the backup are re-inserted.
+    """
+
+    def __init__(self, old_user_id, new_user_id):
+        self.key = f"{old_user_id}:{new_user_id}".encode("utf-8")
+        self.old_user_id = old_user_id
+        self.new_user_id = new_user_id
+
+    def oid(self, old):
+        if self.old_user_id == self.new_user_id:
+            return old
+        if str(old) == self.old_user_id:
+            return ObjectId(self.new_user_id)
+        digest = hashlib.blake2b(old.binary, key=self.key, digest_size=8).digest()
+        return ObjectId(old.binary[:4] + digest)
+
+    def apply(self, value):
+        if isinstance(value, ObjectId):
+            return self.oid(value)
+        if isinstance(value, dict):
+            return {
+                k: self.new_user_id if k == "user_id" else self.apply(v)
+                for k, v in value.items()
+            }
+        if isinstance(value, list):
+            return [self.apply(v) for v in value]
+        return value
+
+
+def _insert(collection, docs):
+    try:
+        collection.insert_many(docs, ordered=False)
+    except BulkWriteError as e:
+        # Already imported by an earlier run of the same restore
+        if any(err["code"] != 11000 for err in e.details["writeErrors"]):
+            raise
+        return e.details["nInserted"]
+    return len(docs)
+
+
+def restore_backup(path, user_id=None, batch_size=1000):
+    """Import a backup file, remapping every ObjectId.
+
+    Restores into `user_id` when given, otherwise into the account with the
+    same email or OAuth identity, otherwise into a newly created account.
+    """
+    db = mongo.db
+    counts = {}
+
+    with gzip.open(path, "rb") as f:
+        records = _read_records(f)
+        try:
+            header = next(records, {})
+        except (ValueError, InvalidBSON):
+            header = {}
+        if header.get("format") != "studiobase-backup" or header.get("version") != FORMAT_VERSION:
+            raise ValueError("Not a StudioBase backup file.")
+
+        ids = None
+        batch = []
+        current = None
+
+        def flush():
+            if batch:
+                counts[current] = counts.get(current, 0) + _insert(db[current], batch)
+                batch.clear()
+
+        for record in records:
+            name, doc = record["c"], record["d"]
+
+            if name == "users":
+                user_id = user_id or _target_user(db, doc)
+                ids = IdMap(header["user_id"], user_id)
+                if not db.users.find_one({"_id": ObjectId(user_id)}, {"_id": 1}):
+                    counts["users"] = _insert_user(db, ids.apply(doc))
+                continue
+
+            if name not in COLLECTIONS:
+                continue
+            if ids is None:
+                raise ValueError("Backup file has no account record.")
+
+            if name == "business_profile":
+                # One per account; an existing profile is kept
+                result = db.business_profile.update_one(
+                    {"user_id": user_id}, {"$setOnInsert": ids.apply(doc)}, upsert=True
+                )
+                counts[name] = counts.get(name, 0) + int(result.upserted_id is not None)
+                continue
+
+            if name != current:
+                flush()
+                current = name
+            batch.append(ids.apply(doc))
+            if len(batch) >= batch_size:
+                flush()
+        flush()
+
+    bump_versions(user_id, *VERSIONED)
+    return user_id, counts
+
+
+def _read_records(f):
+    # NDJSON starts with '{"'; the BSON header is short, so its
+    # little-endian length never has '"' as its second byte
+    if f.peek(2)[:2] == b'{"':
+        return (json_util.loads(line) for line in io.TextIOWrapper(f, encoding="utf-8"))
+    return bson.decode_file_iter(f)
+
+
+def _identity(doc):
+    # Matched like a login (auth/routes.py): by email when known, or by
+    # provider identity
+    query = [{"provider": doc.get("provider"), "oauth_id": doc.get("oauth_id")}]
+    if doc.get("email"):
+        query.append({"email": doc["email"]})
+    return {"$or": query}
+
+
+def _target_user(db, doc):
+    existing = db.users.find_one(_identity(doc), {"_id": 1})
+    if existing:
+        return str(existing["_id"])
+    return str(ObjectId())
+
+
+def _insert_user(db, doc):
+    # The feed token is the old account's secret (and unique); a new one
+    # can be made on the calendar page
+    doc.pop("calendar_token", None)
+    try:
+        db.users.insert_one(doc)
+    except DuplicateKeyError:
+        owner = db.users.find_one(_identity(doc), {"_id": 1}) or {}
+        raise ValueError(
+            f"The backup's email or login already belongs to account {owner.get('_id')}; "
+            "restore into that account instead."
+        )
+    return 1
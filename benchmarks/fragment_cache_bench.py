@@ -0,0 +1,84 @@
+"""Render-time benchmark for the {% cache %} fragment tag.
+
+    python benchmarks/fragment_cache_bench.py [rows]
+
+Renders invoices.html and invoice_view.html from in-memory data (no Mongo
+round trips) with the fragment cache disabled, cold and warm.
+"""
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017/studiobase")
+
+from bson.objectid import ObjectId
+from flask import g, render_template, session
+
+from app import app
+
+
+def make_invoices(rows):
+    return [{
+        "_id": ObjectId(),
+        "invoice_number": f"INV-20260101-{i:04d}",
+        "client_name": f"Client {i % 40}",
+        "project_title": f"Project {i % 90}",
+        "amount": 1000 + i * 3.5,
+        "due_date": "2026-02-01",
+        "payment_mode": "UPI",
+        "status": "Paid" if i % 3 else "Unpaid",
+        "created_at": datetime(2026, 1, 1),
+    } for i in range(rows)]
+
+
+def timed(render, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        render()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    invoices = make_invoices(rows)
+    cache = app.jinja_env.fragment_cache
+
+    with app.test_request_context("/invoices"):
+        session["user_id"] = str(ObjectId())
+        g.data_versions = {"invoices": 1, "business_profile": 1, "users": 1}
+
+        pages = {
+            f"invoices.html ({rows} rows)": lambda: render_template(
+                "invoices.html", invoices=invoices, clients=[], projects=[]
+            ),
+            "invoice_view.html": lambda: render_template(
+                "invoice_view.html", invoice=invoices[0], user={}, business={}
+            ),
+        }
+
+        for name, render in pages.items():
+            render()  # compile the template outside the timings
+
+            app.config["FRAGMENT_CACHE_ENABLED"] = False
+            uncached = timed(render, 20)
+
+            app.config["FRAGMENT_CACHE_ENABLED"] = True
+            cache.clear()
+            cold = timed(render, 1)
+            warm = timed(render, 20)
+
+            # A write bumps the version: outer fragments miss, unchanged rows hit
+            g.data_versions = {name: v + 1 for name, v in g.data_versions.items()}
+            after_write = timed(render, 1)
+
+            print(f"{name}")
+            print(f"  no cache:    {uncached:8.2f} ms")
+            print(f"  cold:        {cold:8.2f} ms")
+            print(f"  warm:        {warm:8.2f} ms  ({uncached / warm:.1f}x faster)")
+            print(f"  after write: {after_write:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Raw-BSON and wire compression benchmark, per 10k rows.
+
+    python benchmarks/raw_bson_bench.py [rows]
+
+Works on an in-memory reply batch (no Mongo round trips): the invoice list
+rows as the server sends them, decoded the way a cursor hands them out.
+
+  list page  render the rows with a Jinja loop, decoded to dicts (what
+             pymongo does) or kept as RawBSONDocument until accessed
+  export     backup records as extended JSON (format="json") or copied
+             as raw BSON (format="bson"), gzip included
+  wire       size of the reply batch and the CPU to compress and
+             decompress it with each compressor installed
+"""
+import os
+import sys
+import time
+import tracemalloc
+import zlib
+from collections import deque
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bson
+from bson.objectid import ObjectId
+from jinja2 import Environment
+
+from backup.store import ENCODERS, RAW_BSON
+
+ROW = Environment().from_string(
+    "{% for i in invoices %}<tr><td>{{ i.invoice_number }}</td><td>{{ i.client_name }}</td>"
+    "<td>{{ i.project_title }}</td><td>{{ i.amount }}</td><td>{{ i.due_date }}</td>"
+    "<td>{{ i.payment_mode }}</td><td>{{ i.status }}</td><td>{{ i.last_reminded_at }}</td></tr>{% endfor %}"
+)
+
+
+def make_batch(count):
+    now = datetime(2026, 1, 1)
+    return b"".join(bson.encode({
+        "_id": ObjectId(),
+        "invoice_number": f"INV-20260101-{i:04x}",
+        "client_name": f"Client {i % 300}",
+        "project_title": f"Website build {i % 900}",
+        "amount": 1000.0 + i,
+        "due_date": (now + timedelta(days=i % 90)).strftime("%Y-%m-%d"),
+        "payment_mode": "UPI",
+        "status": "Unpaid" if i % 3 else "Paid",
+        "last_reminded_at": now,
+    }) for i in range(count))
+
+
+def cursor(batch, codec_options=None):
+    # A cursor decodes its whole batch, then pops documents one at a time
+    docs = deque(bson.decode_all(batch, codec_options) if codec_options else bson.decode_all(batch))
+    while docs:
+        yield docs.popleft()
+
+
+def measure(fn, repeat=5):
+    fn()
+    start = time.process_time()
+    for _ in range(repeat):
+        fn()
+    cpu = (time.process_time() - start) / repeat * 1000
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return cpu, peak / 1024
+
+
+def export(batch, format, codec_options=None):
+    encode = ENCODERS[format]
+    gz = zlib.compressobj(6, zlib.DEFLATED, 31)
+    size = 0
+    for doc in cursor(batch, codec_options):
+        size += len(gz.compress(encode({"c": "invoices", "d": doc})))
+    return size + len(gz.flush())
+
+
+def compressors():
+    found = {"zlib": (lambda b: zlib.compress(b, 6), zlib.decompress)}
+    try:
+        import zstandard
+        found["zstd"] = (zstandard.ZstdCompressor().compress, zstandard.ZstdDecompressor().decompress)
+    except ImportError:
+        pass
+    try:
+        import snappy
+        found["snappy"] = (snappy.compress, snappy.decompress)
+    except ImportError:
+        pass
+    return found
+
+
+def report(name, base, fast, scale):
+    print(
+        f"{name:11} {base[0] * scale:7.1f} ms {base[1] * scale:8.0f} KiB   ->  "
+        f"{fast[0] * scale:7.1f} ms {fast[1] * scale:8.0f} KiB"
+    )
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    scale = 10000 / rows
+    batch = make_batch(rows)
+    print(f"{rows} invoice rows, {len(batch) / rows:.0f} bytes each; figures per 10k rows")
+    print(f"{'':11} {'dicts / json':>23}       {'raw BSON':>21}")
+
+    report(
+        "list page",
+        measure(lambda: ROW.render(invoices=cursor(batch))),
+        measure(lambda: ROW.render(invoices=cursor(batch, RAW_BSON))),
+        scale,
+    )
+    report(
+        "export",
+        measure(lambda: export(batch, "json")),
+        measure(lambda: export(batch, "bson", RAW_BSON)),
+        scale,
+    )
+    print(f"{'':11} backup size {export(batch, 'json') * scale / 1024:.0f} KiB (json) "
+          f"{export(batch, 'bson', RAW_BSON) * scale / 1024:.0f} KiB (bson)")
+
+    print(f"\nwire       {len(batch) * scale / 1024:7.0f} KiB uncompressed")
+    for name, (compress, decompress) in compressors().items():
+        packed = compress(batch)
+        cpu = measure(lambda: decompress(compress(batch)))[0]
+        print(f"{name:11}{len(packed) * scale / 1024:7.0f} KiB  {cpu * scale:6.1f} ms to compress + decompress")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Worker startup benchmark and regression gate.
+
+    python benchmarks/startup_bench.py [--runs 5] [--max-ms 600]
+
+Each run starts a fresh interpreter (as a gunicorn worker would), imports
+`app` and serves the first request. Fails when the median boot-to-first-
+request time exceeds --max-ms, or when a deferred integration (Gemini SDK,
+Authlib) gets imported eagerly again. Also prints the slowest imports from
+`python -X importtime`.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFERRED = ["google.generativeai", "authlib", "numpy"]
+
+BOOT = """
+import sys, time
+start = time.perf_counter()
+import app
+app.app.test_client().get("/")
+elapsed = (time.perf_counter() - start) * 1000
+eager = [m for m in {deferred!r} if m in sys.modules]
+print(f"{{elapsed:.1f}} {{','.join(eager)}}")
+"""
+
+
+def run(args, env):
+    return subprocess.run(
+        [sys.executable] + args, cwd=ROOT, env=env,
+        capture_output=True, text=True, check=True
+    )
+
+
+def slowest_imports(env, limit):
+    stderr = run(["-X", "importtime", "-c", "import app"], env).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        rows.append((int(cumulative), name.strip()))
+    top_level = [row for row in rows if "." not in row[1]]
+    return sorted(top_level, reverse=True)[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=600)
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault("MONGO_URI", "mongodb://localhost:27017/studiobase")
+    env["PYTHONWARNINGS"] = "ignore"
+
+    timings = []
+    eager = set()
+    for _ in range(args.runs):
+        elapsed, _, modules = run(
+            ["-c", BOOT.format(deferred=DEFERRED)], env
+        ).stdout.strip().partition(" ")
+        timings.append(float(elapsed))
+        eager.update(m for m in modules.split(",") if m)
+
+    median = statistics.median(timings)
+    print(f"boot -> first request: median {median:.1f} ms "
+          f"(min {min(timings):.1f}, max {max(timings):.1f}, runs {args.runs})")
+
+    print("slowest top-level imports (cumulative):")
+    for cumulative, name in slowest_imports(env, 8):
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    failed = False
+    if eager:
+        print(f"FAIL: imported at startup but should be deferred: {', '.join(sorted(eager))}")
+        failed = True
+    if median > args.max_ms:
+        print(f"FAIL: median {median:.1f} ms exceeds budget of {args.max_ms:.0f} ms")
+        failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
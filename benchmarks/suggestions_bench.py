@@ -0,0 +1,56 @@
+"""Lookup benchmark for task suggestions (projects/suggestions.py).
+
+    python benchmarks/suggestions_bench.py [projects]
+
+Ranks a query against synthetic completed projects in memory (no Mongo
+round trips), as suggest_tasks does once their terms are loaded.
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from projects.suggestions import hash_terms, project_terms, rank
+
+WORDS = (
+    "website redesign landing page shopify store mobile app ios android api "
+    "integration dashboard analytics seo audit brand identity logo wordpress "
+    "migration payment gateway booking system crm newsletter campaign react "
+    "backend admin panel inventory checkout blog content strategy photography"
+).split()
+
+
+def make_terms(count, rng):
+    return [
+        np.frombuffer(project_terms(
+            " ".join(rng.sample(WORDS, 3)),
+            " ".join(rng.choice(WORDS) for _ in range(rng.randint(10, 60)))
+        ), dtype=np.uint16)
+        for _ in range(count)
+    ]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    rng = random.Random(42)
+    docs = make_terms(count, rng)
+    query = hash_terms("Shopify store redesign with payment gateway and booking system integration")
+
+    rank(query, docs)
+    repeat = 50
+    start = time.perf_counter()
+    for _ in range(repeat):
+        top = rank(query, docs)
+    elapsed = (time.perf_counter() - start) / repeat * 1000
+
+    stored = sum(d.nbytes for d in docs)
+    print(f"{count} projects, {stored / count:.0f} bytes of terms each")
+    print(f"top-{len(top)} lookup: {elapsed:.2f} ms  scores {[round(s, 2) for _, s in top]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,35 +1,27 @@
 from flask import render_template, session, redirect, url_for, request
-from datetime import datetime
-from extensions import mongo
+from repositories import business_profile as business_repo
+from versions import bump_versions, conditional
+from activity.log import log_activity
 from . import business_bp
 
 @business_bp.route("/business", methods=["GET", "POST"])
+@conditional("business_profile")
 def business_profile():
     if "user_id" not in session:
         return redirect(url_for("auth.index"))
 
-    profile = mongo.db.business_profile.find_one({
-        "user_id": session["user_id"]
-    })
+    profile = business_repo.get(session["user_id"])
 
     if request.method == "POST":
-        data = {
-            "user_id": session["user_id"],
+        profile_id = business_repo.save(session["user_id"], {
             "business_name": request.form.get("business_name"),
             "address": request.form.get("address"),
             "phone": request.form.get("phone"),
-            "gstin": request.form.get("gstin"),
-            "created_at": datetime.utcnow()
-        }
-
-        if profile:
-            mongo.db.business_profile.update_one(
-                {"_id": profile["_id"]},
-                {"$set": data}
-            )
-        else:
-            mongo.db.business_profile.insert_one(data)
+            "gstin": request.form.get("gstin")
+        })
 
+        bump_versions(session["user_id"], "business_profile")
+        log_activity("business_profile", profile_id, "updated")
         return redirect(url_for("invoices.invoices"))
 
     return render_template(
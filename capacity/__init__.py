@@ -0,0 +1,5 @@
+from flask import Blueprint
+
+capacity_bp = Blueprint("capacity", __name__)
+
+from . import routes
@@ -0,0 +1,85 @@
+from datetime import timedelta
+
+
+# Workload planning across every active project. Each project's remaining
+# pending task hours are spread evenly over the working days (Mon-Fri) from
+# today through its deadline, then summed per ISO week into a projects x
+# weeks array. Weeks whose total exceeds the studio's weekly capacity are
+# overloaded, and a project is at risk when it is overdue, needs more than
+# a full day's capacity per working day on its own, or has work in an
+# overloaded week. Work that is already overdue all lands today. NumPy is
+# imported on the first plan rather than when the blueprint loads.
+
+WORKDAYS_PER_WEEK = 5
+
+
+def plan(projects, pending_hours, today, capacity, weeks=12):
+    """Weekly load for `projects` (dicts with _id, deadline) over `weeks`.
+
+    `pending_hours` maps project ids to their remaining pending hours.
+    Projects with no pending work are left out; those without a deadline
+    are listed as unscheduled.
+    """
+    import numpy as np
+
+    monday = today - timedelta(days=today.weekday())
+    edges = np.datetime64(monday, "D") + np.arange(weeks + 1) * 7
+    today = np.datetime64(today, "D")
+
+    pending = [p for p in projects if pending_hours.get(p["_id"], 0) > 0]
+    scheduled = [p for p in pending if p.get("deadline")]
+    unscheduled = [dict(p, hours=pending_hours[p["_id"]]) for p in pending if not p.get("deadline")]
+
+    hours = np.array([pending_hours[p["_id"]] for p in scheduled], dtype=float)
+    deadlines = np.array([p["deadline"] for p in scheduled], dtype="datetime64[D]")
+    end = np.maximum(deadlines, today) + 1
+
+    # Working days left to each deadline, and how many fall in each week
+    workdays = np.busday_count(today, end)
+    lo = np.broadcast_to(np.maximum(edges[:-1], today), (len(scheduled), weeks))
+    hi = np.minimum(edges[1:], end[:, None])
+    overlap = np.maximum(np.busday_count(lo, hi), 0).astype(float)
+
+    # Due on a weekend with no working day left: it all lands this week
+    none_left = workdays == 0
+    overlap[none_left] = 0
+    overlap[none_left, 0] = 1
+    workdays = np.maximum(workdays, 1)
+
+    load = hours[:, None] * overlap / workdays[:, None]
+    totals = load.sum(axis=0)
+    overloaded = totals > capacity
+
+    overdue = deadlines < today
+    too_fast = hours / workdays > capacity / WORKDAYS_PER_WEEK
+    crowded = ((load > 0) & overloaded).any(axis=1)
+    at_risk = overdue | too_fast | crowded
+
+    rows = []
+    for i, project in enumerate(scheduled):
+        reason = None
+        if overdue[i]:
+            reason = "Overdue"
+        elif too_fast[i]:
+            reason = f"Needs {hours[i] / workdays[i]:.1f} hrs/day"
+        elif crowded[i]:
+            reason = "In an overloaded week"
+        rows.append(dict(
+            project,
+            hours=float(hours[i]),
+            load=load[i].round(1).tolist(),
+            # Hours due after the last week shown
+            later=float(hours[i] - load[i].sum()),
+            at_risk=bool(at_risk[i]),
+            reason=reason,
+        ))
+    rows.sort(key=lambda row: (not row["at_risk"], row["deadline"]))
+
+    return {
+        "weeks": [week.item() for week in edges[:-1]],
+        "rows": rows,
+        "totals": totals.round(1).tolist(),
+        "overloaded": overloaded.tolist(),
+        "capacity": capacity,
+        "unscheduled": unscheduled,
+    }
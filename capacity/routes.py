@@ -0,0 +1,41 @@
+from flask import current_app, render_template, session, redirect, url_for, request
+from datetime import datetime
+
+from repositories import projects as projects_repo, tasks as tasks_repo, users as users_repo
+from versions import bump_versions, conditional, data_version
+from fragment_cache import current_cache
+from .planner import plan
+from . import capacity_bp
+
+
+@capacity_bp.route("/capacity", methods=["GET", "POST"])
+@conditional("projects", "tasks", "users")
+def capacity():
+    if "user_id" not in session:
+        return redirect(url_for("auth.index"))
+
+    if request.method == "POST":
+        hours = float(request.form.get("weekly_capacity") or 0)
+        if hours > 0:
+            users_repo.set_weekly_capacity(session["user_id"], hours)
+            bump_versions(session["user_id"], "users")
+        return redirect(url_for("capacity.capacity"))
+
+    # Only recomputed when projects, tasks or the capacity change (or the
+    # day rolls over); task writes bump those versions
+    today = datetime.utcnow().date()
+    cache = current_cache()
+    key = f"capacity:{session['user_id']}:{data_version('projects', 'tasks', 'users')}:{today}"
+    workload = cache.get(key) if cache is not None else None
+    if workload is None:
+        workload = plan(
+            list(projects_repo.list_active(session["user_id"])),
+            tasks_repo.pending_hours(session["user_id"]),
+            today,
+            users_repo.weekly_capacity(session["user_id"], current_app.config["CAPACITY_WEEKLY_HOURS"]),
+            weeks=current_app.config["CAPACITY_WEEKS"]
+        )
+        if cache is not None:
+            cache.set(key, workload)
+
+    return render_template("capacity.html", plan=workload)
@@ -2,34 +2,50 @@ from flask import render_template, session, redirect, url_for, request
 from bson.objectid import ObjectId
 from datetime import datetime
 
-from extensions import mongo
+from repositories import (
+    clients as clients_repo,
+    invoices as invoices_repo,
+    projects as projects_repo,
+    tasks as tasks_repo,
+)
+from versions import bump_versions, conditional
+from activity.log import log_activity
+from archive.store import delete_for_client as delete_archived_for_client
+from timesheets.store import drop_timers
+from .stats import empty_stats
 from . import clients_bp
 
 
 @clients_bp.route("/clients", methods=["GET", "POST"])
+@conditional("clients", "invoices", "projects", "tasks")
 def clients():
     if "user_id" not in session:
         return redirect(url_for("auth.index"))
 
     if request.method == "POST":
-        mongo.db.clients.insert_one({
-            "user_id": session["user_id"],
+        client_id = clients_repo.create(session["user_id"], {
             "name": request.form.get("name"),
             "company": request.form.get("company"),
             "email": request.form.get("email"),
             "contract_value": float(request.form.get("contract_value", 0)),
             "status": "Active",
+            "stats": empty_stats(),
             "created_at": datetime.utcnow()
         })
+        bump_versions(session["user_id"], "clients")
+        log_activity("client", client_id, "created", request.form.get("name"))
         return redirect(url_for("clients.clients"))
 
-    user_clients = mongo.db.clients.find({
-        "user_id": session["user_id"]
-    })
+    sort = request.args.get("sort", "name")
+    if sort not in clients_repo.SORTS:
+        sort = "name"
+
+    user_clients = clients_repo.list_all(session["user_id"], sort)
 
     return render_template(
         "clients.html",
-        clients=user_clients
+        clients=user_clients,
+        sort=sort
     )
 
 
@@ -38,45 +54,29 @@ def delete_client(client_id):
     if "user_id" not in session:
         return redirect(url_for("auth.index"))
 
-    client = mongo.db.clients.find_one({
-        "_id": ObjectId(client_id),
-        "user_id": session["user_id"]
-    })
+    user_id = session["user_id"]
+    client = clients_repo.get(user_id, ObjectId(client_id))
 
     if not client:
         return redirect(url_for("clients.clients"))
 
     # --- CASCADE DELETE (INTENTIONAL & ORDERED) ---
 
-    # 1. Delete invoices tied to this client name
-    mongo.db.invoices.delete_many({
-        "user_id": session["user_id"],
-        "client_name": client["name"]
-    })
-
-    # 2. Find projects for this client
-    projects = mongo.db.projects.find({
-        "user_id": session["user_id"],
-        "client_id": ObjectId(client_id)
-    })
-
-    # 3. Delete tasks for each project
-    for project in projects:
-        mongo.db.tasks.delete_many({
-            "user_id": session["user_id"],
-            "project_id": project["_id"]
-        })
+    # 1. Delete invoices tied to this client
+    invoices_repo.delete_for_client(user_id, client["_id"])
+
+    # 2. Delete projects, then their tasks and running timers
+    project_ids = projects_repo.delete_for_client(user_id, client["_id"])
+    tasks_repo.delete_for_projects(user_id, project_ids)
+    drop_timers(user_id, project_ids)
+
+    # 3. Same for anything already moved to the archive
+    delete_archived_for_client(user_id, client["_id"])
+
+    # 4. Delete client
+    clients_repo.delete(user_id, client["_id"])
 
-    # 4. Delete projects
-    mongo.db.projects.delete_many({
-        "user_id": session["user_id"],
-        "client_id": ObjectId(client_id)
-    })
-
-    # 5. Delete client
-    mongo.db.clients.delete_one({
-        "_id": ObjectId(client_id),
-        "user_id": session["user_id"]
-    })
+    bump_versions(session["user_id"], "clients", "projects", "tasks", "invoices", "archive", "time")
+    log_activity("client", client["_id"], "deleted", client["name"])
 
     return redirect(url_for("clients.clients"))
@@ -0,0 +1,145 @@
+from datetime import datetime
+
+from pymongo import UpdateOne
+
+from extensions import mongo
+from repositories import clients as clients_repo
+from versions import bump_versions
+
+
+# Lifetime scorecard per client, kept in `clients.stats` and maintained with
+# $inc by the invoice, project and task routes. Archived records keep
+# counting; `flask rebuild-client-stats` recomputes everything from scratch.
+#
+# Overdue depends on the date as well as on writes, so routes adjust it when
+# an overdue invoice is paid or deleted and refresh_overdue() recounts it for
+# invoices that fell due since the last run.
+#
+# task_hours is tracked time, not estimates: the timesheet routes add each
+# recorded entry and a rebuild reads the client totals from `time_rollups`.
+
+FIELDS = (
+    "invoiced",
+    "paid",
+    "outstanding",
+    "overdue",
+    "projects",
+    "projects_completed",
+    "task_hours",
+)
+
+
+def empty_stats():
+    return {name: 0 for name in FIELDS}
+
+
+def inc_client_stats(user_id, client_id, **deltas):
+    changes = {f"stats.{name}": value for name, value in deltas.items() if value}
+    if client_id is None or not changes:
+        return
+    clients_repo.inc_stats(user_id, client_id, changes)
+
+
+def is_overdue(invoice, today=None):
+    today = today or datetime.utcnow().strftime("%Y-%m-%d")
+    return invoice.get("status") != "Paid" and bool(invoice.get("due_date")) and invoice["due_date"] < today
+
+
+def invoice_deltas(invoice, sign=1):
+    """What one invoice contributes to its client's stats (sign=-1 to remove)."""
+    amount = invoice.get("amount", 0)
+    paid = invoice.get("status") == "Paid"
+    return {
+        "invoiced": sign * amount,
+        "paid": sign * amount if paid else 0,
+        "outstanding": 0 if paid else sign * amount,
+        "overdue": sign if is_overdue(invoice) else 0,
+    }
+
+
+# ---------- Rebuild ----------
+
+def _sum_by(collection, match, key, field=None):
+    group = {"_id": key, "n": {"$sum": f"${field}" if field else 1}}
+    return {
+        row["_id"]: row["n"]
+        for row in collection.aggregate([{"$match": match}, {"$group": group}])
+    }
+
+
+def _merge(*totals):
+    merged = {}
+    for part in totals:
+        for key, value in part.items():
+            merged[key] = merged.get(key, 0) + value
+    return merged
+
+
+def rebuild_client_stats(user_id=None):
+    """Recompute stats for one user's clients, or for every user."""
+    db = mongo.db
+    user_ids = [user_id] if user_id else db.clients.distinct("user_id")
+    today = datetime.utcnow().strftime("%Y-%m-%d")
+    rebuilt = 0
+
+    for uid in user_ids:
+        scoped = {"user_id": uid}
+        unpaid = {"user_id": uid, "status": {"$ne": "Paid"}}
+        overdue = dict(unpaid, due_date={"$lt": today, "$nin": [None, ""]})
+
+        totals = {
+            "invoiced": _merge(*(_sum_by(db[c], scoped, "$client_id", "amount") for c in ("invoices", "invoices_archive"))),
+            "paid": _merge(*(_sum_by(db[c], dict(scoped, status="Paid"), "$client_id", "amount") for c in ("invoices", "invoices_archive"))),
+            "outstanding": _sum_by(db.invoices, unpaid, "$client_id", "amount"),
+            "overdue": _sum_by(db.invoices, overdue, "$client_id"),
+            "projects": _merge(*(_sum_by(db[c], scoped, "$client_id") for c in ("projects", "projects_archive"))),
+            "projects_completed": _merge(*(_sum_by(db[c], dict(scoped, status="Completed"), "$client_id") for c in ("projects", "projects_archive"))),
+        }
+
+        totals["task_hours"] = {
+            doc["key"]: doc["seconds"] / 3600
+            for doc in db.time_rollups.find(dict(scoped, kind="client"), {"key": 1, "seconds": 1})
+        }
+
+        client_ids = clients_repo.ids(uid)
+        clients_repo.set_stats(uid, {
+            client_id: {name: totals[name].get(client_id, 0) for name in FIELDS}
+            for client_id in client_ids
+        })
+        rebuilt += len(client_ids)
+
+    return rebuilt
+
+
+def refresh_overdue():
+    """Recount stats.overdue from unpaid invoices past their due date.
+
+    Run daily; only clients whose count actually changed are written.
+    """
+    db = mongo.db
+    today = datetime.utcnow().strftime("%Y-%m-%d")
+    counts = _sum_by(
+        db.invoices,
+        {"status": {"$ne": "Paid"}, "due_date": {"$lt": today, "$nin": [None, ""]}},
+        "$client_id"
+    )
+
+    ops = []
+    users = set()
+    for c in db.clients.find(
+        # $ne, not $gt: a route can take the count below zero when an
+        # invoice fell due after the last refresh
+        {"$or": [{"_id": {"$in": list(counts)}}, {"stats.overdue": {"$ne": 0}}]},
+        {"user_id": 1, "stats.overdue": 1}
+    ):
+        count = counts.get(c["_id"], 0)
+        if c.get("stats", {}).get("overdue") != count:
+            ops.append(UpdateOne({"_id": c["_id"], "user_id": c["user_id"]}, {"$set": {"stats.overdue": count}}))
+            users.add(c["user_id"])
+
+    if ops:
+        db.clients.bulk_write(ops, ordered=False)
+
+    for uid in users:
+        bump_versions(uid, "clients")
+    return len(ops)
@@ -0,0 +1,196 @@
+import click
+from datetime import datetime
+
+
+def register_commands(app):
+
+    @app.cli.command("init-db")
+    def init_db():
+        from indexes import ensure_indexes
+
+        ensure_indexes(
+            retention_days=app.config["ACTIVITY_RETENTION_DAYS"],
+            scheduler_history_days=app.config["SCHEDULER_HISTORY_DAYS"]
+        )
+        click.echo("Indexes ensured.")
+
+    @app.cli.command("shard-collections")
+    def shard_collections():
+        from indexes import shard_collections
+
+        sharded = shard_collections()
+        if not sharded:
+            click.echo("Not connected to a mongos; nothing sharded.")
+        for name in sharded:
+            click.echo(f"Sharded {name}.")
+
+    @app.cli.command("check-data-access")
+    def check_data_access():
+        from repositories import direct_access_violations
+
+        violations = direct_access_violations(app)
+        for module, line, what in violations:
+            click.echo(f"{module}:{line}: {what}")
+        if violations:
+            raise SystemExit(1)
+        click.echo("All routes go through repositories.")
+
+    @app.cli.command("backfill-invoice-refs")
+    @click.option("--batch-size", default=500, show_default=True)
+    def backfill_invoice_refs(batch_size):
+        from migrations import backfill_invoice_refs
+
+        updated = backfill_invoice_refs(batch_size=batch_size)
+        click.echo(f"Backfilled {updated} invoices.")
+
+    @app.cli.command("score-leads")
+    @click.option("--user", "user_id", default=None, help="Only this user's leads.")
+    def score_leads(user_id):
+        from leads.scoring import score_all_leads, score_leads
+
+        changed = score_leads(user_id) if user_id else score_all_leads()
+        click.echo(f"Updated {changed} lead scores.")
+
+    @app.cli.command("index-projects")
+    @click.option("--user", "user_id", default=None, help="Only this user's projects.")
+    def index_projects(user_id):
+        from projects.suggestions import index_projects
+
+        click.echo(f"Indexed {index_projects(user_id)} projects for task suggestions.")
+
+    @app.cli.command("rebuild-client-stats")
+    @click.option("--user", "user_id", default=None, help="Only this user's clients.")
+    def rebuild_client_stats(user_id):
+        from clients.stats import rebuild_client_stats
+
+        click.echo(f"Rebuilt stats for {rebuild_client_stats(user_id)} clients.")
+
+    @app.cli.command("refresh-overdue")
+    def refresh_overdue():
+        from clients.stats import refresh_overdue
+
+        click.echo(f"Updated overdue counts for {refresh_overdue()} clients.")
+
+    @app.cli.command("send-reminders")
+    @click.option("--dry-run", is_flag=True, help="Count what would be sent.")
+    def send_reminders(dry_run):
+        from reminders import dispatch_reminders
+
+        stats = dispatch_reminders(
+            batch_size=app.config["REMINDER_BATCH_SIZE"],
+            resend_days=app.config["REMINDER_RESEND_DAYS"],
+            dry_run=dry_run
+        )
+        click.echo(f"Sent {stats['sent']} reminders ({stats['failed']} failed, {stats['skipped']} already claimed).")
+
+    @app.cli.command("jobs")
+    def jobs():
+        from scheduler import scheduler
+
+        scheduler.sync()
+        for job in scheduler.status():
+            running = job.get("owner") if job.get("locked_until", datetime.min) > datetime.utcnow() else "-"
+            next_run_at = job.get("next_run_at", datetime.min).replace(microsecond=0)
+            click.echo(
+                f"{job['_id']:22} {job['cron']:14} next {next_run_at} "
+                f"last {job.get('last_status', '-'):8} running on {running}"
+            )
+
+    @app.cli.command("run-job")
+    @click.argument("name")
+    def run_job(name):
+        from scheduler import scheduler
+
+        if name not in scheduler.jobs:
+            raise click.BadParameter(f"choose from {', '.join(scheduler.jobs)}", param_hint="NAME")
+        scheduler.sync()
+        record = scheduler.run(name, trigger="manual")
+        if record is None:
+            raise click.ClickException(f"{name} is already running.")
+        click.echo(f"{name}: {record['status']} in {record['seconds']}s {record.get('result', record.get('error', ''))}")
+        if record["status"] != "ok":
+            raise SystemExit(1)
+
+    @app.cli.command("job-history")
+    @click.argument("name", required=False)
+    @click.option("--limit", default=20, show_default=True)
+    def job_history(name, limit):
+        from scheduler import scheduler
+
+        for run in scheduler.history(name, limit):
+            click.echo(
+                f"{run['started_at']:%Y-%m-%d %H:%M:%S} {run['job']:22} {run['trigger']:8} "
+                f"{run['status']:8} {run.get('seconds', '-')!s:>8}s {run['owner']} {run.get('error', '')}"
+            )
+
+    @app.cli.command("archive")
+    @click.option("--days", default=None, type=int, help="Defaults to ARCHIVE_AFTER_DAYS.")
+    @click.option("--batch-size", default=None, type=int)
+    def archive(days, batch_size):
+        from archive.store import run_archival
+
+        moved = run_archival(
+            days=days or app.config["ARCHIVE_AFTER_DAYS"],
+            batch_size=batch_size or app.config["ARCHIVE_BATCH_SIZE"]
+        )
+        click.echo(f"Archived {moved['projects']} projects and {moved['invoices']} invoices.")
+
+    @app.cli.command("backup")
+    @click.argument("user_id")
+    @click.option("-o", "--output", type=click.Path(dir_okay=False), required=True)
+    @click.option("--format", "format", type=click.Choice(["json", "bson"]), default="json", show_default=True,
+                  help="bson copies raw documents without decoding them.")
+    def backup(user_id, output, format):
+        from backup.store import iter_backup
+
+        with open(output, "wb") as f:
+            for chunk in iter_backup(user_id, format=format):
+                f.write(chunk)
+        click.echo(f"Wrote {output}.")
+
+    @app.cli.command("restore-backup")
+    @click.argument("path", type=click.Path(exists=True, dir_okay=False))
+    @click.option("--user", "user_id", default=None, help="Restore into this account.")
+    @click.option("--batch-size", default=1000, show_default=True)
+    def restore_backup(path, user_id, batch_size):
+        from backup.store import restore_backup
+
+        try:
+            user_id, counts = restore_backup(path, user_id=user_id, batch_size=batch_size)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        for name, count in counts.items():
+            click.echo(f"{name:20} {count}")
+        click.echo(f"Restored into user {user_id}.")
+
+    @app.cli.command("check-read-routing")
+    def check_read_routing():
+        from bson.objectid import ObjectId
+        from extensions import mark_write, read_db
+
+        def serving_member():
+            db = read_db()
+            hello = db.command("hello", read_preference=db.read_preference)
+            role = "secondary" if hello.get("secondary") else "primary"
+            return f"{hello.get('me', 'standalone')} ({role})"
+
+        for endpoint in sorted(app.config["SECONDARY_READ_ENDPOINTS"]):
+            rule = next(app.url_map.iter_rules(endpoint))
+            path = rule.build({arg: str(ObjectId()) for arg in rule.arguments})[1]
+
+            with app.test_request_context(path):
+                routed = serving_member()
+                mark_write()
+                after_write = serving_member()
+
+            click.echo(f"{endpoint:28} {routed:32} after write: {after_write}")
+
+    @app.cli.command("build-assets")
+    def build_assets():
+        from assets import build_assets
+
+        stats = build_assets(app.static_folder)
+        click.echo(
+            f"Built {stats['files']} assets: {stats['raw']} bytes -> "
+            f"{stats['min']} minified, {stats['gz']} gzipped."
+        )
@@ -1,15 +1,94 @@
 import os
 from dotenv import load_dotenv
 
-load_dotenv() 
+if os.getenv("FLASK_ENV") != "production":
+    load_dotenv()
+
 class Config:
     SECRET_KEY = os.getenv("FLASK_SECRET_KEY", "dev-secret")
     MONGO_URI = os.getenv("MONGO_URI")
+    # Wire compression, in order of preference; the server picks the first
+    # it also supports. snappy can be added with python-snappy installed.
+    MONGO_COMPRESSORS = [c for c in os.getenv("MONGO_COMPRESSORS", "zstd,zlib").split(",") if c]
     GITHUB_CLIENT_ID = os.getenv("GITHUB_CLIENT_ID")
     GITHUB_CLIENT_SECRET = os.getenv("GITHUB_CLIENT_SECRET")
     GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
     GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
     GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET")
+    RELEASE_VERSION = os.getenv("RELEASE_VERSION", "")
+
+    # OpenID discovery documents are cached under instance/oauth/
+    OAUTH_METADATA_MAX_AGE = 86400
+
+    # Read routing (see extensions.read_db); MongoDB requires >= 90 seconds
+    READ_ROUTING_ENABLED = os.getenv("READ_ROUTING_ENABLED", "true") == "true"
+    SECONDARY_MAX_STALENESS = int(os.getenv("SECONDARY_MAX_STALENESS", 90))
+    SECONDARY_READ_ENDPOINTS = {
+        "dashboard.dashboard",
+        "leads.leads",
+        "prospects.prospects",
+        "clients.clients",
+        "projects.client_projects",
+        "projects.project_detail",
+        "invoices.invoices",
+        "invoices.view_invoice",
+        "archive.archive",
+        "capacity.capacity",
+        "ical.feed",
+    }
+
+    # Live updates (live/hub.py); polling is only used without change streams
+    LIVE_POLL_INTERVAL = 5
+    LIVE_OVERDUE_INTERVAL = 60
+    LIVE_KEEPALIVE = 15
+    # Each open stream holds one gthread thread (32 per worker in the
+    # Procfile). Past this many per worker, pages poll every
+    # LIVE_FALLBACK_RETRY seconds instead, leaving threads for requests.
+    LIVE_MAX_STREAMS = int(os.getenv("LIVE_MAX_STREAMS", 24))
+    LIVE_FALLBACK_RETRY = 30
+
+    # Activity log (activity/log.py)
+    ACTIVITY_BATCH_SIZE = 100
+    ACTIVITY_FLUSH_INTERVAL = 2.0
+    ACTIVITY_MAX_BUFFER = 10000
+    ACTIVITY_RETENTION_DAYS = 365
+
+    # Hot/cold archival (archive/store.py), run by the scheduler or `flask archive`
+    ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", 180))
+    ARCHIVE_BATCH_SIZE = 500
+
+    # Overdue invoice reminders (reminders.py), sent by the scheduler or `flask send-reminders`
+    SMTP_HOST = os.getenv("SMTP_HOST", "localhost")
+    SMTP_PORT = int(os.getenv("SMTP_PORT", 25))
+    SMTP_USERNAME = os.getenv("SMTP_USERNAME")
+    SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
+    SMTP_USE_TLS = os.getenv("SMTP_USE_TLS", "false") == "true"
+    MAIL_FROM = os.getenv("MAIL_FROM", "reminders@localhost")
+    REMINDER_BATCH_SIZE = 500
+    REMINDER_RESEND_DAYS = 7
+
+    # Periodic jobs (scheduler.py), cron schedules in UTC; jitter delays each
+    # run by up to that many seconds, timeout bounds the run (its lease is
+    # renewed while it runs)
+    SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "true") == "true"
+    SCHEDULER_POLL_INTERVAL = 30
+    SCHEDULER_HISTORY_DAYS = 30
+    SCHEDULER_JOBS = {
+        "refresh-overdue": {"cron": "5 0 * * *", "jitter": 300, "timeout": 900},
+        "score-leads": {"cron": "20 * * * *", "jitter": 300, "timeout": 900},
+        "archive": {"cron": "30 3 * * *", "jitter": 900, "timeout": 3600},
+        "send-reminders": {"cron": "0 9 * * *", "jitter": 600, "timeout": 1800},
+        "rebuild-client-stats": {"cron": "0 4 * * 0", "jitter": 900, "timeout": 3600},
+    }
+
+    # Capacity planner (capacity/planner.py); users can change their capacity
+    CAPACITY_WEEKLY_HOURS = 40
+    CAPACITY_WEEKS = 12
+
+    FRAGMENT_CACHE_ENABLED = True
+    FRAGMENT_CACHE_SIZE = 2048
+    FRAGMENT_CACHE_TIMEOUT = 3600
+    FRAGMENT_CACHE_REDIS_URL = os.getenv("FRAGMENT_CACHE_REDIS_URL")
 
     CURRENCY_SYMBOL = "₹"
     CURRENCY_CODE = "INR"
@@ -1,12 +1,20 @@
 from flask import render_template, session, redirect, url_for
-from datetime import datetime
-from bson.objectid import ObjectId
+from datetime import datetime, timedelta
 
-from extensions import mongo
+from repositories import (
+    invoices as invoices_repo,
+    leads as leads_repo,
+    projects as projects_repo,
+    prospects as prospects_repo,
+    tasks as tasks_repo,
+)
+from timesheets.store import rollups, week_key
+from versions import conditional
 from . import dashboard_bp
 
 
 @dashboard_bp.route("/dashboard")
+@conditional("projects", "prospects", "tasks", "invoices", "leads", "time")
 def dashboard():
     if "user_id" not in session:
         return redirect(url_for("auth.index"))
@@ -15,58 +23,41 @@ def dashboard():
     today_str = datetime.utcnow().strftime("%Y-%m-%d")
 
     # 1. Active Projects Count
-    active_projects_count = mongo.db.projects.count_documents({
-        "user_id": user_id,
-        "status": {"$ne": "Completed"}
-    })
+    active_projects_count = projects_repo.count_active(user_id)
 
     # 2. Pipeline Value
-    pipeline_cursor = mongo.db.prospects.aggregate([
-        {"$match": {"user_id": user_id}},
-        {"$group": {"_id": None, "total": {"$sum": "$value"}}}
-    ])
-    pipeline_val = list(pipeline_cursor)
-    pipeline_total = pipeline_val[0]["total"] if pipeline_val else 0
+    pipeline_total = prospects_repo.pipeline_total(user_id)
 
     # 3. Pending Tasks
-    pending_tasks_count = mongo.db.tasks.count_documents({
-        "user_id": user_id,
-        "status": "Pending"
-    })
+    pending_tasks_count = tasks_repo.count_pending(user_id)
+
+    # Tracked time this week and last, from the weekly rollups
+    now = datetime.utcnow()
+    this_week, last_week = week_key(now), week_key(now - timedelta(days=7))
+    tracked = rollups(user_id, "week", [this_week, last_week])
 
     # 4. Overdue Invoices
-    overdue_count = mongo.db.invoices.count_documents({
-        "user_id": user_id,
-        "status": "Unpaid",
-        "due_date": {"$lt": today_str}
-    })
+    overdue_count = invoices_repo.count_overdue(user_id, today_str)
 
-    # 5. Urgent Leads
-    urgent_leads = mongo.db.leads.find({
-        "user_id": user_id,
-        "status": "Cold"
-    }).sort("created_at", 1).limit(5)
+    # 5. Urgent Leads, by precomputed score (leads/scoring.py)
+    urgent_leads = leads_repo.top_scored(user_id)
 
     # 6. Active Projects + Progress
-    projects_cursor = mongo.db.projects.find({
-        "user_id": user_id,
-        "status": {"$ne": "Completed"}
-    }).sort("deadline", 1).limit(5)
+    projects_cursor = projects_repo.next_deadlines(user_id)
 
-    active_projects = []
-    for p in projects_cursor:
-        total_tasks = mongo.db.tasks.count_documents({"project_id": p["_id"]})
-        done_tasks = mongo.db.tasks.count_documents({
-            "project_id": p["_id"],
-            "status": "Done"
-        })
+    # Lazy, so the counts only run when the cached widget needs a re-render
+    def active_projects():
+        projects = list(projects_cursor)
+        counts = tasks_repo.progress(user_id, [p["_id"] for p in projects])
+        for p in projects:
+            done_tasks, total_tasks = counts.get(p["_id"], (0, 0))
 
-        progress = int((done_tasks / total_tasks) * 100) if total_tasks > 0 else 0
+            progress = int((done_tasks / total_tasks) * 100) if total_tasks > 0 else 0
 
-        p["progress"] = progress
-        p["tasks_done"] = done_tasks
-        p["tasks_total"] = total_tasks
-        active_projects.append(p)
+            p["progress"] = progress
+            p["tasks_done"] = done_tasks
+            p["tasks_total"] = total_tasks
+            yield p
 
     return render_template(
         "dashboard.html",
@@ -74,7 +65,9 @@ def dashboard():
         active_projects_count=active_projects_count,
         pipeline_total=pipeline_total,
         pending_tasks_count=pending_tasks_count,
+        tracked_this_week=tracked.get(this_week, 0) / 3600,
+        tracked_last_week=tracked.get(last_week, 0) / 3600,
         overdue_count=overdue_count,
         urgent_leads=urgent_leads,
-        active_projects=active_projects,
+        active_projects=active_projects(),
     )
\ No newline at end of file
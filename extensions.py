@@ -1,5 +1,174 @@
+import json
+import os
+import threading
+import time
+from functools import partial
+
+from flask import current_app, g, has_request_context, request, session
 from flask_pymongo import PyMongo
-from authlib.integrations.flask_client import OAuth
+from pymongo.collection import Collection
+from pymongo.read_preferences import SecondaryPreferred
+
+
+class LazyOAuth:
+    """Authlib's OAuth registry, imported and built on first client use.
+
+    Providers registered at startup are only recorded; Authlib itself and the
+    provider clients are set up the first time a login route needs one.
+
+    OpenID discovery documents (and their JWKS) are cached on disk under the
+    instance folder and refreshed every OAUTH_METADATA_MAX_AGE seconds, so
+    workers don't fetch them on every start. Authlib still refetches the
+    JWKS by itself when it sees an unknown signing key.
+    """
+
+    def __init__(self):
+        self.app = None
+        self._providers = {}
+        self._oauth = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        self._oauth = None
+
+    def register(self, name, **kwargs):
+        self._providers[name] = kwargs
+
+    def create_client(self, name):
+        if self._oauth is None:
+            with self._lock:
+                if self._oauth is None:
+                    from authlib.integrations.flask_client import OAuth
+
+                    oauth = OAuth(self.app)
+                    for provider, kwargs in self._providers.items():
+                        oauth.register(name=provider, **kwargs)
+                    self._oauth = oauth
+
+        # Metadata is loaded for the provider being used only, so one
+        # unreachable provider doesn't break logins through the others
+        client = self._oauth.create_client(name)
+        url = self._providers.get(name, {}).get("server_metadata_url")
+        if url and self._expired(client.server_metadata):
+            with self._lock:
+                if self._expired(client.server_metadata):
+                    client.server_metadata.update(self._metadata(name, url))
+        return client
+
+    def _expired(self, metadata):
+        max_age = self.app.config.get("OAUTH_METADATA_MAX_AGE", 86400)
+        return time.time() - metadata.get("_loaded_at", 0) > max_age
+
+    def _metadata(self, name, url):
+        path = os.path.join(self.app.instance_path, "oauth", f"{name}.json")
+        try:
+            with open(path, encoding="utf-8") as f:
+                metadata = json.load(f)
+            if not self._expired(metadata):
+                return metadata
+        except (OSError, ValueError):
+            metadata = None
+
+        import requests
+
+        try:
+            metadata = requests.get(url, timeout=10).json()
+            if metadata.get("jwks_uri"):
+                metadata["jwks"] = requests.get(metadata["jwks_uri"], timeout=10).json()
+        except (requests.RequestException, ValueError):
+            if metadata:
+                # Provider unreachable: a stale copy beats failing the login
+                return metadata
+            raise
+        metadata["_loaded_at"] = time.time()
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(metadata, f)
+        os.replace(tmp, path)
+        return metadata
+
 
 mongo = PyMongo()
-oauth = OAuth()
\ No newline at end of file
+oauth = LazyOAuth()
+
+
+# ---------- Read Routing ----------
+# GET requests to SECONDARY_READ_ENDPOINTS read from secondaries, bounded by
+# SECONDARY_MAX_STALENESS. After any write the user's reads stay on the
+# primary for that long, so the redirect that follows a POST sees its write.
+#
+# Those reads share one causally consistent session, so each sees at least
+# what the reads before it saw, whichever secondary serves it. The
+# data_versions read comes first (versions.get_versions), so page data is
+# never older than the version an ETag or cache key was built from.
+
+CAUSAL_READS = {"find", "find_one", "aggregate", "count_documents", "distinct"}
+
+
+class CausalDatabase:
+    """A Database whose collections run their reads in `session`."""
+
+    def __init__(self, db, session):
+        self._db = db
+        self._session = session
+
+    def __getitem__(self, name):
+        return CausalCollection(self._db[name], self._session)
+
+    def __getattr__(self, name):
+        attr = getattr(self._db, name)
+        if isinstance(attr, Collection):
+            return CausalCollection(attr, self._session)
+        return attr
+
+
+class CausalCollection:
+
+    def __init__(self, collection, session):
+        self._collection = collection
+        self._session = session
+
+    def __getattr__(self, name):
+        attr = getattr(self._collection, name)
+        if name in CAUSAL_READS:
+            return partial(attr, session=self._session)
+        return attr
+
+
+def read_db():
+    if not has_request_context():
+        return mongo.db
+
+    if "read_db" not in g:
+        g.read_db = mongo.db
+        if _reads_from_secondary():
+            g.read_session = mongo.cx.start_session(causal_consistency=True)
+            g.read_db = CausalDatabase(mongo.db.with_options(read_preference=SecondaryPreferred(
+                max_staleness=current_app.config["SECONDARY_MAX_STALENESS"]
+            )), g.read_session)
+    return g.read_db
+
+
+def end_read_session(exc=None):
+    read_session = g.pop("read_session", None)
+    if read_session is not None:
+        read_session.end_session()
+
+
+def mark_write():
+    if has_request_context():
+        session["primary_until"] = time.time() + current_app.config["SECONDARY_MAX_STALENESS"]
+        g.pop("read_db", None)
+
+
+def _reads_from_secondary():
+    config = current_app.config
+    return (
+        config.get("READ_ROUTING_ENABLED")
+        and request.method == "GET"
+        and request.endpoint in config.get("SECONDARY_READ_ENDPOINTS", ())
+        and session.get("primary_until", 0) < time.time()
+    )
\ No newline at end of file
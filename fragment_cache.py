@@ -0,0 +1,142 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+from flask import current_app, session
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+
+from versions import data_version
+
+
+# ---------- Stores ----------
+
+class LRUStore:
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class FragmentCache:
+    """Per-worker LRU in front of an optional shared cachelib backend."""
+
+    def __init__(self, max_entries=2048, shared=None, timeout=3600):
+        self.local = LRUStore(max_entries)
+        self.shared = shared
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self.local.get(key)
+        if value is None and self.shared is not None:
+            value = self.shared.get(key)
+            if value is not None:
+                self.local.set(key, value)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key, value):
+        self.local.set(key, value)
+        if self.shared is not None:
+            self.shared.set(key, value, timeout=self.timeout)
+
+    def clear(self):
+        self.local.clear()
+        if self.shared is not None:
+            self.shared.clear()
+
+
+def current_cache():
+    """The app's fragment cache, or None when FRAGMENT_CACHE_ENABLED is off."""
+    if not current_app.config.get("FRAGMENT_CACHE_ENABLED", True):
+        return None
+    return getattr(current_app.jinja_env, "fragment_cache", None)
+
+
+# ---------- Template Tag ----------
+
+class FragmentCacheExtension(Extension):
+    """{% cache "name", part, ... %}...{% endcache %}
+
+    Keys are scoped to the logged-in user and RELEASE_VERSION; pass a
+    data_version(...) or the row fields the fragment depends on as parts.
+    """
+
+    tags = {"cache"}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache=None)
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        parts = [parser.parse_expression()]
+        while parser.stream.skip_if("comma"):
+            parts.append(parser.parse_expression())
+
+        body = parser.parse_statements(["name:endcache"], drop_needle=True)
+        call = self.call_method("_render", [nodes.List(parts)])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _render(self, parts, caller):
+        cache = current_cache()
+        if cache is None:
+            return caller()
+
+        raw = "|".join(
+            [current_app.config.get("RELEASE_VERSION", ""), session.get("user_id") or ""]
+            + [str(part) for part in parts]
+        )
+        key = "frag:" + hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+        value = cache.get(key)
+        if value is None:
+            value = caller()
+            cache.set(key, str(value))
+        return Markup(value)
+
+
+def _shared_store(app):
+    url = app.config.get("FRAGMENT_CACHE_REDIS_URL")
+    if not url:
+        return None
+
+    # Optional: only needed when fragments are shared between workers
+    import redis
+    from cachelib import RedisCache
+
+    return RedisCache(host=redis.Redis.from_url(url), key_prefix="studiobase:")
+
+
+def init_app(app):
+    app.jinja_env.add_extension(FragmentCacheExtension)
+    app.jinja_env.fragment_cache = FragmentCache(
+        max_entries=app.config.get("FRAGMENT_CACHE_SIZE", 2048),
+        shared=_shared_store(app),
+        timeout=app.config.get("FRAGMENT_CACHE_TIMEOUT", 3600),
+    )
+    app.jinja_env.globals["data_version"] = data_version
@@ -0,0 +1,5 @@
+from flask import Blueprint
+
+ical_bp = Blueprint("ical", __name__)
+
+from . import routes
@@ -0,0 +1,93 @@
+from datetime import datetime
+
+from flask import current_app
+
+from extensions import read_db
+
+
+# Calendar apps poll feeds every few minutes, so a feed is built once per
+# (user, projects version, invoices version) and served from the fragment
+# cache until one of those collections changes.
+
+FEED_COLLECTIONS = ("projects", "invoices")
+
+
+def _escape(text):
+    return (
+        str(text or "")
+        .replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\n", "\\n")
+    )
+
+
+def _fold(line):
+    # RFC 5545: lines longer than 75 octets continue on the next line
+    # after a single space
+    data = line.encode("utf-8")
+    if len(data) <= 75:
+        return line
+    parts = []
+    while len(data) > 75:
+        cut = 75 if not parts else 74
+        while (data[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(data[:cut].decode("utf-8"))
+        data = data[cut:]
+    parts.append(data.decode("utf-8"))
+    return "\r\n ".join(parts)
+
+
+def _event(uid, day, summary, description, stamp):
+    return [
+        "BEGIN:VEVENT",
+        f"UID:{uid}@studiobase",
+        f"DTSTAMP:{stamp}",
+        f"DTSTART;VALUE=DATE:{day}",
+        f"SUMMARY:{_escape(summary)}",
+        f"DESCRIPTION:{_escape(description)}",
+        "TRANSP:TRANSPARENT",
+        "END:VEVENT",
+    ]
+
+
+def build_feed(user_id):
+    db = read_db()
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+    symbol = current_app.config.get("CURRENCY_SYMBOL", "")
+
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//StudioBase//Deadlines//EN",
+        "CALSCALE:GREGORIAN",
+        "X-WR-CALNAME:StudioBase",
+    ]
+
+    for p in db.projects.find(
+        {"user_id": user_id, "status": {"$ne": "Completed"}, "deadline": {"$ne": None}},
+        {"title": 1, "client_name": 1, "deadline": 1}
+    ):
+        lines += _event(
+            f"project-{p['_id']}",
+            p["deadline"].strftime("%Y%m%d"),
+            f"Deadline: {p.get('title')}",
+            p.get("client_name"),
+            stamp
+        )
+
+    for inv in db.invoices.find(
+        {"user_id": user_id, "status": "Unpaid", "due_date": {"$nin": [None, ""]}},
+        {"invoice_number": 1, "client_name": 1, "amount": 1, "due_date": 1}
+    ):
+        lines += _event(
+            f"invoice-{inv['_id']}",
+            inv["due_date"].replace("-", ""),
+            f"Invoice due: {inv.get('invoice_number')}",
+            f"{inv.get('client_name')} - {symbol}{inv.get('amount', 0):,.2f}",
+            stamp
+        )
+
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(_fold(line) for line in lines) + "\r\n"
@@ -0,0 +1,69 @@
+import hashlib
+import secrets
+from datetime import datetime
+
+from flask import current_app, render_template, session, redirect, url_for, request, abort
+
+from repositories import users as users_repo
+from versions import get_versions
+from fragment_cache import current_cache
+from .feed import FEED_COLLECTIONS, build_feed
+from . import ical_bp
+
+
+@ical_bp.route("/calendar")
+def calendar_settings():
+    if "user_id" not in session:
+        return redirect(url_for("auth.index"))
+
+    token = users_repo.calendar_token(session["user_id"])
+
+    feed_url = None
+    if token:
+        feed_url = url_for("ical.feed", token=token, _external=True)
+
+    return render_template("calendar.html", feed_url=feed_url)
+
+
+@ical_bp.route("/calendar/token", methods=["POST"])
+def reset_calendar_token():
+    if "user_id" not in session:
+        return redirect(url_for("auth.index"))
+
+    # A new token also revokes the old feed URL
+    token = secrets.token_urlsafe(24)
+    if request.form.get("action") == "disable":
+        token = None
+
+    users_repo.set_calendar_token(session["user_id"], token)
+    return redirect(url_for("ical.calendar_settings"))
+
+
+@ical_bp.route("/calendar/<token>.ics")
+def feed(token):
+    user = users_repo.by_calendar_token(token)
+    if not user:
+        abort(404)
+
+    user_id = str(user["_id"])
+    versions = get_versions(user_id, FEED_COLLECTIONS)
+    raw = "|".join([
+        current_app.config.get("RELEASE_VERSION", ""),
+        user_id,
+        ",".join(str(v) for v in versions),
+    ])
+    etag = hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    cache = current_cache()
+    key = "ics:" + etag
+    cached = cache.get(key) if cache is not None else None
+    if cached is None:
+        cached = {"body": build_feed(user_id), "modified": datetime.utcnow().replace(microsecond=0)}
+        if cache is not None:
+            cache.set(key, cached)
+
+    response = current_app.response_class(cached["body"], mimetype="text/calendar")
+    response.set_etag(etag)
+    response.last_modified = cached["modified"]
+    response.headers["Cache-Control"] = "private, max-age=300"
+    return response.make_conditional(request)
@@ -0,0 +1,96 @@
+from extensions import mongo
+from repositories import USER_SCOPED_COLLECTIONS
+
+
+def ensure_indexes(retention_days=365, scheduler_history_days=30):
+    db = mongo.db
+
+    # Login upserts match on one of these (auth/routes.py handle_login);
+    # GitHub users may hide their email, so only real addresses are unique
+    db.users.create_index([("provider", 1), ("oauth_id", 1)], unique=True)
+    db.users.create_index(
+        "email",
+        unique=True,
+        partialFilterExpression={"email": {"$type": "string"}}
+    )
+
+    # Invoices are joined to clients/projects by id, always scoped by user
+    db.invoices.create_index([("user_id", 1), ("client_id", 1)])
+    db.invoices.create_index([("user_id", 1), ("project_id", 1)])
+
+    db.projects.create_index([("user_id", 1), ("client_id", 1)])
+    # Completed projects searched for task suggestions (projects/suggestions.py)
+    # and active ones planned in capacity/planner.py
+    db.projects.create_index([("user_id", 1), ("status", 1)])
+    db.tasks.create_index([("user_id", 1), ("status", 1), ("project_id", 1)])
+    # A project's tasks whatever their status (repositories/tasks.py)
+    db.tasks.create_index([("user_id", 1), ("project_id", 1)])
+
+    # Lead scores (leads/scoring.py) and the other leads list orders
+    db.leads.create_index([("user_id", 1), ("score", -1)])
+    db.leads.create_index([("user_id", 1), ("created_at", -1)])
+    db.leads.create_index([("user_id", 1), ("name", 1)])
+
+    # Client list sort orders (repositories/clients.py SORTS)
+    db.clients.create_index([("user_id", 1), ("name", 1)])
+    for field in ("invoiced", "paid", "outstanding", "overdue", "projects", "task_hours"):
+        db.clients.create_index([("user_id", 1), (f"stats.{field}", -1)])
+
+    # Overdue sweep
+    db.invoices.create_index([("status", 1), ("due_date", 1)])
+
+    # Reminder dispatcher walks unpaid invoices in _id order
+    db.invoices.create_index([("status", 1), ("_id", 1)])
+
+    # Calendar feed: token lookup, then deadlines and due dates per user
+    db.users.create_index("calendar_token", unique=True, sparse=True)
+    db.projects.create_index([("user_id", 1), ("deadline", 1)])
+    db.invoices.create_index([("user_id", 1), ("status", 1), ("due_date", 1)])
+
+    # Activity timelines; entries expire after ACTIVITY_RETENTION_DAYS
+    db.activity.create_index([("user_id", 1), ("entity_type", 1), ("entity_id", 1), ("created_at", -1)])
+    db.activity.create_index([("user_id", 1), ("refs", 1), ("created_at", -1)])
+    db.activity.create_index([("user_id", 1), ("created_at", -1)])
+    db.activity.create_index("created_at", expireAfterSeconds=retention_days * 86400)
+
+    # Archival sweeps and the /archive page
+    db.projects.create_index([("status", 1), ("completed_at", 1)])
+    db.invoices.create_index([("status", 1), ("paid_at", 1)])
+    db.projects_archive.create_index([("user_id", 1), ("archived_at", -1)])
+    db.projects_archive.create_index([("user_id", 1), ("client_id", 1)])
+    db.tasks_archive.create_index([("user_id", 1), ("project_id", 1)])
+    db.invoices_archive.create_index([("user_id", 1), ("archived_at", -1)])
+    db.invoices_archive.create_index([("user_id", 1), ("client_id", 1)])
+
+    # Scheduler run history (scheduler.py)
+    db.scheduler_runs.create_index([("job", 1), ("started_at", -1)])
+    db.scheduler_runs.create_index("started_at", expireAfterSeconds=scheduler_history_days * 86400)
+
+    # Time tracking
+    db.time_buckets.create_index([("user_id", 1), ("day", 1)])
+    db.time_rollups.create_index([("user_id", 1), ("kind", 1), ("key", 1)], unique=True)
+    db.running_timers.create_index([("user_id", 1), ("task_id", 1)], unique=True)
+    db.running_timers.create_index([("user_id", 1), ("project_id", 1)])
+
+
+def shard_collections():
+    """Shard per-user collections on hashed user_id; returns what was sharded.
+
+    Only runs against a mongos. users stays unsharded: its unique email and
+    provider identity indexes cannot include a user_id shard key.
+    """
+    db = mongo.db
+    if db.command("hello").get("msg") != "isdbgrid":
+        return []
+
+    admin = mongo.cx.admin
+    admin.command("enableSharding", db.name)
+
+    sharded = []
+    keys = [(name, {"user_id": "hashed"}) for name in USER_SCOPED_COLLECTIONS]
+    keys.append(("data_versions", {"_id": "hashed"}))
+    for name, key in keys:
+        db[name].create_index(list(key.items()))
+        admin.command("shardCollection", f"{db.name}.{name}", key=key)
+        sharded.append(name)
+    return sharded
@@ -1,77 +1,97 @@
 from flask import render_template, session, redirect, url_for, request
 from bson.objectid import ObjectId
-from extensions import mongo
 from datetime import datetime
+from repositories import (
+    business_profile as business_repo,
+    clients as clients_repo,
+    invoices as invoices_repo,
+    projects as projects_repo,
+)
+from versions import bump_versions, conditional
+from activity.log import log_activity
+from timesheets.store import rollups
+from clients.stats import inc_client_stats, invoice_deltas
 from . import invoices_bp
 
 @invoices_bp.route("/invoices", methods=["GET", "POST"])
+@conditional("invoices", "clients", "projects", "business_profile", "time")
 def invoices():
     if "user_id" not in session:
         return redirect(url_for("auth.index"))
-    
-    profile = mongo.db.business_profile.find_one({
-    "user_id": session["user_id"]
-    })
 
-    if not profile:
+    if not business_repo.exists(session["user_id"]):
         return redirect(url_for("business.business_profile"))
 
     if request.method == "POST":
+        # A missing or malformed id means nothing was picked
+        client_id = request.form.get("client_id", "")
+        project_id = request.form.get("project_id", "")
+
+        client = None
+        if ObjectId.is_valid(client_id):
+            client = clients_repo.get(session["user_id"], ObjectId(client_id))
+
+        project = None
+        if client and ObjectId.is_valid(project_id):
+            project = projects_repo.get(
+                session["user_id"],
+                ObjectId(project_id),
+                {"title": 1, "client_id": 1}
+            )
+            if project and project["client_id"] != client["_id"]:
+                project = None
+
         invoice_number = f"INV-{datetime.utcnow().strftime('%Y%m%d')}-{str(ObjectId())[-4:]}"
-        mongo.db.invoices.insert_one({
-            "user_id": session["user_id"],
+        invoice = {
             "invoice_number": invoice_number,
-            "client_name": request.form.get("client_name"),
-            "project_title": request.form.get("project_title"),
+            "client_id": client["_id"] if client else None,
+            "client_name": client["name"] if client else "Manual Client",
+            "project_id": project["_id"] if project else None,
+            "project_title": project["title"] if project else "General Service",
             "amount": float(request.form.get("amount", 0)),
             "due_date": request.form.get("due_date"),
             "payment_mode": request.form.get("payment_mode"),
             "status": "Unpaid",
             "created_at": datetime.utcnow()
-        })
+        }
+        invoice_id = invoices_repo.create(session["user_id"], invoice)
+        inc_client_stats(session["user_id"], invoice["client_id"], **invoice_deltas(invoice))
+        bump_versions(session["user_id"], "invoices")
+        log_activity(
+            "invoice", invoice_id, "created", invoice_number,
+            refs=[client and client["_id"], project and project["_id"]]
+        )
         return redirect(url_for("invoices.invoices"))
 
-    invoices = mongo.db.invoices.find({
-        "user_id": session["user_id"]
-    })
-
-    clients = mongo.db.clients.find({
-        "user_id": session["user_id"]
-    })
+    invoices = invoices_repo.list_all(session["user_id"])
+    clients = clients_repo.names(session["user_id"])
+    projects = projects_repo.titles(session["user_id"])
 
-    projects = mongo.db.projects.find({
-        "user_id": session["user_id"]
-    })
+    # Tracked time per project, used to suggest invoice amounts
+    tracked = rollups(session["user_id"], "project", [p["_id"] for p in projects])
 
     return render_template(
         "invoices.html",
         invoices=invoices,
         clients=clients,
-        projects=projects
+        projects=projects,
+        tracked=tracked,
+        prefill_client=request.args.get("prefill_client"),
+        prefill_project=request.args.get("prefill_project")
     )
 
 @invoices_bp.route("/invoices/<invoice_id>/view")
+@conditional("invoices", "business_profile")
 def view_invoice(invoice_id):
     if "user_id" not in session:
         return redirect(url_for("auth.index"))
 
-    invoice = mongo.db.invoices.find_one({
-        "_id": ObjectId(invoice_id),
-        "user_id": session["user_id"]
-    })
-
-    user = mongo.db.users.find_one({
-        "_id": ObjectId(session["user_id"])
-    })
+    invoice = invoices_repo.get(session["user_id"], ObjectId(invoice_id))
+    business = business_repo.get(session["user_id"])
 
-    business = mongo.db.business_profile.find_one({
-        "user_id": session["user_id"]
-    })
-    
     return render_template(
         "invoice_view.html",
         invoice=invoice,
-        user=user,
         business=business
     )
 
@@ -80,10 +100,16 @@ def mark_invoice_paid(invoice_id):
     if "user_id" not in session:
         return redirect(url_for("auth.index"))
 
-    mongo.db.invoices.update_one(
-        {"_id": ObjectId(invoice_id), "user_id": session["user_id"]},
-        {"$set": {"status": "Paid"}}
-    )
+    invoice = invoices_repo.mark_paid(session["user_id"], ObjectId(invoice_id))
+    if not invoice:
+        return redirect(url_for("invoices.invoices"))
+
+    # Move the amount from outstanding to paid
+    before = invoice_deltas(invoice, -1)
+    after = invoice_deltas(dict(invoice, status="Paid"))
+    inc_client_stats(session["user_id"], invoice.get("client_id"), **{k: before[k] + after[k] for k in before})
+    bump_versions(session["user_id"], "invoices")
+    log_activity("invoice", ObjectId(invoice_id), "paid", refs=[invoice.get("client_id")])
 
     return redirect(url_for("invoices.invoices"))
 
@@ -92,9 +118,10 @@ def delete_invoice(invoice_id):
     if "user_id" not in session:
         return redirect(url_for("auth.index"))
 
-    mongo.db.invoices.delete_one({
-        "_id": ObjectId(invoice_id),
-        "user_id": session["user_id"]
-    })
+    invoice = invoices_repo.delete(session["user_id"], ObjectId(invoice_id))
+    if invoice:
+        inc_client_stats(session["user_id"], invoice.get("client_id"), **invoice_deltas(invoice, -1))
+        bump_versions(session["user_id"], "invoices")
+        log_activity("invoice", ObjectId(invoice_id), "deleted", refs=[invoice.get("client_id")])
 
     return redirect(url_for("invoices.invoices"))
\ No newline at end of file
@@ -2,33 +2,42 @@ from flask import render_template, session, redirect, url_for, request
 from bson.objectid import ObjectId
 from datetime import datetime
 
-from extensions import mongo
+from repositories import leads as leads_repo, prospects as prospects_repo
+from versions import bump_versions, conditional
+from activity.log import log_activity
+from .scoring import score_leads
 from . import leads_bp
 
 
 @leads_bp.route("/leads", methods=["GET", "POST"])
+@conditional("leads")
 def leads():
     if "user_id" not in session:
         return redirect(url_for("auth.index"))
 
     if request.method == "POST":
-        mongo.db.leads.insert_one({
-            "user_id": session["user_id"],
+        now = datetime.utcnow()
+        lead_id = leads_repo.create(session["user_id"], {
             "name": request.form.get("name"),
             "company": request.form.get("company"),
             "email": request.form.get("email"),
             "source": request.form.get("source"),
             "status": "Cold",
-            "created_at": datetime.utcnow(),
+            "status_changed_at": now,
+            "created_at": now,
         })
+        score_leads(session["user_id"], [lead_id])
+        bump_versions(session["user_id"], "leads")
+        log_activity("lead", lead_id, "created", request.form.get("name"))
         return redirect(url_for("leads.leads"))
 
-    user_leads = mongo.db.leads.find({
-        "user_id": session["user_id"],
-        "status": {"$ne": "Converted"},
-    })
+    sort = request.args.get("sort", "score")
+    if sort not in leads_repo.SORTS:
+        sort = "score"
+
+    user_leads = leads_repo.list_open(session["user_id"], sort)
 
-    return render_template("leads.html", leads=user_leads)
+    return render_template("leads.html", leads=user_leads, sort=sort)
 
 
 @leads_bp.route("/leads/update_status/<lead_id>", methods=["POST"])
@@ -38,10 +47,10 @@ def update_lead_status(lead_id):
 
     new_status = request.form.get("status")
 
-    mongo.db.leads.update_one(
-        {"_id": ObjectId(lead_id), "user_id": session["user_id"]},
-        {"$set": {"status": new_status}},
-    )
+    if leads_repo.set_status(session["user_id"], ObjectId(lead_id), new_status):
+        score_leads(session["user_id"], [ObjectId(lead_id)])
+    bump_versions(session["user_id"], "leads")
+    log_activity("lead", ObjectId(lead_id), "status_changed", new_status)
 
     return redirect(url_for("leads.leads"))
 
@@ -51,14 +60,10 @@ def convert_lead(lead_id):
     if "user_id" not in session:
         return redirect(url_for("auth.index"))
 
-    lead = mongo.db.leads.find_one({
-        "_id": ObjectId(lead_id),
-        "user_id": session["user_id"],
-    })
+    lead = leads_repo.get(session["user_id"], ObjectId(lead_id))
 
     if lead:
-        mongo.db.prospects.insert_one({
-            "user_id": session["user_id"],
+        prospect_id = prospects_repo.create(session["user_id"], {
             "lead_id": lead["_id"],
             "name": lead["name"],
             "company": lead["company"],
@@ -70,10 +75,10 @@ def convert_lead(lead_id):
             "created_at": datetime.utcnow(),
         })
 
-        mongo.db.leads.update_one(
-            {"_id": lead["_id"]},
-            {"$set": {"status": "Converted"}},
-        )
+        leads_repo.mark_converted(session["user_id"], lead["_id"])
+        bump_versions(session["user_id"], "leads", "prospects")
+        log_activity("lead", lead["_id"], "converted", lead["name"])
+        log_activity("prospect", prospect_id, "created", f"Converted from lead {lead['name']}")
 
     return redirect(url_for("prospects.prospects"))
 
@@ -83,9 +88,8 @@ def delete_lead(lead_id):
     if "user_id" not in session:
         return redirect(url_for("auth.index"))
 
-    mongo.db.leads.delete_one({
-        "_id": ObjectId(lead_id),
-        "user_id": session["user_id"],
-    })
+    leads_repo.delete(session["user_id"], ObjectId(lead_id))
+    bump_versions(session["user_id"], "leads")
+    log_activity("lead", ObjectId(lead_id), "deleted")
 
-    return redirect(url_for("leads.leads"))
\ No newline at end of file
+    return redirect(url_for("leads.leads"))
@@ -0,0 +1,93 @@
+from datetime import datetime
+
+from repositories import clients as clients_repo, leads as leads_repo
+from versions import bump_versions
+
+
+# Lead urgency score (0-100), stored on each open lead as `score` and read
+# through a (user_id, score) index. A lead scores high when it is worth a
+# lot (status, source, a company we already work with), is still fresh,
+# and has been sitting in its current status for a while.
+#
+# Scores drift with time, so besides rescoring a lead when it is created or
+# changes status, `flask score-leads` rescores every open lead in one NumPy
+# pass per user and only writes the scores that moved.
+
+STATUS_WEIGHTS = {"Hot": 1.0, "Warm": 0.6, "Cold": 0.3}
+SOURCE_WEIGHTS = {"Referral": 1.0, "LinkedIn": 0.7, "Website": 0.5}
+DEFAULT_SOURCE_WEIGHT = 0.4
+
+# Days after which a lead left in a status is considered stale; hot leads
+# cool down quickly, cold ones can wait
+STALE_DAYS = {"Hot": 3.0, "Warm": 7.0, "Cold": 14.0}
+
+RECENCY_HALF_LIFE_DAYS = 30.0
+KNOWN_COMPANY_BOOST = 1.25
+NO_COMPANY_FACTOR = 0.8
+
+
+def compute_scores(leads, client_companies, now):
+    """Vectorized scores for a list of lead documents."""
+    # Imported here: leads/routes.py loads this module at startup, and
+    # NumPy would add ~65 ms to every boot
+    import numpy as np
+
+    n = len(leads)
+    if not n:
+        return np.zeros(0)
+
+    statuses = [lead.get("status") for lead in leads]
+    status_w = np.array([STATUS_WEIGHTS.get(s, 0.3) for s in statuses])
+    source_w = np.array([SOURCE_WEIGHTS.get(lead.get("source"), DEFAULT_SOURCE_WEIGHT) for lead in leads])
+    stale_days = np.array([STALE_DAYS.get(s, 14.0) for s in statuses])
+
+    created = np.array([lead.get("created_at") or now for lead in leads], dtype="datetime64[s]")
+    changed = np.array([
+        lead.get("status_changed_at") or lead.get("created_at") or now
+        for lead in leads
+    ], dtype="datetime64[s]")
+    day = np.timedelta64(1, "D")
+    age_days = np.maximum((np.datetime64(now, "s") - created) / day, 0)
+    status_age_days = np.maximum((np.datetime64(now, "s") - changed) / day, 0)
+
+    companies = [(lead.get("company") or "").strip().lower() for lead in leads]
+    company_f = np.where(
+        np.array([c in client_companies for c in companies]),
+        KNOWN_COMPANY_BOOST,
+        np.where(np.array([bool(c) for c in companies]), 1.0, NO_COMPANY_FACTOR)
+    )
+
+    recency = np.exp2(-age_days / RECENCY_HALF_LIFE_DAYS)
+    staleness = 1 - np.exp(-status_age_days / stale_days)
+
+    raw = status_w * source_w * company_f * (0.5 + 0.5 * recency) * (0.4 + 0.6 * staleness)
+    top = STATUS_WEIGHTS["Hot"] * max(SOURCE_WEIGHTS.values()) * KNOWN_COMPANY_BOOST
+    return np.round(np.clip(raw / top, 0, 1) * 100, 1)
+
+
+def _client_companies(user_id):
+    return {
+        c.strip().lower()
+        for c in clients_repo.companies(user_id)
+        if isinstance(c, str) and c.strip()
+    }
+
+
+def score_leads(user_id, lead_ids=None):
+    """Rescore a user's open leads (or just `lead_ids`); returns how many changed."""
+    leads = leads_repo.open_for_scoring(user_id, lead_ids)
+    scores = compute_scores(leads, _client_companies(user_id), datetime.utcnow())
+
+    changed = [
+        (lead["_id"], float(score))
+        for lead, score in zip(leads, scores)
+        if lead.get("score") != float(score)
+    ]
+    if changed:
+        leads_repo.set_scores(user_id, changed)
+        bump_versions(user_id, "leads")
+    return len(changed)
+
+
+def score_all_leads():
+    return sum(score_leads(user_id) for user_id in leads_repo.owners())
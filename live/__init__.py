@@ -0,0 +1,5 @@
+from flask import Blueprint
+
+live_bp = Blueprint("live", __name__)
+
+from . import routes
@@ -0,0 +1,269 @@
+import queue
+import threading
+import time
+from datetime import datetime
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from extensions import mongo
+
+
+# Server errors meaning change streams will never work here (standalone
+# server, or one too old for $changeStream)
+CHANGE_STREAMS_UNSUPPORTED = {40573, 40324}
+
+
+def snapshot(db, user_id):
+    """Everything the live dashboard/project pages can patch, for one user."""
+    active_ids = [p["_id"] for p in db.projects.find(
+        {"user_id": user_id, "status": {"$ne": "Completed"}}, {"_id": 1}
+    )]
+
+    tasks = {}
+    progress = {str(project_id): [0, 0] for project_id in active_ids}
+    for t in db.tasks.find(
+        {"user_id": user_id, "project_id": {"$in": active_ids}},
+        {"status": 1, "project_id": 1}
+    ):
+        tasks[str(t["_id"])] = (str(t["project_id"]), t["status"])
+        counts = progress[str(t["project_id"])]
+        counts[1] += 1
+        if t["status"] == "Done":
+            counts[0] += 1
+
+    pipeline = list(db.prospects.aggregate([
+        {"$match": {"user_id": user_id}},
+        {"$group": {"_id": None, "total": {"$sum": "$value"}}}
+    ]))
+
+    stats = {
+        "active_projects": len(active_ids),
+        "pipeline": pipeline[0]["total"] if pipeline else 0,
+        "pending_tasks": db.tasks.count_documents({"user_id": user_id, "status": "Pending"}),
+        "overdue": overdue_counts(db, [user_id]).get(user_id, 0),
+    }
+
+    return {"tasks": tasks, "progress": progress, "stats": stats}
+
+
+def overdue_counts(db, user_ids):
+    today_str = datetime.utcnow().strftime("%Y-%m-%d")
+    return {row["_id"]: row["count"] for row in db.invoices.aggregate([
+        {"$match": {
+            "user_id": {"$in": user_ids},
+            "status": "Unpaid",
+            "due_date": {"$lt": today_str}
+        }},
+        {"$group": {"_id": "$user_id", "count": {"$sum": 1}}}
+    ])}
+
+
+def diff(old, new):
+    events = []
+
+    for task_id in old["tasks"].keys() | new["tasks"].keys():
+        old_status = old["tasks"].get(task_id, (None, None))[1]
+        if task_id in new["tasks"]:
+            status = new["tasks"][task_id][1]
+        elif old["tasks"][task_id][0] in new["progress"]:
+            status = None  # deleted
+        else:
+            continue  # its project was completed, the page locks instead
+        if status != old_status:
+            events.append(("task", {"task_id": task_id, "status": status}))
+
+    for project_id, (done, total) in new["progress"].items():
+        if old["progress"].get(project_id) != [done, total]:
+            events.append(("progress", {
+                "project_id": project_id,
+                "done": done,
+                "total": total,
+                "progress": int(done / total * 100) if total else 0,
+            }))
+
+    if old["stats"] != new["stats"]:
+        events.append(("stats", new["stats"]))
+
+    return events
+
+
+class LiveHub:
+    """One watcher thread per worker, fanning out to every open stream.
+
+    Every write route bumps the user's `data_versions` document, so that one
+    collection tells the hub whose data changed: it is watched with a change
+    stream where available, and polled otherwise (standalone servers).
+    Database work therefore scales with writes and users, not open tabs.
+
+    The watcher runs while anyone is subscribed. Starting it and letting it
+    stop are both decided under `_lock` together with the subscriber set,
+    so a new stream never ends up without a watcher.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+        self._snapshots = {}
+        self._versions = {}
+        self._thread = None
+        self.mode = None
+
+    def _start(self, config):
+        # Called with _lock held
+        if self._thread is not None:
+            return
+        self.poll_interval = config.get("LIVE_POLL_INTERVAL", 5)
+        self.overdue_interval = config.get("LIVE_OVERDUE_INTERVAL", 60)
+        self._thread = threading.Thread(target=self._run, name="live-hub", daemon=True)
+        self._thread.start()
+
+    def _should_stop(self):
+        with self._lock:
+            if self._subscribers:
+                return False
+            self._thread = None
+            return True
+
+    # ---------- Subscriptions ----------
+
+    def subscribe(self, user_id, config):
+        """A queue of (event, data) for `user_id`, or None at LIVE_MAX_STREAMS."""
+        q = queue.Queue(maxsize=100)
+        with self._lock:
+            if sum(map(len, self._subscribers.values())) >= config.get("LIVE_MAX_STREAMS", 24):
+                return None
+            first = user_id not in self._subscribers
+            self._subscribers.setdefault(user_id, set()).add(q)
+            self._start(config)
+
+        if first:
+            db = mongo.db
+            versions = db.data_versions.find_one({"_id": user_id})
+            current = snapshot(db, user_id)
+            with self._lock:
+                # Unless every stream for this user closed in the meantime
+                if user_id in self._subscribers:
+                    self._versions.setdefault(user_id, versions)
+                    self._snapshots.setdefault(user_id, current)
+        return q
+
+    def unsubscribe(self, user_id, q):
+        with self._lock:
+            queues = self._subscribers.get(user_id, set())
+            queues.discard(q)
+            if not queues:
+                self._subscribers.pop(user_id, None)
+                self._snapshots.pop(user_id, None)
+                self._versions.pop(user_id, None)
+
+    def catch_up(self, user_id):
+        """Every event needed to bring a freshly loaded page up to date."""
+        return diff({"tasks": {}, "progress": {}, "stats": None}, snapshot(mongo.db, user_id))
+
+    def publish(self, user_id, events):
+        with self._lock:
+            queues = list(self._subscribers.get(user_id, ()))
+        for q in queues:
+            for event in events:
+                try:
+                    q.put_nowait(event)
+                except queue.Full:
+                    # A stalled client; it resyncs on its next page load
+                    break
+
+    def refresh(self, user_id):
+        old = self._snapshots.get(user_id)
+        if old is None:
+            return
+        new = snapshot(mongo.db, user_id)
+        self._snapshots[user_id] = new
+        events = diff(old, new)
+        if events:
+            self.publish(user_id, events)
+
+    def users(self):
+        with self._lock:
+            return list(self._subscribers)
+
+    # ---------- Watcher ----------
+
+    def _run(self):
+        # Errors never end the watcher: it backs off and resumes, and only
+        # a server without change streams moves it to polling for good.
+        # _watch() and _poll() return once nobody is subscribed.
+        delay = 1
+        try:
+            while True:
+                started = time.monotonic()
+                try:
+                    if self.mode == "polling":
+                        self._poll()
+                    else:
+                        self.mode = "change_stream"
+                        self._watch()
+                    return
+                except OperationFailure as e:
+                    if self.mode == "change_stream" and e.code in CHANGE_STREAMS_UNSUPPORTED:
+                        print("LIVE: change streams unavailable, polling instead:", e)
+                        self.mode = "polling"
+                        continue
+                    print("LIVE ERROR:", e)
+                except Exception as e:
+                    print("LIVE ERROR:", repr(e))
+
+                delay = 1 if time.monotonic() - started > 60 else min(delay * 2, 30)
+                time.sleep(delay)
+        finally:
+            with self._lock:
+                # A replacement may already be running if this one stopped
+                if self._thread is threading.current_thread():
+                    self._thread = None
+
+    def _watch(self):
+        pipeline = [{"$match": {"operationType": {"$in": ["insert", "update", "replace"]}}}]
+        last_overdue = time.monotonic()
+
+        with mongo.db.data_versions.watch(pipeline, max_await_time_ms=1000) as stream:
+            while not self._should_stop():
+                change = stream.try_next()
+                if change is not None:
+                    user_id = change["documentKey"]["_id"]
+                    if user_id in self._snapshots:
+                        self.refresh(user_id)
+
+                if time.monotonic() - last_overdue >= self.overdue_interval:
+                    self._check_overdue()
+                    last_overdue = time.monotonic()
+
+    def _poll(self):
+        last_overdue = time.monotonic()
+
+        while not self._should_stop():
+            time.sleep(self.poll_interval)
+            try:
+                users = self.users()
+                if users:
+                    for doc in mongo.db.data_versions.find({"_id": {"$in": users}}):
+                        if doc != self._versions.get(doc["_id"]):
+                            self._versions[doc["_id"]] = doc
+                            self.refresh(doc["_id"])
+
+                if time.monotonic() - last_overdue >= self.overdue_interval:
+                    self._check_overdue()
+                    last_overdue = time.monotonic()
+            except PyMongoError as e:
+                print("LIVE POLL ERROR:", e)
+
+    def _check_overdue(self):
+        # Invoices turn overdue with the date, not with a write
+        users = self.users()
+        if not users:
+            return
+        counts = overdue_counts(mongo.db, users)
+        for user_id in users:
+            current = self._snapshots.get(user_id)
+            if current and current["stats"]["overdue"] != counts.get(user_id, 0):
+                self.refresh(user_id)
+
+
+hub = LiveHub()
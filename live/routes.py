@@ -0,0 +1,46 @@
+import json
+import queue
+
+from flask import Response, current_app, session
+
+from .hub import hub
+from . import live_bp
+
+
+@live_bp.route("/live/stream")
+def stream():
+    if "user_id" not in session:
+        return Response(status=401)
+
+    user_id = session["user_id"]
+    keepalive = current_app.config.get("LIVE_KEEPALIVE", 15)
+
+    q = hub.subscribe(user_id, current_app.config)
+
+    if q is None:
+        # Too many open streams on this worker: send the current state and
+        # close, so the browser polls by reconnecting after `retry`
+        retry = current_app.config.get("LIVE_FALLBACK_RETRY", 30) * 1000
+        body = f"retry: {retry}\n\n" + "".join(
+            f"event: {event}\ndata: {json.dumps(data)}\n\n" for event, data in hub.catch_up(user_id)
+        )
+        return Response(body, mimetype="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+    def events():
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    event, data = q.get(timeout=keepalive)
+                except queue.Empty:
+                    # Keeps proxies from closing the idle connection
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        finally:
+            hub.unsubscribe(user_id, q)
+
+    return Response(events(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
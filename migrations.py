@@ -0,0 +1,62 @@
+from pymongo import UpdateOne
+
+from extensions import mongo
+
+
+# ---------- Invoice References ----------
+
+def backfill_invoice_refs(batch_size=500):
+    """Attach client_id/project_id to invoices that only carry name strings.
+
+    Invoices that could not be matched get explicit None references, so a
+    rerun only picks up invoices it has never seen and can resume safely.
+    """
+    db = mongo.db
+    last_id = None
+    updated = 0
+
+    while True:
+        query = {"client_id": {"$exists": False}}
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+
+        batch = list(
+            db.invoices.find(query, {"user_id": 1, "client_name": 1, "project_title": 1})
+            .sort("_id", 1)
+            .limit(batch_size)
+        )
+        if not batch:
+            break
+
+        user_ids = list({inv["user_id"] for inv in batch})
+
+        # Oldest record wins when names repeat
+        clients = {}
+        for c in db.clients.find(
+            {"user_id": {"$in": user_ids}}, {"user_id": 1, "name": 1}
+        ).sort("_id", 1):
+            clients.setdefault((c["user_id"], c["name"]), c["_id"])
+
+        projects = {}
+        for p in db.projects.find(
+            {"user_id": {"$in": user_ids}}, {"user_id": 1, "client_id": 1, "title": 1}
+        ).sort("_id", 1):
+            projects.setdefault((p["user_id"], p.get("client_id"), p["title"]), p["_id"])
+
+        ops = []
+        for inv in batch:
+            client_id = clients.get((inv["user_id"], inv.get("client_name")))
+            project_id = None
+            if client_id is not None:
+                project_id = projects.get((inv["user_id"], client_id, inv.get("project_title")))
+
+            ops.append(UpdateOne(
+                {"_id": inv["_id"]},
+                {"$set": {"client_id": client_id, "project_id": project_id}}
+            ))
+
+        db.invoices.bulk_write(ops, ordered=False)
+        updated += len(ops)
+        last_id = batch[-1]["_id"]
+
+    return updated
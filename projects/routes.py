@@ -1,21 +1,23 @@
-from flask import render_template, session, redirect, url_for, request
+from flask import render_template, session, redirect, url_for, request, current_app
 from bson.objectid import ObjectId
 from datetime import datetime
 import json
-import google.generativeai as genai
 
-from extensions import mongo
+from repositories import clients as clients_repo, projects as projects_repo, tasks as tasks_repo
+from versions import bump_versions, conditional
+from timesheets.store import rollups, running_timers, pop_timer, drop_timers
+from activity.log import log_activity
+from clients.stats import inc_client_stats
+from .suggestions import project_terms, suggest_tasks
 from . import projects_bp
 
 @projects_bp.route("/clients/<client_id>/projects", methods=["GET", "POST"])
+@conditional("clients", "projects")
 def client_projects(client_id):
     if "user_id" not in session:
         return redirect(url_for("auth.index"))
 
-    client = mongo.db.clients.find_one({
-        "_id": ObjectId(client_id),
-        "user_id": session["user_id"]
-    })
+    client = clients_repo.get(session["user_id"], ObjectId(client_id))
 
     if not client:
         return redirect(url_for("clients.clients"))
@@ -24,36 +26,42 @@ def client_projects(client_id):
         deadline_raw = request.form.get("deadline")
         deadline = datetime.fromisoformat(deadline_raw) if deadline_raw else None
 
+        title = request.form.get("title")
         description = request.form.get("description", "").strip()
         use_ai = request.form.get("use_ai") == "on" and bool(description)
 
-        project_id = mongo.db.projects.insert_one({
-            "user_id": session["user_id"],
+        project_id = projects_repo.create(session["user_id"], {
             "client_id": ObjectId(client_id),
             "client_name": client["name"],
-            "title": request.form.get("title"),
+            "title": title,
             "description": description if description else None,
             "status": "Planning",
             "deadline": deadline,
             "ai_generated": False,
+            "terms": project_terms(title, description),
             "created_at": datetime.utcnow()
-        }).inserted_id
-
-        project = mongo.db.projects.find_one({"_id": project_id})
-        if use_ai and description and not project.get("ai_generated"):
+        })
+        inc_client_stats(session["user_id"], client["_id"], projects=1)
+
+        # Past projects like this one are offered on the project page
+        # instead, with Gemini one click away
+        if use_ai and not suggest_tasks(
+            session["user_id"],
+            {"_id": project_id, "title": title, "description": description},
+            limit=1
+        ):
             generate_tasks(
                 project_id=project_id,
                 description=description,
                 user_id=session["user_id"]
             )
-        mongo.db.projects.update_one({"_id": project_id},{"$set": {"ai_generated": True}})   
+        projects_repo.set_ai_generated(session["user_id"], project_id)
+        bump_versions(session["user_id"], "projects", "tasks")
+        log_activity("project", project_id, "created", request.form.get("title"), refs=[client["_id"]])
         return redirect(url_for("projects.project_detail", project_id=project_id))
 
 
-    projects = mongo.db.projects.find({
-        "user_id": session["user_id"],
-        "client_id": ObjectId(client_id)
-    })
+    projects = projects_repo.for_client(session["user_id"], ObjectId(client_id))
 
     return render_template(
         "projects.html",
@@ -61,87 +69,146 @@ def client_projects(client_id):
         client=client
     )
 @projects_bp.route("/projects/<project_id>")
+@conditional("projects", "tasks", "time")
 def project_detail(project_id):
     if "user_id" not in session:
         return redirect(url_for("auth.index"))
 
-    project = mongo.db.projects.find_one({
-        "_id": ObjectId(project_id),
-        "user_id": session["user_id"]
-    })
+    project = projects_repo.get(session["user_id"], ObjectId(project_id))
 
     if not project:
         return redirect(url_for("dashboard.dashboard"))
 
-    tasks = mongo.db.tasks.find({
-        "project_id": project["_id"],
-        "user_id": session["user_id"]
-    }).sort("status", -1)
+    tasks = tasks_repo.for_project(session["user_id"], project["_id"])
 
-    total_tasks = mongo.db.tasks.count_documents({
-        "project_id": project["_id"],
-        "user_id": session["user_id"]
-    })
-
-    done_tasks = mongo.db.tasks.count_documents({
-        "project_id": project["_id"],
-        "user_id": session["user_id"],
-        "status": "Done"
-    })
+    total_tasks = len(tasks)
+    done_tasks = sum(1 for t in tasks if t["status"] == "Done")
 
     progress = int((done_tasks / total_tasks) * 100) if total_tasks else 0
 
+    # Estimated vs tracked time, read from precomputed rollups
+    actual = rollups(session["user_id"], "task", [t["_id"] for t in tasks])
+    project_actual = rollups(session["user_id"], "project", [project["_id"]])
+    timers = running_timers(session["user_id"], project["_id"])
+
+    suggestions = []
+    if not tasks and project["status"] != "Completed":
+        suggestions = suggest_tasks(session["user_id"], project)
+
     return render_template(
         "project_detail.html",
         project=project,
         tasks=tasks,
         progress=progress,
         total_tasks=total_tasks,
-        done_tasks=done_tasks
+        done_tasks=done_tasks,
+        actual=actual,
+        timers=timers,
+        suggestions=suggestions,
+        estimated_hours=sum(t.get("hours", 0) for t in tasks),
+        actual_hours=project_actual.get(project["_id"], 0) / 3600
     )
 @projects_bp.route("/projects/<project_id>/tasks/add", methods=["POST"])
 def add_task(project_id):
     if "user_id" not in session:
         return redirect(url_for("auth.index"))
 
-    project = mongo.db.projects.find_one({
-        "_id": ObjectId(project_id),
-        "user_id": session["user_id"]
-    })
+    project = projects_repo.get(session["user_id"], ObjectId(project_id), {"client_id": 1, "status": 1})
 
     if not project or project["status"] == "Completed":
         return redirect(url_for("projects.project_detail", project_id=project_id))
 
-    mongo.db.tasks.insert_one({
-        "user_id": session["user_id"],
+    hours = float(request.form.get("hours", 0))
+    tasks_repo.create(session["user_id"], {
         "project_id": ObjectId(project_id),
         "description": request.form.get("description"),
-        "hours": float(request.form.get("hours", 0)),
+        "hours": hours,
         "status": "Pending",
         "created_at": datetime.utcnow()
     })
+    bump_versions(session["user_id"], "tasks")
+    log_activity("project", project["_id"], "task_added", request.form.get("description"))
+
+    return redirect(url_for("projects.project_detail", project_id=project_id))
+
+@projects_bp.route("/projects/<project_id>/tasks/suggested", methods=["POST"])
+def use_suggested_tasks(project_id):
+    if "user_id" not in session:
+        return redirect(url_for("auth.index"))
+
+    source_id = request.form.get("source_id", "")
+    if not ObjectId.is_valid(source_id):
+        return redirect(url_for("projects.project_detail", project_id=project_id))
+
+    project = projects_repo.get(session["user_id"], ObjectId(project_id), {"client_id": 1, "status": 1})
+
+    # Only offered while the project has no tasks; a resubmit would duplicate them
+    if not project or project["status"] == "Completed" or tasks_repo.has_tasks(session["user_id"], project["_id"]):
+        return redirect(url_for("projects.project_detail", project_id=project_id))
+
+    source = tasks_repo.for_past_project(
+        session["user_id"],
+        ObjectId(source_id),
+        request.form.get("archived") == "1"
+    )
+    tasks_repo.create_many(session["user_id"], [{
+        "project_id": project["_id"],
+        "description": t.get("description"),
+        "hours": t.get("hours", 0),
+        "status": "Pending",
+        "created_at": datetime.utcnow()
+    } for t in source])
+    bump_versions(session["user_id"], "tasks")
+    log_activity("project", project["_id"], "tasks_suggested", f"{len(source)} tasks")
 
     return redirect(url_for("projects.project_detail", project_id=project_id))
 
+@projects_bp.route("/projects/<project_id>/tasks/generate", methods=["POST"])
+def generate_project_tasks(project_id):
+    if "user_id" not in session:
+        return redirect(url_for("auth.index"))
+
+    project = projects_repo.get(session["user_id"], ObjectId(project_id))
+
+    if not project or project["status"] == "Completed" or tasks_repo.has_tasks(session["user_id"], project["_id"]):
+        return redirect(url_for("projects.project_detail", project_id=project_id))
+
+    generate_tasks(
+        project_id=project["_id"],
+        description=project.get("description"),
+        user_id=session["user_id"]
+    )
+    bump_versions(session["user_id"], "tasks")
+    log_activity("project", project["_id"], "tasks_generated")
+
+    return redirect(url_for("projects.project_detail", project_id=project_id))
+
+def load_task(task_id):
+    # Tasks on completed projects are read-only
+    task = tasks_repo.get(session["user_id"], ObjectId(task_id))
+    if not task:
+        return None, None
+
+    project = projects_repo.get(session["user_id"], task["project_id"], {"client_id": 1, "status": 1})
+    return task, project
+
 @projects_bp.route("/tasks/<task_id>/toggle")
 def toggle_task(task_id):
     if "user_id" not in session:
         return redirect(url_for("auth.index"))
 
-    task = mongo.db.tasks.find_one({"_id": ObjectId(task_id),"user_id": session["user_id"]})
+    task, project = load_task(task_id)
     if not task:
         return redirect(url_for("dashboard.dashboard"))
-    
-    project = mongo.db.projects.find_one({"_id": task["project_id"]})
-    if project["status"] == "Completed":
+
+    if not project or project["status"] == "Completed":
         return redirect(url_for("projects.project_detail", project_id=task["project_id"]))
 
     new_status = "Done" if task["status"] == "Pending" else "Pending"
 
-    mongo.db.tasks.update_one(
-        {"_id": task["_id"]},
-        {"$set": {"status": new_status}}
-    )
+    tasks_repo.update(session["user_id"], task["_id"], {"status": new_status})
+    bump_versions(session["user_id"], "tasks")
+    log_activity("project", task["project_id"], f"task_{new_status.lower()}", task.get("description"))
 
     return redirect(url_for(
         "projects.project_detail",
@@ -153,21 +220,20 @@ def edit_task(task_id):
     if "user_id" not in session:
         return redirect(url_for("auth.index"))
 
-    task = mongo.db.tasks.find_one({"_id": ObjectId(task_id),"user_id": session["user_id"]})
+    task, project = load_task(task_id)
     if not task:
         return redirect(url_for("dashboard.dashboard"))
-    
-    project = mongo.db.projects.find_one({"_id": task["project_id"]})
-    if project["status"] == "Completed":
+
+    if not project or project["status"] == "Completed":
         return redirect(url_for("projects.project_detail", project_id=task["project_id"]))
 
-    mongo.db.tasks.update_one(
-        {"_id": task["_id"]},
-        {"$set": {
-            "description": request.form.get("description"),
-            "hours": float(request.form.get("hours", 0))
-        }}
-    )
+    hours = float(request.form.get("hours", 0))
+    tasks_repo.update(session["user_id"], task["_id"], {
+        "description": request.form.get("description"),
+        "hours": hours
+    })
+    bump_versions(session["user_id"], "tasks")
+    log_activity("project", task["project_id"], "task_edited", request.form.get("description"))
 
     return redirect(url_for(
         "projects.project_detail",
@@ -179,15 +245,17 @@ def delete_task(task_id):
     if "user_id" not in session:
         return redirect(url_for("auth.index"))
 
-    task = mongo.db.tasks.find_one({"_id": ObjectId(task_id),"user_id": session["user_id"]})
+    task, project = load_task(task_id)
     if not task:
         return redirect(url_for("dashboard.dashboard"))
-    
-    project = mongo.db.projects.find_one({"_id": task["project_id"]})
-    if project["status"] == "Completed":
+
+    if not project or project["status"] == "Completed":
         return redirect(url_for("projects.project_detail", project_id=task["project_id"]))
 
-    mongo.db.tasks.delete_one({"_id": task["_id"]})
+    tasks_repo.delete(session["user_id"], task["_id"])
+    pop_timer(session["user_id"], task["_id"])
+    bump_versions(session["user_id"], "tasks", "time")
+    log_activity("project", task["project_id"], "task_deleted", task.get("description"))
 
     return redirect(url_for(
         "projects.project_detail",
@@ -199,23 +267,25 @@ def complete_project(project_id):
     if "user_id" not in session:
         return redirect(url_for("auth.index"))
 
-    project = mongo.db.projects.find_one({
-        "_id": ObjectId(project_id),
-        "user_id": session["user_id"]
-    })
+    project = projects_repo.get(
+        session["user_id"],
+        ObjectId(project_id),
+        {"client_id": 1, "title": 1, "status": 1}
+    )
 
     if not project:
         return redirect(url_for("dashboard.dashboard"))
 
-    mongo.db.projects.update_one(
-        {"_id": project["_id"]},
-        {"$set": {"status": "Completed"}}
-    )
+    projects_repo.complete(session["user_id"], project["_id"])
+    if project["status"] != "Completed":
+        inc_client_stats(session["user_id"], project.get("client_id"), projects_completed=1)
+    bump_versions(session["user_id"], "projects")
+    log_activity("project", project["_id"], "completed", project["title"], refs=[project["client_id"]])
 
     return redirect(url_for(
         "invoices.invoices",
-        prefill_client=project["client_name"],
-        prefill_project=project["title"]
+        prefill_client=str(project["client_id"]),
+        prefill_project=str(project["_id"])
     ))
 
 @projects_bp.route("/projects/<project_id>/delete")
@@ -223,32 +293,51 @@ def delete_project(project_id):
     if "user_id" not in session:
         return redirect(url_for("auth.index"))
 
-    project = mongo.db.projects.find_one({
-        "_id": ObjectId(project_id),
-        "user_id": session["user_id"]
-    })
+    project = projects_repo.get(
+        session["user_id"],
+        ObjectId(project_id),
+        {"client_id": 1, "title": 1, "status": 1}
+    )
 
-    if project:
-        # delete tasks first
-        mongo.db.tasks.delete_many({
-            "project_id": project["_id"],
-            "user_id": session["user_id"]
-        })
+    if not project:
+        return redirect(url_for("clients.clients"))
 
-        # delete project
-        mongo.db.projects.delete_one({
-            "_id": project["_id"]
-        })
+    # delete tasks (and their running timers) first
+    tasks_repo.delete_for_projects(session["user_id"], [project["_id"]])
+    drop_timers(session["user_id"], [project["_id"]])
+
+    # delete project
+    projects_repo.delete(session["user_id"], project["_id"])
+    inc_client_stats(
+        session["user_id"],
+        project.get("client_id"),
+        projects=-1,
+        projects_completed=-1 if project["status"] == "Completed" else 0
+    )
+    bump_versions(session["user_id"], "projects", "tasks", "time")
+    log_activity("project", project["_id"], "deleted", project["title"], refs=[project["client_id"]])
 
     return redirect(url_for(
         "projects.client_projects",
         client_id=project["client_id"]
     ))
 
+_genai = None
+
+def gemini_model():
+    # The Gemini SDK takes most of the app's import time, so it is only
+    # loaded and configured once the first AI request comes in
+    global _genai
+    if _genai is None:
+        import google.generativeai as genai
+        genai.configure(api_key=current_app.config.get("GEMINI_API_KEY"))
+        _genai = genai
+    return _genai.GenerativeModel("gemini-2.5-flash")
+
 def generate_tasks(project_id, description, user_id):
     if not description:
         return
-    model = genai.GenerativeModel("gemini-2.5-flash")
+    model = gemini_model()
 
     prompt = f"""
     Break this project into an appropriate number of concrete technical tasks.
@@ -277,15 +366,13 @@ def generate_tasks(project_id, description, user_id):
 
         tasks = json.loads(text[start:end + 1])
 
-        for t in tasks:
-            mongo.db.tasks.insert_one({
-                "user_id": user_id,
-                "project_id": project_id,
-                "description": t.get("task"),
-                "hours": float(t.get("hours", 1)),
-                "status": "Pending",
-                "created_at": datetime.utcnow()
-            })
+        tasks_repo.create_many(user_id, [{
+            "project_id": project_id,
+            "description": t.get("task"),
+            "hours": float(t.get("hours", 1)),
+            "status": "Pending",
+            "created_at": datetime.utcnow()
+        } for t in tasks])
 
     except Exception as e:
         print("AI ERROR:", e)
@@ -295,9 +382,10 @@ def undo_project(project_id):
     if "user_id" not in session:
         return redirect(url_for("auth.index"))
 
-    mongo.db.projects.update_one(
-        {"_id": ObjectId(project_id), "user_id": session["user_id"]},
-        {"$set": {"status": "Planning"}}
-    )
+    project = projects_repo.reopen(session["user_id"], ObjectId(project_id))
+    if project and project["status"] == "Completed":
+        inc_client_stats(session["user_id"], project.get("client_id"), projects_completed=-1)
+    bump_versions(session["user_id"], "projects")
+    log_activity("project", ObjectId(project_id), "reopened")
 
-    return redirect(url_for("projects.project_detail", project_id=project_id))
\ No newline at end of file
+    return redirect(url_for("projects.project_detail", project_id=project_id))
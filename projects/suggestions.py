@@ -0,0 +1,110 @@
+import re
+import zlib
+
+from bson.binary import Binary
+
+from repositories import projects as projects_repo, tasks as tasks_repo
+
+
+# Task suggestions from the user's own completed projects, so a repeat kind
+# of job gets a task list without a Gemini call.
+#
+# Each project stores `terms`: its title and description as hashed word and
+# word-pair features, packed as sorted uint16 (2 bytes per feature). It is
+# written when the project is created, so the index grows with no rebuild.
+# A lookup loads the terms of the user's completed projects (archived ones
+# included), weights them with TF-IDF over that set and ranks by cosine
+# similarity, all in NumPy. NumPy is imported in the functions that use
+# it, since projects/routes.py loads this module at startup.
+
+STOP_WORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "into",
+    "is", "it", "of", "on", "or", "our", "the", "their", "this", "to", "we",
+    "with", "will", "you", "your", "new", "project",
+}
+
+MIN_SCORE = 0.2
+
+
+def _features(text):
+    words = [w for w in re.findall(r"[a-z0-9]+", (text or "").lower()) if w not in STOP_WORDS and len(w) > 1]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def hash_terms(text):
+    """Sorted uint16 feature hashes of `text`, repeated once per occurrence."""
+    import numpy as np
+
+    return np.sort(np.array(
+        [zlib.crc32(f.encode("utf-8")) & 0xFFFF for f in _features(text)],
+        dtype=np.uint16
+    ))
+
+
+def project_terms(title, description):
+    return Binary(hash_terms(f"{title or ''} {description or ''}").tobytes())
+
+
+def rank(query, docs, limit=3, min_score=MIN_SCORE):
+    """(index, score) of the `docs` (uint16 arrays) most similar to `query`."""
+    import numpy as np
+
+    if not len(query) or not docs:
+        return []
+
+    # Sparse (row, feature, count) triples; the query is the last row
+    n = len(docs)
+    rows = np.repeat(np.arange(n + 1), [len(d) for d in docs] + [len(query)])
+    pairs = (rows << 16) | np.concatenate(docs + [query]).astype(np.int64)
+    pairs, counts = np.unique(pairs, return_counts=True)
+    rows, features = pairs >> 16, pairs & 0xFFFF
+    past = rows < n
+
+    # IDF over the past projects only, the query just borrows it
+    df = np.bincount(features[past], minlength=1 << 16)
+    idf = np.log((1 + n) / (1 + df)) + 1
+    weights = np.log1p(counts) * idf[features]
+    norms = np.sqrt(np.bincount(rows, weights ** 2, minlength=n + 1))
+
+    q = np.zeros(1 << 16)
+    q[features[~past]] = weights[~past] / max(norms[n], 1e-9)
+    scores = np.bincount(rows[past], weights[past] * q[features[past]], minlength=n) / np.maximum(norms[:n], 1e-9)
+    top = np.argsort(-scores, kind="stable")[:limit]
+    return [(int(i), float(scores[i])) for i in top if scores[i] >= min_score]
+
+
+def suggest_tasks(user_id, project, limit=3):
+    """Similar completed projects with their task lists, best match first."""
+    import numpy as np
+
+    past = [p for p in projects_repo.completed_with_terms(user_id) if p["_id"] != project["_id"]]
+    query = hash_terms(f"{project.get('title') or ''} {project.get('description') or ''}")
+
+    suggestions = []
+    # A few extra candidates, since some past projects have no tasks
+    for i, score in rank(query, [np.frombuffer(p["terms"], dtype=np.uint16) for p in past], limit * 2):
+        tasks = tasks_repo.for_past_project(user_id, past[i]["_id"], past[i].get("archived"))
+        if tasks:
+            suggestions.append({
+                "project": past[i],
+                "score": round(score * 100),
+                "tasks": tasks,
+                "hours": sum(t.get("hours", 0) for t in tasks),
+            })
+        if len(suggestions) == limit:
+            break
+    return suggestions
+
+
+def index_projects(user_id=None):
+    """Store `terms` on projects created before suggestions existed."""
+    changed = 0
+    for owner in [user_id] if user_id else projects_repo.owners():
+        for project in projects_repo.missing_terms(owner):
+            projects_repo.set_terms(
+                owner, project["_id"],
+                project_terms(project.get("title"), project.get("description")),
+                project.get("archived", False)
+            )
+            changed += 1
+    return changed
@@ -2,17 +2,20 @@ from flask import render_template, session, redirect, url_for, request
 from bson.objectid import ObjectId
 from datetime import datetime
 
-from extensions import mongo
+from repositories import clients as clients_repo, prospects as prospects_repo
+from versions import bump_versions, conditional
+from activity.log import log_activity
+from clients.stats import empty_stats
 from . import prospects_bp
 
 @prospects_bp.route("/prospects", methods=["GET", "POST"])
+@conditional("prospects")
 def prospects():
     if "user_id" not in session:
         return redirect(url_for("auth.index"))
 
     if request.method == "POST":
-        mongo.db.prospects.insert_one({
-            "user_id": session["user_id"],
+        prospect_id = prospects_repo.create(session["user_id"], {
             "name": request.form.get("name"),
             "company": request.form.get("company"),
             "email": request.form.get("email"),
@@ -21,11 +24,11 @@ def prospects():
             "value": float(request.form.get("value", 0)),
             "created_at": datetime.utcnow()
         })
+        bump_versions(session["user_id"], "prospects")
+        log_activity("prospect", prospect_id, "created", request.form.get("name"))
         return redirect(url_for("prospects.prospects"))
 
-    user_prospects = mongo.db.prospects.find({
-        "user_id": session["user_id"]
-    })
+    user_prospects = prospects_repo.list_all(session["user_id"])
 
     return render_template(
         "prospects.html",
@@ -49,13 +52,19 @@ def update_prospect_stage(prospect_id):
         "Won": 100
     }
 
-    mongo.db.prospects.update_one(
-        {"_id": ObjectId(prospect_id), "user_id": session["user_id"]},
-        {"$set": {
+    # Same round trip as update_one, but returns the stage being left
+    previous = prospects_repo.update_returning(
+        session["user_id"],
+        ObjectId(prospect_id),
+        {
             "stage": new_stage,
             "probability": probability_map.get(new_stage, 10)
-        }}
+        },
+        {"stage": 1}
     )
+    bump_versions(session["user_id"], "prospects")
+    if previous:
+        log_activity("prospect", previous["_id"], "stage_changed", f"{previous.get('stage')} → {new_stage}")
 
     return redirect(url_for("prospects.prospects"))
 
@@ -65,12 +74,11 @@ def update_prospect_value(prospect_id):
     if "user_id" not in session:
         return redirect(url_for("auth.index"))
 
-    mongo.db.prospects.update_one(
-        {"_id": ObjectId(prospect_id), "user_id": session["user_id"]},
-        {"$set": {
-            "value": float(request.form.get("value", 0))
-        }}
-    )
+    prospects_repo.update(session["user_id"], ObjectId(prospect_id), {
+        "value": float(request.form.get("value", 0))
+    })
+    bump_versions(session["user_id"], "prospects")
+    log_activity("prospect", ObjectId(prospect_id), "value_changed", request.form.get("value"))
 
     return redirect(url_for("prospects.prospects"))
 
@@ -80,10 +88,9 @@ def delete_prospect(prospect_id):
     if "user_id" not in session:
         return redirect(url_for("auth.index"))
 
-    mongo.db.prospects.delete_one({
-        "_id": ObjectId(prospect_id),
-        "user_id": session["user_id"]
-    })
+    prospects_repo.delete(session["user_id"], ObjectId(prospect_id))
+    bump_versions(session["user_id"], "prospects")
+    log_activity("prospect", ObjectId(prospect_id), "deleted")
 
     return redirect(url_for("prospects.prospects"))
 
@@ -92,14 +99,14 @@ def convert_prospect(prospect_id):
     if "user_id" not in session:
         return redirect(url_for("auth.index"))
 
-    prospect = mongo.db.prospects.find_one({
-        "_id": ObjectId(prospect_id),
-        "user_id": session["user_id"]
-    })
+    prospect = prospects_repo.get(
+        session["user_id"],
+        ObjectId(prospect_id),
+        {"name": 1, "company": 1, "email": 1, "value": 1}
+    )
 
     if prospect:
-        mongo.db.clients.insert_one({
-            "user_id": session["user_id"],
+        client_id = clients_repo.create(session["user_id"], {
             "prospect_id": prospect["_id"],
             "name": prospect["name"],
             "company": prospect["company"],
@@ -107,12 +114,13 @@ def convert_prospect(prospect_id):
             "contract_value": prospect.get("value", 0),
             "status": "Active",
             "billing_terms": "50% Upfront",
+            "stats": empty_stats(),
             "created_at": datetime.utcnow()
         })
 
-        mongo.db.prospects.update_one(
-            {"_id": prospect["_id"]},
-            {"$set": {"stage": "Won", "probability": 100}}
-        )
+        prospects_repo.update(session["user_id"], prospect["_id"], {"stage": "Won", "probability": 100})
+        bump_versions(session["user_id"], "prospects", "clients")
+        log_activity("prospect", prospect["_id"], "won", prospect["name"])
+        log_activity("client", client_id, "created", f"Won from prospect {prospect['name']}")
 
     return redirect(url_for("clients.clients"))
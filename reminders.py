@@ -0,0 +1,165 @@
+import smtplib
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from email.utils import formataddr, make_msgid
+
+from bson.objectid import ObjectId
+from flask import current_app, render_template
+from pymongo import UpdateOne
+
+from extensions import mongo
+from versions import bump_versions
+from activity.log import log_activity
+
+
+# Overdue invoice reminders, sent to the client's email address.
+#
+# Each batch is one indexed query over unpaid overdue invoices, one claim
+# (update_many stamping last_reminded_at and a run id, so two dispatchers
+# never mail the same invoice), one lookup each for clients, senders and
+# business profiles, and one SMTP connection for all of its messages.
+# Invoices whose message fails are un-claimed and retried on the next run.
+
+PROJECTION = {
+    "user_id": 1, "client_id": 1, "client_name": 1, "project_title": 1,
+    "invoice_number": 1, "amount": 1, "due_date": 1, "last_reminded_at": 1,
+}
+
+
+def _due_query(today, resend_before):
+    return {
+        "status": "Unpaid",
+        "due_date": {"$lt": today, "$nin": [None, ""]},
+        "$or": [
+            {"last_reminded_at": {"$exists": False}},
+            {"last_reminded_at": {"$lt": resend_before}},
+        ],
+    }
+
+
+def _by_id(collection, ids, projection):
+    return {doc["_id"]: doc for doc in collection.find({"_id": {"$in": list(ids)}}, projection)}
+
+
+def _message(invoice, client, user, profile, today):
+    config = current_app.config
+    sender = (profile or {}).get("business_name") or (user or {}).get("username") or "StudioBase"
+    context = {
+        "invoice": invoice,
+        "client": client,
+        "sender": sender,
+        "profile": profile or {},
+        "days_overdue": (
+            datetime.strptime(today, "%Y-%m-%d") - datetime.strptime(invoice["due_date"], "%Y-%m-%d")
+        ).days,
+    }
+
+    msg = EmailMessage()
+    msg["Subject"] = f"Payment reminder: invoice {invoice['invoice_number']} is overdue"
+    msg["From"] = formataddr((sender, config["MAIL_FROM"]))
+    msg["To"] = formataddr((client.get("name") or "", client["email"]))
+    if user and user.get("email"):
+        msg["Reply-To"] = user["email"]
+    msg["Message-ID"] = make_msgid(domain=config["MAIL_FROM"].rpartition("@")[2] or None)
+    msg.set_content(render_template("email/invoice_reminder.txt", **context))
+    msg.add_alternative(render_template("email/invoice_reminder.html", **context), subtype="html")
+    return msg
+
+
+def _connect():
+    config = current_app.config
+    smtp = smtplib.SMTP(config["SMTP_HOST"], config["SMTP_PORT"], timeout=30)
+    if config.get("SMTP_USE_TLS"):
+        smtp.starttls()
+    if config.get("SMTP_USERNAME"):
+        smtp.login(config["SMTP_USERNAME"], config["SMTP_PASSWORD"])
+    return smtp
+
+
+def dispatch_reminders(batch_size=500, resend_days=7, dry_run=False):
+    """Send one reminder per overdue invoice, at most every `resend_days`."""
+    db = mongo.db
+    now = datetime.utcnow()
+    today = now.strftime("%Y-%m-%d")
+    resend_before = now - timedelta(days=resend_days)
+    run_id = ObjectId()
+    stats = {"sent": 0, "skipped": 0, "failed": 0}
+    last_id = None
+
+    while True:
+        query = _due_query(today, resend_before)
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+
+        batch = list(db.invoices.find(query, PROJECTION).sort("_id", 1).limit(batch_size))
+        if not batch:
+            return stats
+        last_id = batch[-1]["_id"]
+
+        clients = _by_id(db.clients, {inv["client_id"] for inv in batch if inv.get("client_id")}, {"name": 1, "email": 1})
+        # Nobody to remind without a client email
+        batch = [inv for inv in batch if (clients.get(inv.get("client_id")) or {}).get("email")]
+        if not batch:
+            continue
+        if dry_run:
+            stats["sent"] += len(batch)
+            continue
+
+        # Connect before claiming, so an unreachable server leaves nothing claimed
+        smtp = _connect()
+
+        ids = [inv["_id"] for inv in batch]
+        claim = dict(_due_query(today, resend_before), _id={"$in": ids})
+        db.invoices.update_many(claim, {"$set": {"last_reminded_at": now, "reminder_run": run_id}})
+        claimed = {doc["_id"] for doc in db.invoices.find({"_id": {"$in": ids}, "reminder_run": run_id}, {"_id": 1})}
+        stats["skipped"] += len(batch) - len(claimed)
+        batch = [inv for inv in batch if inv["_id"] in claimed]
+        if not batch:
+            smtp.quit()
+            continue
+
+        user_ids = {inv["user_id"] for inv in batch}
+        users = _by_id(db.users, [ObjectId(uid) for uid in user_ids], {"email": 1, "username": 1})
+        profiles = {
+            p["user_id"]: p
+            for p in db.business_profile.find({"user_id": {"$in": list(user_ids)}}, {"user_id": 1, "business_name": 1, "phone": 1})
+        }
+
+        sent = []
+        try:
+            for inv in batch:
+                try:
+                    msg = _message(inv, clients[inv["client_id"]], users.get(ObjectId(inv["user_id"])), profiles.get(inv["user_id"]), today)
+                    smtp.send_message(msg)
+                    sent.append(inv)
+                except Exception as e:
+                    print("REMINDER ERROR:", inv["invoice_number"], e)
+                    if isinstance(e, (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)):
+                        smtp = _connect()
+        finally:
+            try:
+                smtp.quit()
+            except OSError:
+                pass
+
+            # Un-claim everything not sent, including the rest of the batch
+            # when a reconnect fails, so the next run retries it
+            sent_ids = {inv["_id"] for inv in sent}
+            unsent = [inv for inv in batch if inv["_id"] not in sent_ids]
+            if unsent:
+                db.invoices.bulk_write([
+                    UpdateOne(
+                        {"_id": inv["_id"], "reminder_run": run_id},
+                        {"$set": {"last_reminded_at": inv["last_reminded_at"]}}
+                        if inv.get("last_reminded_at") else {"$unset": {"last_reminded_at": ""}}
+                    )
+                    for inv in unsent
+                ], ordered=False)
+
+        for inv in sent:
+            log_activity("invoice", inv["_id"], "reminded", inv["invoice_number"], refs=[inv["client_id"]], user_id=inv["user_id"])
+        for uid in {inv["user_id"] for inv in batch}:
+            bump_versions(uid, "invoices")
+
+        stats["sent"] += len(sent)
+        stats["failed"] += len(batch) - len(sent)
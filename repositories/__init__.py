@@ -0,0 +1,61 @@
+import ast
+import inspect
+import sys
+
+
+# One module per collection. Every query a route makes goes through these
+# functions, which always filter on user_id (the shard key, see
+# indexes.shard_collections) and only project the fields their callers use.
+# Reads go through read_db() so read routing still applies; writes go to
+# the primary.
+#
+# Domain services (activity/log.py, timesheets/store.py, clients/stats.py,
+# ...) also hold their own queries; only route modules are held to this.
+
+# Collections holding per-user documents, all sharded on hashed user_id
+USER_SCOPED_COLLECTIONS = [
+    "business_profile",
+    "leads",
+    "prospects",
+    "clients",
+    "projects",
+    "tasks",
+    "invoices",
+    "projects_archive",
+    "tasks_archive",
+    "invoices_archive",
+    "time_buckets",
+    "time_rollups",
+    "running_timers",
+    "activity",
+]
+
+
+def direct_access_violations(app):
+    """(module, line, what) for every route module that queries Mongo itself."""
+    modules = {
+        view.__module__
+        for endpoint, view in app.view_functions.items()
+        if "." in endpoint
+    }
+
+    found = []
+    for name in sorted(modules):
+        module = sys.modules[name]
+        tree = ast.parse(inspect.getsource(module))
+        for node in ast.walk(tree):
+            if (
+                isinstance(node, ast.Attribute) and node.attr == "db"
+                and isinstance(node.value, ast.Name) and node.value.id == "mongo"
+            ):
+                found.append((name, node.lineno, "mongo.db"))
+            elif (
+                isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+                and node.func.id == "read_db"
+            ):
+                found.append((name, node.lineno, "read_db()"))
+            elif isinstance(node, ast.ImportFrom) and node.module == "extensions":
+                for alias in node.names:
+                    if alias.name in ("mongo", "read_db"):
+                        found.append((name, node.lineno, f"import {alias.name}"))
+    return found
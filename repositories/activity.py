@@ -0,0 +1,15 @@
+from extensions import read_db
+
+
+FIELDS = {"entity_type": 1, "entity_id": 1, "action": 1, "summary": 1, "created_at": 1}
+
+
+def timeline(user_id, entity_type=None, entity_id=None, limit=200):
+    """Newest entries for the account, or for one entity and what refers to it."""
+    query = {"user_id": user_id}
+    if entity_type:
+        query["$or"] = [
+            {"entity_type": entity_type, "entity_id": entity_id},
+            {"refs": entity_id},
+        ]
+    return read_db().activity.find(query, FIELDS).sort("created_at", -1).limit(limit)
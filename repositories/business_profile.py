@@ -0,0 +1,30 @@
+from datetime import datetime
+from pymongo import ReturnDocument
+
+from extensions import mongo, read_db
+
+
+FIELDS = {"business_name": 1, "address": 1, "phone": 1, "gstin": 1}
+
+
+def get(user_id, fields=FIELDS):
+    return read_db().business_profile.find_one({"user_id": user_id}, fields)
+
+
+def exists(user_id):
+    return get(user_id, {"_id": 1}) is not None
+
+
+def save(user_id, data):
+    profile = mongo.db.business_profile.find_one_and_update(
+        {"user_id": user_id},
+        {"$set": data, "$setOnInsert": {"created_at": datetime.utcnow()}},
+        upsert=True,
+        projection={"_id": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    return profile["_id"]
+
+
+def delete_all(user_id):
+    mongo.db.business_profile.delete_many({"user_id": user_id})
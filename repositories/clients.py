@@ -0,0 +1,64 @@
+from pymongo import UpdateOne
+
+from extensions import mongo, read_db
+
+
+NAME_FIELDS = {"name": 1}
+LIST_FIELDS = {"name": 1, "company": 1, "email": 1, "contract_value": 1, "status": 1, "stats": 1}
+
+# Sort keys accepted by the client list; every one is backed by an index
+SORTS = {
+    "name": [("name", 1)],
+    "invoiced": [("stats.invoiced", -1)],
+    "paid": [("stats.paid", -1)],
+    "outstanding": [("stats.outstanding", -1)],
+    "overdue": [("stats.overdue", -1)],
+    "projects": [("stats.projects", -1)],
+    "hours": [("stats.task_hours", -1)],
+}
+
+
+def create(user_id, doc):
+    return mongo.db.clients.insert_one(dict(doc, user_id=user_id)).inserted_id
+
+
+def get(user_id, client_id, fields=NAME_FIELDS):
+    return read_db().clients.find_one({"_id": client_id, "user_id": user_id}, fields)
+
+
+def list_all(user_id, sort="name"):
+    return read_db().clients.find({"user_id": user_id}, LIST_FIELDS).sort(SORTS[sort])
+
+
+def names(user_id):
+    return read_db().clients.find({"user_id": user_id}, {"name": 1})
+
+
+def companies(user_id):
+    return read_db().clients.distinct("company", {"user_id": user_id})
+
+
+def delete(user_id, client_id):
+    mongo.db.clients.delete_one({"_id": client_id, "user_id": user_id})
+
+
+# ---------- Stats (clients/stats.py) ----------
+
+def inc_stats(user_id, client_id, changes):
+    mongo.db.clients.update_one({"_id": client_id, "user_id": user_id}, {"$inc": changes})
+
+
+def set_stats(user_id, stats_by_client):
+    """Set fields under `stats` for each {client_id: {field: value}}."""
+    if stats_by_client:
+        mongo.db.clients.bulk_write([
+            UpdateOne(
+                {"_id": client_id, "user_id": user_id},
+                {"$set": {f"stats.{name}": value for name, value in stats.items()}}
+            )
+            for client_id, stats in stats_by_client.items()
+        ], ordered=False)
+
+
+def ids(user_id):
+    return [c["_id"] for c in mongo.db.clients.find({"user_id": user_id}, {"_id": 1})]
@@ -0,0 +1,55 @@
+from datetime import datetime
+
+from extensions import mongo, read_db
+
+
+LIST_FIELDS = {
+    "invoice_number": 1, "client_name": 1, "project_title": 1, "amount": 1,
+    "due_date": 1, "payment_mode": 1, "status": 1, "last_reminded_at": 1,
+}
+VIEW_FIELDS = {
+    "invoice_number": 1, "client_name": 1, "project_title": 1, "amount": 1,
+    "due_date": 1, "payment_mode": 1, "status": 1, "created_at": 1,
+}
+# What an invoice contributes to its client's stats (clients/stats.py)
+STATS_FIELDS = {"client_id": 1, "amount": 1, "due_date": 1, "status": 1}
+
+
+def create(user_id, doc):
+    return mongo.db.invoices.insert_one(dict(doc, user_id=user_id)).inserted_id
+
+
+def get(user_id, invoice_id, fields=VIEW_FIELDS):
+    return read_db().invoices.find_one({"_id": invoice_id, "user_id": user_id}, fields)
+
+
+def list_all(user_id):
+    return read_db().invoices.find({"user_id": user_id}, LIST_FIELDS)
+
+
+def count_overdue(user_id, today):
+    return read_db().invoices.count_documents({
+        "user_id": user_id,
+        "status": "Unpaid",
+        "due_date": {"$lt": today}
+    })
+
+
+def mark_paid(user_id, invoice_id):
+    """Returns the invoice as it was before, or None if already paid."""
+    return mongo.db.invoices.find_one_and_update(
+        {"_id": invoice_id, "user_id": user_id, "status": {"$ne": "Paid"}},
+        {"$set": {"status": "Paid", "paid_at": datetime.utcnow()}},
+        projection=STATS_FIELDS
+    )
+
+
+def delete(user_id, invoice_id):
+    return mongo.db.invoices.find_one_and_delete(
+        {"_id": invoice_id, "user_id": user_id},
+        projection=STATS_FIELDS
+    )
+
+
+def delete_for_client(user_id, client_id):
+    mongo.db.invoices.delete_many({"user_id": user_id, "client_id": client_id})
@@ -0,0 +1,78 @@
+from datetime import datetime
+from pymongo import UpdateOne
+
+from extensions import mongo, read_db
+
+
+LIST_FIELDS = {"name": 1, "company": 1, "email": 1, "source": 1, "status": 1, "score": 1}
+SCORING_FIELDS = {"status": 1, "source": 1, "company": 1, "created_at": 1, "status_changed_at": 1, "score": 1}
+
+SORTS = {
+    "score": [("score", -1)],
+    "newest": [("created_at", -1)],
+    "name": [("name", 1)],
+}
+
+
+def create(user_id, doc):
+    return mongo.db.leads.insert_one(dict(doc, user_id=user_id)).inserted_id
+
+
+def get(user_id, lead_id, fields=LIST_FIELDS):
+    return mongo.db.leads.find_one({"_id": lead_id, "user_id": user_id}, fields)
+
+
+def list_open(user_id, sort="score"):
+    return read_db().leads.find(
+        {"user_id": user_id, "status": {"$ne": "Converted"}},
+        LIST_FIELDS
+    ).sort(SORTS[sort])
+
+
+def top_scored(user_id, limit=5):
+    return read_db().leads.find(
+        {"user_id": user_id, "score": {"$gt": 0}},
+        {"name": 1, "company": 1, "status": 1, "score": 1}
+    ).sort("score", -1).limit(limit)
+
+
+def set_status(user_id, lead_id, status):
+    """Returns False when the lead was already in `status`."""
+    result = mongo.db.leads.update_one(
+        {"_id": lead_id, "user_id": user_id, "status": {"$ne": status}},
+        {"$set": {"status": status, "status_changed_at": datetime.utcnow()}}
+    )
+    return bool(result.modified_count)
+
+
+def mark_converted(user_id, lead_id):
+    mongo.db.leads.update_one(
+        {"_id": lead_id, "user_id": user_id},
+        {"$set": {"status": "Converted"}, "$unset": {"score": ""}}
+    )
+
+
+def delete(user_id, lead_id):
+    mongo.db.leads.delete_one({"_id": lead_id, "user_id": user_id})
+
+
+# ---------- Scoring ----------
+
+def open_for_scoring(user_id, lead_ids=None):
+    query = {"user_id": user_id, "status": {"$ne": "Converted"}}
+    if lead_ids is not None:
+        query["_id"] = {"$in": list(lead_ids)}
+    return list(mongo.db.leads.find(query, SCORING_FIELDS))
+
+
+def set_scores(user_id, scores):
+    """`scores` is a list of (lead_id, score)."""
+    if scores:
+        mongo.db.leads.bulk_write([
+            UpdateOne({"_id": lead_id, "user_id": user_id}, {"$set": {"score": score}})
+            for lead_id, score in scores
+        ], ordered=False)
+
+
+def owners():
+    return mongo.db.leads.distinct("user_id")
@@ -0,0 +1,99 @@
+from datetime import datetime
+
+from extensions import mongo, read_db
+
+
+LIST_FIELDS = {"title": 1, "description": 1, "status": 1, "deadline": 1}
+DETAIL_FIELDS = {"client_id": 1, "client_name": 1, "title": 1, "description": 1, "status": 1, "deadline": 1}
+
+
+def create(user_id, doc):
+    return mongo.db.projects.insert_one(dict(doc, user_id=user_id)).inserted_id
+
+
+def get(user_id, project_id, fields=DETAIL_FIELDS):
+    return read_db().projects.find_one({"_id": project_id, "user_id": user_id}, fields)
+
+
+def for_client(user_id, client_id):
+    return read_db().projects.find({"user_id": user_id, "client_id": client_id}, LIST_FIELDS)
+
+
+def titles(user_id):
+    return list(read_db().projects.find({"user_id": user_id}, {"title": 1, "client_id": 1}))
+
+
+def count_active(user_id):
+    return read_db().projects.count_documents({"user_id": user_id, "status": {"$ne": "Completed"}})
+
+
+def list_active(user_id):
+    return read_db().projects.find(
+        {"user_id": user_id, "status": {"$ne": "Completed"}},
+        {"client_id": 1, "client_name": 1, "title": 1, "deadline": 1}
+    )
+
+
+def next_deadlines(user_id, limit=5):
+    return read_db().projects.find(
+        {"user_id": user_id, "status": {"$ne": "Completed"}},
+        {"title": 1}
+    ).sort("deadline", 1).limit(limit)
+
+
+def set_ai_generated(user_id, project_id):
+    mongo.db.projects.update_one({"_id": project_id, "user_id": user_id}, {"$set": {"ai_generated": True}})
+
+
+def complete(user_id, project_id):
+    mongo.db.projects.update_one(
+        {"_id": project_id, "user_id": user_id},
+        {"$set": {"status": "Completed", "completed_at": datetime.utcnow()}}
+    )
+
+
+def reopen(user_id, project_id):
+    """Back to Planning; returns the previous status and client."""
+    return mongo.db.projects.find_one_and_update(
+        {"_id": project_id, "user_id": user_id},
+        {"$set": {"status": "Planning"}, "$unset": {"completed_at": ""}},
+        projection={"status": 1, "client_id": 1}
+    )
+
+
+def delete(user_id, project_id):
+    mongo.db.projects.delete_one({"_id": project_id, "user_id": user_id})
+
+
+def delete_for_client(user_id, client_id):
+    """Delete a client's projects; returns their ids."""
+    ids = [p["_id"] for p in mongo.db.projects.find({"user_id": user_id, "client_id": client_id}, {"_id": 1})]
+    mongo.db.projects.delete_many({"user_id": user_id, "client_id": client_id})
+    return ids
+
+
+# ---------- Task Suggestions (projects/suggestions.py) ----------
+# Completed projects may have been moved to projects_archive; those come
+# back with `archived` set so their tasks are read from tasks_archive.
+
+def completed_with_terms(user_id):
+    fields = {"title": 1, "client_name": 1, "terms": 1}
+    live = read_db().projects.find({"user_id": user_id, "status": "Completed", "terms": {"$exists": True}}, fields)
+    archived = read_db().projects_archive.find({"user_id": user_id, "terms": {"$exists": True}}, fields)
+    return list(live) + [dict(p, archived=True) for p in archived]
+
+
+def missing_terms(user_id):
+    fields = {"title": 1, "description": 1}
+    live = mongo.db.projects.find({"user_id": user_id, "terms": {"$exists": False}}, fields)
+    archived = mongo.db.projects_archive.find({"user_id": user_id, "terms": {"$exists": False}}, fields)
+    return list(live) + [dict(p, archived=True) for p in archived]
+
+
+def set_terms(user_id, project_id, terms, archived=False):
+    collection = mongo.db.projects_archive if archived else mongo.db.projects
+    collection.update_one({"_id": project_id, "user_id": user_id}, {"$set": {"terms": terms}})
+
+
+def owners():
+    return set(mongo.db.projects.distinct("user_id")) | set(mongo.db.projects_archive.distinct("user_id"))
@@ -0,0 +1,41 @@
+from extensions import mongo, read_db
+
+
+LIST_FIELDS = {"name": 1, "company": 1, "stage": 1, "probability": 1, "value": 1}
+
+
+def create(user_id, doc):
+    return mongo.db.prospects.insert_one(dict(doc, user_id=user_id)).inserted_id
+
+
+def get(user_id, prospect_id, fields=None):
+    return mongo.db.prospects.find_one({"_id": prospect_id, "user_id": user_id}, fields)
+
+
+def list_all(user_id):
+    return read_db().prospects.find({"user_id": user_id}, LIST_FIELDS)
+
+
+def pipeline_total(user_id):
+    rows = list(read_db().prospects.aggregate([
+        {"$match": {"user_id": user_id}},
+        {"$group": {"_id": None, "total": {"$sum": "$value"}}}
+    ]))
+    return rows[0]["total"] if rows else 0
+
+
+def update(user_id, prospect_id, changes):
+    mongo.db.prospects.update_one({"_id": prospect_id, "user_id": user_id}, {"$set": changes})
+
+
+def update_returning(user_id, prospect_id, changes, fields):
+    """Apply `changes` and return the previous values of `fields`."""
+    return mongo.db.prospects.find_one_and_update(
+        {"_id": prospect_id, "user_id": user_id},
+        {"$set": changes},
+        projection=fields
+    )
+
+
+def delete(user_id, prospect_id):
+    mongo.db.prospects.delete_one({"_id": prospect_id, "user_id": user_id})
@@ -0,0 +1,75 @@
+from extensions import mongo, read_db
+
+
+FIELDS = {"project_id": 1, "description": 1, "hours": 1, "status": 1}
+
+
+def create(user_id, doc):
+    return mongo.db.tasks.insert_one(dict(doc, user_id=user_id)).inserted_id
+
+
+def create_many(user_id, docs):
+    if docs:
+        mongo.db.tasks.insert_many([dict(doc, user_id=user_id) for doc in docs])
+
+
+def get(user_id, task_id, fields=FIELDS):
+    return mongo.db.tasks.find_one({"_id": task_id, "user_id": user_id}, fields)
+
+
+def for_project(user_id, project_id):
+    return list(read_db().tasks.find(
+        {"user_id": user_id, "project_id": project_id},
+        FIELDS
+    ).sort("status", -1))
+
+
+def has_tasks(user_id, project_id):
+    # Primary read: guards against a resubmit right after tasks were added
+    return mongo.db.tasks.find_one({"user_id": user_id, "project_id": project_id}, {"_id": 1}) is not None
+
+
+def for_past_project(user_id, project_id, archived=False):
+    collection = read_db().tasks_archive if archived else read_db().tasks
+    return list(collection.find(
+        {"user_id": user_id, "project_id": project_id},
+        {"description": 1, "hours": 1}
+    ).sort("_id", 1))
+
+
+def count_pending(user_id):
+    return read_db().tasks.count_documents({"user_id": user_id, "status": "Pending"})
+
+
+def progress(user_id, project_ids):
+    """{project_id: (done, total)} in one aggregation."""
+    rows = read_db().tasks.aggregate([
+        {"$match": {"user_id": user_id, "project_id": {"$in": list(project_ids)}}},
+        {"$group": {
+            "_id": "$project_id",
+            "total": {"$sum": 1},
+            "done": {"$sum": {"$cond": [{"$eq": ["$status", "Done"]}, 1, 0]}},
+        }},
+    ])
+    return {row["_id"]: (row["done"], row["total"]) for row in rows}
+
+
+def pending_hours(user_id):
+    """{project_id: hours} of pending work, in one aggregation."""
+    rows = read_db().tasks.aggregate([
+        {"$match": {"user_id": user_id, "status": "Pending"}},
+        {"$group": {"_id": "$project_id", "hours": {"$sum": "$hours"}}},
+    ])
+    return {row["_id"]: row["hours"] for row in rows}
+
+
+def update(user_id, task_id, changes):
+    mongo.db.tasks.update_one({"_id": task_id, "user_id": user_id}, {"$set": changes})
+
+
+def delete(user_id, task_id):
+    mongo.db.tasks.delete_one({"_id": task_id, "user_id": user_id})
+
+
+def delete_for_projects(user_id, project_ids):
+    mongo.db.tasks.delete_many({"user_id": user_id, "project_id": {"$in": list(project_ids)}})
@@ -0,0 +1,58 @@
+from bson.objectid import ObjectId
+from datetime import datetime
+from pymongo import ReturnDocument
+
+from extensions import mongo, read_db
+
+
+# The users collection is keyed by _id (user_id is its string form) and is
+# not sharded: its unique email and provider identity indexes could not be.
+
+
+def get(user_id, fields):
+    return read_db().users.find_one({"_id": ObjectId(user_id)}, fields)
+
+
+def upsert(query, data):
+    """Create or update a user in one round trip; returns (_id, previous doc)."""
+    new_id = ObjectId()
+    previous = mongo.db.users.find_one_and_update(
+        query,
+        {"$set": data, "$setOnInsert": {"_id": new_id, "created_at": datetime.utcnow()}},
+        upsert=True,
+        return_document=ReturnDocument.BEFORE
+    )
+    return (new_id, None) if previous is None else (previous["_id"], previous)
+
+
+def delete_with_data(user_id):
+    from . import USER_SCOPED_COLLECTIONS
+
+    for name in USER_SCOPED_COLLECTIONS:
+        mongo.db[name].delete_many({"user_id": user_id})
+    mongo.db.users.delete_one({"_id": ObjectId(user_id)})
+
+
+# ---------- Capacity Planning ----------
+
+def weekly_capacity(user_id, default):
+    return (get(user_id, {"weekly_capacity": 1}) or {}).get("weekly_capacity", default)
+
+
+def set_weekly_capacity(user_id, hours):
+    mongo.db.users.update_one({"_id": ObjectId(user_id)}, {"$set": {"weekly_capacity": hours}})
+
+
+# ---------- Calendar Feed Token ----------
+
+def calendar_token(user_id):
+    return (get(user_id, {"calendar_token": 1}) or {}).get("calendar_token")
+
+
+def set_calendar_token(user_id, token):
+    update = {"$set": {"calendar_token": token}} if token else {"$unset": {"calendar_token": ""}}
+    mongo.db.users.update_one({"_id": ObjectId(user_id)}, update)
+
+
+def by_calendar_token(token):
+    return read_db().users.find_one({"calendar_token": token}, {"_id": 1})
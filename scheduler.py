@@ -0,0 +1,345 @@
+import os
+import random
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from extensions import mongo
+
+
+# ---------- Jobs ----------
+# Each takes the app config and returns a summary stored in the run history.
+# Schedules, timeouts and jitter are set per job in SCHEDULER_JOBS.
+
+def _refresh_overdue(config):
+    from clients.stats import refresh_overdue
+    return refresh_overdue()
+
+
+def _rebuild_client_stats(config):
+    from clients.stats import rebuild_client_stats
+    return rebuild_client_stats()
+
+
+def _score_leads(config):
+    from leads.scoring import score_all_leads
+    return score_all_leads()
+
+
+def _archive(config):
+    from archive.store import run_archival
+    return run_archival(days=config["ARCHIVE_AFTER_DAYS"], batch_size=config["ARCHIVE_BATCH_SIZE"])
+
+
+def _send_reminders(config):
+    from reminders import dispatch_reminders
+    return dispatch_reminders(
+        batch_size=config["REMINDER_BATCH_SIZE"],
+        resend_days=config["REMINDER_RESEND_DAYS"]
+    )
+
+
+JOBS = {
+    "refresh-overdue": _refresh_overdue,
+    "rebuild-client-stats": _rebuild_client_stats,
+    "score-leads": _score_leads,
+    "archive": _archive,
+    "send-reminders": _send_reminders,
+}
+
+
+# ---------- Cron Expressions ----------
+# Standard five fields (minute hour day-of-month month day-of-week), in UTC.
+# Fields take *, numbers, ranges, lists and /steps; Sunday is 0 or 7.
+
+CRON_FIELDS = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+
+def _cron_field(spec, lo, hi):
+    values = set()
+    for part in spec.split(","):
+        part, _, step = part.partition("/")
+        if part == "*":
+            start, end = lo, hi
+        elif "-" in part:
+            start, end = (int(v) for v in part.split("-", 1))
+        else:
+            start = end = int(part)
+            if step:
+                end = hi
+        if not lo <= start <= end <= hi:
+            raise ValueError(f"{spec!r} is outside {lo}-{hi}")
+        values.update(range(start, end + 1, int(step) if step else 1))
+    return values
+
+
+def parse_cron(expr):
+    fields = expr.split()
+    if len(fields) != 5:
+        raise ValueError(f"cron expression {expr!r} needs 5 fields")
+    minutes, hours, days, months, weekdays = (
+        _cron_field(spec, lo, hi) for spec, (lo, hi) in zip(fields, CRON_FIELDS)
+    )
+    if 7 in weekdays:
+        weekdays = (weekdays - {7}) | {0}
+    return {
+        "minutes": minutes,
+        "hours": hours,
+        "days": days,
+        "months": months,
+        "weekdays": weekdays,
+        # As in cron, a restricted day-of-month OR day-of-week matches
+        "any_day": fields[2] != "*" and fields[4] != "*",
+    }
+
+
+def _day_matches(cron, moment):
+    day = moment.day in cron["days"]
+    weekday = (moment.weekday() + 1) % 7 in cron["weekdays"]
+    return (day or weekday) if cron["any_day"] else (day and weekday)
+
+
+def next_run(cron, after):
+    """First minute strictly after `after` that matches `cron`."""
+    moment = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    limit = moment + timedelta(days=366 * 5)
+    while moment < limit:
+        if moment.month not in cron["months"]:
+            year, month = divmod(moment.month, 12)
+            moment = moment.replace(year=moment.year + year, month=month + 1, day=1, hour=0, minute=0)
+        elif not _day_matches(cron, moment):
+            moment = (moment + timedelta(days=1)).replace(hour=0, minute=0)
+        elif moment.hour not in cron["hours"]:
+            moment = (moment + timedelta(hours=1)).replace(minute=0)
+        elif moment.minute not in cron["minutes"]:
+            moment += timedelta(minutes=1)
+        else:
+            return moment
+    raise ValueError("cron expression never matches")
+
+
+# ---------- Scheduler ----------
+
+NEVER = datetime(1970, 1, 1)
+
+
+class Scheduler:
+    """Runs JOBS on their schedules, once per slot across every worker.
+
+    Every worker runs a scheduler thread, but a job only runs in the worker
+    that takes its lease in `scheduler_locks`: one document per job holding
+    the next due time (with the job's random jitter added) and, while it
+    runs, the owner and a lease of the job's timeout. Due jobs run in their
+    own threads, so a slow job doesn't hold up the others, and the lease is
+    renewed while the job runs. A job that outlives its timeout is recorded
+    as timed out, but its thread can't be stopped, so the lease is renewed
+    on every tick until the thread exits: a job never runs twice at once.
+    Every run is recorded in `scheduler_runs`.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.jobs = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._overrunning = {}
+
+    def init_app(self, app):
+        self.app = app
+        self.jobs = {}
+        for name, spec in app.config.get("SCHEDULER_JOBS", {}).items():
+            if name not in JOBS:
+                raise ValueError(f"unknown scheduled job {name!r}")
+            self.jobs[name] = dict(spec, schedule=parse_cron(spec["cron"]))
+        self.interval = app.config.get("SCHEDULER_POLL_INTERVAL", 30)
+
+        # Started with the first request, so `flask` CLI commands (and a
+        # gunicorn master with --preload) never take leases
+        if app.config.get("SCHEDULER_ENABLED"):
+            app.before_request(self.start)
+
+    @property
+    def owner(self):
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    def start(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="scheduler", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        try:
+            while True:
+                try:
+                    self.tick()
+                except Exception as e:
+                    print("SCHEDULER ERROR:", repr(e))
+                # Staggered so workers don't all poll in step
+                time.sleep(self.interval * random.uniform(0.5, 1.5))
+        finally:
+            with self._lock:
+                self._thread = None
+
+    def _next(self, name, after):
+        job = self.jobs[name]
+        return next_run(job["schedule"], after) + timedelta(seconds=random.uniform(0, job.get("jitter", 0)))
+
+    def sync(self, now=None):
+        """Create lock documents for new jobs and reschedule changed ones."""
+        now = now or datetime.utcnow()
+        locks = mongo.db.scheduler_locks
+        for name, job in self.jobs.items():
+            try:
+                locks.update_one(
+                    {"_id": name},
+                    {"$setOnInsert": {"cron": job["cron"], "next_run_at": self._next(name, now), "locked_until": NEVER}},
+                    upsert=True
+                )
+            except DuplicateKeyError:
+                pass  # another worker created it first
+            locks.update_one(
+                {"_id": name, "cron": {"$ne": job["cron"]}},
+                {"$set": {"cron": job["cron"], "next_run_at": self._next(name, now)}}
+            )
+
+    def tick(self, now=None):
+        """Start every due job in its own thread; returns the threads."""
+        now = now or datetime.utcnow()
+        self.sync(now)
+        self._hold_overruns(now)
+        due = mongo.db.scheduler_locks.find(
+            {"_id": {"$in": list(self.jobs)}, "next_run_at": {"$lte": now}, "locked_until": {"$lte": now}},
+            {"_id": 1}
+        )
+        runners = []
+        for doc in list(due):
+            runner = threading.Thread(target=self._run_job, args=(doc["_id"],), name=f"run-{doc['_id']}", daemon=True)
+            runner.start()
+            runners.append(runner)
+        return runners
+
+    def _run_job(self, name):
+        try:
+            self.run(name)
+        except Exception as e:
+            print("SCHEDULER ERROR:", name, repr(e))
+
+    def run(self, name, trigger="schedule"):
+        """Run `name` if this worker gets its lease; returns the run record."""
+        job = self.jobs[name]
+        timeout = job.get("timeout", 600)
+        started = datetime.utcnow()
+
+        query = {"_id": name, "locked_until": {"$lte": started}}
+        if trigger == "schedule":
+            query["next_run_at"] = {"$lte": started}
+        lease = mongo.db.scheduler_locks.find_one_and_update(
+            query,
+            {"$set": {
+                "owner": self.owner,
+                "started_at": started,
+                "locked_until": started + timedelta(seconds=timeout),
+            }},
+            projection={"_id": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        if lease is None:
+            return None  # due elsewhere, already running, or not due yet
+
+        record = {"job": name, "trigger": trigger, "owner": self.owner, "started_at": started, "status": "running"}
+        record["_id"] = mongo.db.scheduler_runs.insert_one(dict(record)).inserted_id
+
+        outcome = {}
+
+        def target():
+            try:
+                with self.app.app_context():
+                    outcome["result"] = JOBS[name](self.app.config)
+            except Exception as e:
+                outcome["error"] = f"{type(e).__name__}: {e}"
+
+        worker = threading.Thread(target=target, name=f"job-{name}", daemon=True)
+        worker.start()
+        # Renewed a full timeout ahead at least three times per timeout, so
+        # the lease can't lapse while the job runs or is being recorded
+        heartbeat = min(self.interval, timeout / 3)
+        deadline = time.monotonic() + timeout
+        while worker.is_alive() and time.monotonic() < deadline:
+            worker.join(max(0, min(heartbeat, deadline - time.monotonic())))
+            if worker.is_alive():
+                self._renew(name, started, timeout)
+
+        finished = datetime.utcnow()
+        if worker.is_alive():
+            record.update(status="timeout", error=f"still running after {timeout}s")
+        elif "error" in outcome:
+            record.update(status="error", error=outcome["error"])
+        else:
+            record.update(status="ok", result=outcome.get("result"))
+        record["finished_at"] = finished
+        record["seconds"] = round((finished - started).total_seconds(), 3)
+        mongo.db.scheduler_runs.update_one({"_id": record["_id"]}, {"$set": record})
+
+        # Release, unless the lease lapsed and another worker holds it now.
+        # A job that timed out keeps it until its thread exits.
+        update = {"last_status": record["status"], "last_finished_at": finished}
+        if record["status"] == "timeout":
+            update["locked_until"] = finished + timedelta(seconds=timeout)
+            self._overrunning[name] = {
+                "thread": worker, "started_at": started, "timeout": timeout,
+                "run_id": record["_id"], "outcome": outcome,
+            }
+        else:
+            update["locked_until"] = finished
+        if trigger == "schedule":
+            update["next_run_at"] = self._next(name, finished)
+        mongo.db.scheduler_locks.update_one(
+            {"_id": name, "owner": self.owner, "started_at": started},
+            {"$set": update}
+        )
+        return record
+
+    def _hold_overruns(self, now):
+        """Renew the leases of timed-out jobs still running; release the rest."""
+        for name, run in list(self._overrunning.items()):
+            if run["thread"].is_alive():
+                self._renew(name, run["started_at"], run["timeout"], now)
+                continue
+
+            outcome = run["outcome"]
+            mongo.db.scheduler_runs.update_one({"_id": run["run_id"]}, {"$set": {
+                "ended_at": now,
+                "late_status": "error" if "error" in outcome else "ok",
+                "late_result": outcome.get("error", outcome.get("result")),
+            }})
+            mongo.db.scheduler_locks.update_one(
+                {"_id": name, "owner": self.owner, "started_at": run["started_at"]},
+                {"$set": {"locked_until": now}}
+            )
+            del self._overrunning[name]
+
+    def _renew(self, name, started_at, timeout, now=None):
+        """Extend this worker's lease on `name` to a full timeout from now."""
+        now = now or datetime.utcnow()
+        mongo.db.scheduler_locks.update_one(
+            {"_id": name, "owner": self.owner, "started_at": started_at},
+            {"$set": {"locked_until": now + timedelta(seconds=timeout)}}
+        )
+
+    def status(self):
+        locks = {doc["_id"]: doc for doc in mongo.db.scheduler_locks.find({"_id": {"$in": list(self.jobs)}})}
+        return [dict(locks.get(name, {}), _id=name, cron=job["cron"]) for name, job in self.jobs.items()]
+
+    def history(self, name=None, limit=20):
+        query = {"job": name} if name else {}
+        return mongo.db.scheduler_runs.find(query).sort("started_at", -1).limit(limit)
+
+
+scheduler = Scheduler()
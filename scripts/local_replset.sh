@@ -0,0 +1,21 @@
+#!/usr/bin/env sh
+# Start a throwaway three-member replica set on localhost:27017-27019 for
+# trying read routing locally. Stop it with: pkill -f "replSet rs0"
+set -e
+
+DATA="${DATA:-/tmp/studiobase-rs}"
+
+for port in 27017 27018 27019; do
+    mkdir -p "$DATA/$port"
+    mongod --replSet rs0 --port "$port" --bind_ip localhost \
+        --dbpath "$DATA/$port" --fork --logpath "$DATA/$port.log"
+done
+
+mongosh --port 27017 --quiet --eval '
+rs.initiate({_id: "rs0", members: [
+    {_id: 0, host: "localhost:27017"},
+    {_id: 1, host: "localhost:27018"},
+    {_id: 2, host: "localhost:27019"}
+]})'
+
+echo "MONGO_URI=mongodb://localhost:27017,localhost:27018,localhost:27019/studiobase?replicaSet=rs0"
@@ -14,4 +14,44 @@ document.addEventListener("DOMContentLoaded", function() {
             bar.style.width = targetWidth;
         }, 100);
     });
-});
\ No newline at end of file
+});
+
+// Live updates pushed by /live/stream
+document.addEventListener("DOMContentLoaded", function() {
+    const root = document.querySelector('[data-live-stream]');
+    if (!root || !window.EventSource) return;
+
+    const source = new EventSource(root.dataset.liveStream);
+
+    source.addEventListener('stats', function(e) {
+        const stats = JSON.parse(e.data);
+
+        Object.keys(stats).forEach(key => {
+            const el = root.querySelector('[data-stat="' + key + '"]');
+            if (!el) return;
+
+            if (key === 'pipeline') {
+                el.textContent = '₹' + Number(stats[key]).toLocaleString('en-US', {
+                    minimumFractionDigits: 2,
+                    maximumFractionDigits: 2
+                });
+            } else {
+                el.textContent = stats[key];
+            }
+        });
+    });
+
+    source.addEventListener('progress', function(e) {
+        const data = JSON.parse(e.data);
+        const block = root.querySelector('[data-project-id="' + data.project_id + '"]');
+        if (!block) return;
+
+        block.querySelector('[data-role="tasks"]').textContent = data.done + '/' + data.total + ' tasks';
+
+        // Same thresholds as dashboard.html
+        const bar = block.querySelector('.progress-bar');
+        bar.classList.remove('bg-success', 'bg-primary', 'bg-warning');
+        bar.classList.add(data.progress === 100 ? 'bg-success' : data.progress > 50 ? 'bg-primary' : 'bg-warning');
+        bar.style.width = data.progress + '%';
+    });
+});
@@ -1,6 +1,6 @@
 document.addEventListener("DOMContentLoaded", function () {
-    const clientSelect = document.querySelector('select[name="client_name"]');
-    const projectSelect = document.querySelector('select[name="project_title"]');
+    const clientSelect = document.querySelector('select[name="client_id"]');
+    const projectSelect = document.querySelector('select[name="project_id"]');
 
     if (!clientSelect || !projectSelect) return;
 
@@ -11,7 +11,7 @@ document.addEventListener("DOMContentLoaded", function () {
             const projectClient = option.getAttribute("data-client");
 
             // Always allow General Service
-            if (option.value === "General Service") {
+            if (option.value === "") {
                 option.hidden = false;
                 return;
             }
@@ -2,6 +2,28 @@ document.addEventListener("DOMContentLoaded", function() {
     var modalElement = document.getElementById("addInvoiceModal");
     if (!modalElement) return;
 
+    // Amount = tracked hours of the selected project x hourly rate
+    var rateInput = modalElement.querySelector('input[name="hourly_rate"]');
+    var amountInput = modalElement.querySelector('input[name="amount"]');
+    var trackedLabel = modalElement.querySelector('[data-role="tracked-hours"]');
+    var hoursSelect = modalElement.querySelector('select[name="project_id"]');
+
+    function applyTrackedTime() {
+        var option = hoursSelect.options[hoursSelect.selectedIndex];
+        var hours = option ? parseFloat(option.getAttribute("data-hours") || "0") : 0;
+        trackedLabel.textContent = hours ? "Tracked: " + hours + " hrs" : "";
+
+        var rate = parseFloat(rateInput.value);
+        if (hours && rate) {
+            amountInput.value = (hours * rate).toFixed(2);
+        }
+    }
+
+    if (rateInput && hoursSelect) {
+        rateInput.addEventListener("input", applyTrackedTime);
+        hoursSelect.addEventListener("change", applyTrackedTime);
+    }
+
     var prefillActive = modalElement.dataset.prefillActive === "true";
     var prefillClient = modalElement.dataset.prefillClient;
     var prefillProject = modalElement.dataset.prefillProject;
@@ -11,13 +33,16 @@ document.addEventListener("DOMContentLoaded", function() {
     var invoiceModal = new bootstrap.Modal(modalElement);
     invoiceModal.show();
 
-    var clientSelect = modalElement.querySelector('select[name="client_name"]');
+    var clientSelect = modalElement.querySelector('select[name="client_id"]');
     if (clientSelect && prefillClient) {
         clientSelect.value = prefillClient;
+        // Re-run the project filter for the prefilled client
+        clientSelect.dispatchEvent(new Event("change"));
     }
 
-    var projectSelect = modalElement.querySelector('select[name="project_title"]');
+    var projectSelect = modalElement.querySelector('select[name="project_id"]');
     if (projectSelect && prefillProject) {
         projectSelect.value = prefillProject;
+        projectSelect.dispatchEvent(new Event("change"));
     }
 });
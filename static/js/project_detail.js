@@ -30,4 +30,63 @@ document.addEventListener("DOMContentLoaded", function() {
             });
         });
     }
-});
\ No newline at end of file
+
+    // "Log Time" posts to the selected task
+    const logTimeForm = document.querySelector('#logTimeModal form');
+    if (logTimeForm) {
+        logTimeForm.addEventListener('submit', function() {
+            const taskId = logTimeForm.querySelector('select[name="task_id"]').value;
+            logTimeForm.action = logTimeForm.getAttribute('data-base-action').replace('TASK_ID_PLACEHOLDER', taskId);
+        });
+    }
+});
+
+// Live updates pushed by /live/stream (task toggles from other tabs/devices)
+document.addEventListener("DOMContentLoaded", function() {
+    const root = document.querySelector('[data-live-stream]');
+    if (!root || !window.EventSource) return;
+
+    const source = new EventSource(root.dataset.liveStream);
+
+    source.addEventListener('task', function(e) {
+        const data = JSON.parse(e.data);
+        const row = root.querySelector('tr[data-task-id="' + data.task_id + '"]');
+        if (!row) return;
+
+        if (data.status === null) {
+            row.remove();
+            return;
+        }
+
+        const done = data.status === 'Done';
+        row.classList.toggle('table-light', done);
+        row.classList.toggle('text-muted', done);
+
+        const icon = row.querySelector('td:first-child i');
+        if (icon) {
+            icon.className = done
+                ? 'bi bi-check-circle-fill text-success fs-5'
+                : 'bi bi-circle text-secondary fs-5';
+        }
+
+        // Description is struck through when done
+        const cell = row.children[1];
+        const text = cell.textContent.trim();
+        cell.textContent = '';
+        if (done) {
+            const del = document.createElement('del');
+            del.textContent = text;
+            cell.appendChild(del);
+        } else {
+            cell.textContent = text;
+        }
+    });
+
+    source.addEventListener('progress', function(e) {
+        const data = JSON.parse(e.data);
+        if (data.project_id !== root.dataset.projectId) return;
+
+        root.querySelector('[data-role="tasks"]').textContent = data.done + '/' + data.total + ' tasks';
+        root.querySelector('.progress-bar').style.width = data.progress + '%';
+    });
+});
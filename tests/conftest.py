@@ -0,0 +1,357 @@
+import json
+import os
+import sys
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017/studiobase_test")
+os.environ["SCHEDULER_ENABLED"] = "false"
+
+from bson.objectid import ObjectId
+from pymongo import MongoClient, monitoring
+
+from app import app as flask_app
+from extensions import mongo
+
+
+# Routes run against a real server when TEST_MONGO_URI is set, counting
+# the commands pymongo sends. Otherwise mongomock stands in, and each
+# collection call is counted as the command pymongo would have sent for it.
+
+BUDGET_FILE = os.path.join(os.path.dirname(__file__), "query_budgets.json")
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--record-budgets", action="store_true",
+        help="Rewrite tests/query_budgets.json from this run instead of checking it."
+    )
+
+
+# ---------- Command Log ----------
+
+def shape(value):
+    """A query with its values replaced by '?', e.g. {"user_id": "?"}."""
+    if isinstance(value, dict):
+        return {key: shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)) and value and isinstance(value[0], (dict, list, tuple)):
+        return [shape(item) for item in value]
+    return "?"
+
+
+class CommandLog:
+    """Commands sent by the test's own thread while `active`.
+
+    Background threads (the activity buffer flushing, live updates) also
+    talk to the database; their commands are not the route's.
+    """
+
+    def __init__(self):
+        self.thread = threading.get_ident()
+        self.active = False
+        self.commands = []
+
+    def record(self, name, collection, query=None):
+        if self.active and threading.get_ident() == self.thread:
+            text = json.dumps(shape(query), separators=(",", ":")) if query else ""
+            self.commands.append(f"{name} {collection} {text}".rstrip())
+
+    def summary(self):
+        return "\n".join(
+            f"    {count}x {command}"
+            for command, count in Counter(self.commands).most_common()
+        )
+
+
+log = CommandLog()
+
+IGNORED_COMMANDS = {"hello", "ismaster", "isMaster", "ping", "endSessions", "saslStart", "saslContinue", "buildInfo"}
+
+
+class CommandListener(monitoring.CommandListener):
+
+    def started(self, event):
+        name, command = event.command_name, event.command
+        if name in IGNORED_COMMANDS:
+            return
+        collection = command.get(name) if isinstance(command.get(name), str) else command.get("collection", "")
+        query = {
+            "find": lambda: command.get("filter"),
+            "aggregate": lambda: command.get("pipeline"),
+            "update": lambda: command["updates"][0]["q"],
+            "delete": lambda: command["deletes"][0]["q"],
+            "findAndModify": lambda: command.get("query"),
+            "distinct": lambda: command.get("query"),
+            "count": lambda: command.get("query"),
+        }.get(name, lambda: None)()
+        log.record(name, collection, query)
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+# pymongo method -> the command it sends
+MOCK_COMMANDS = {
+    "find": "find",
+    "find_one": "find",
+    "aggregate": "aggregate",
+    "count_documents": "aggregate",
+    "distinct": "distinct",
+    "insert_one": "insert",
+    "insert_many": "insert",
+    "update_one": "update",
+    "update_many": "update",
+    "replace_one": "update",
+    "delete_one": "delete",
+    "delete_many": "delete",
+    "find_one_and_update": "findAndModify",
+    "find_one_and_delete": "findAndModify",
+    "find_one_and_replace": "findAndModify",
+    "bulk_write": "bulk",
+}
+BULK_COMMANDS = {"InsertOne": "insert", "UpdateOne": "update", "UpdateMany": "update", "ReplaceOne": "update", "DeleteOne": "delete", "DeleteMany": "delete"}
+
+
+def count_mongomock_calls():
+    import mongomock
+
+    depth = threading.local()
+
+    def wrap(method_name, command):
+        original = getattr(mongomock.Collection, method_name)
+
+        def counted(self, *args, **kwargs):
+            # mongomock calls its own public methods (find_one -> find)
+            outer = not getattr(depth, "value", 0)
+            if outer:
+                if command == "bulk":
+                    for name in sorted({BULK_COMMANDS[type(op).__name__] for op in args[0]}):
+                        log.record(name, self.name)
+                elif command == "insert":
+                    log.record(command, self.name)
+                else:
+                    query = args[0] if args else kwargs.get("filter", kwargs.get("pipeline"))
+                    log.record(command, self.name, query)
+            depth.value = getattr(depth, "value", 0) + 1
+            try:
+                return original(self, *args, **kwargs)
+            finally:
+                depth.value -= 1
+
+        setattr(mongomock.Collection, method_name, counted)
+
+    for method_name, command in MOCK_COMMANDS.items():
+        wrap(method_name, command)
+
+
+# ---------- Fixtures ----------
+
+@pytest.fixture(scope="session")
+def app():
+    flask_app.config.update(TESTING=True)
+
+    # Compile every template once, so no route's latency includes it
+    for name in flask_app.jinja_env.list_templates():
+        flask_app.jinja_env.get_template(name)
+
+    if os.getenv("TEST_MONGO_URI"):
+        client = MongoClient(os.environ["TEST_MONGO_URI"], event_listeners=[CommandListener()])
+    else:
+        import mongomock
+        count_mongomock_calls()
+        client = mongomock.MongoClient()
+        # Secondary reads need sessions, which mongomock lacks; there is
+        # only one "member" to read from anyway
+        flask_app.config["READ_ROUTING_ENABLED"] = False
+
+    flask_app.config["TEST_MONGO_CLIENT"] = client
+    yield flask_app
+    client.close()
+
+
+@pytest.fixture
+def db(app, monkeypatch):
+    client = app.config["TEST_MONGO_CLIENT"]
+    name = f"studiobase_test_{os.getpid()}"
+    client.drop_database(name)
+    monkeypatch.setattr(mongo, "cx", client)
+    monkeypatch.setattr(mongo, "db", client[name])
+    app.jinja_env.fragment_cache.clear()
+
+    # AI task generation gets a canned answer instead of calling Gemini
+    import projects.routes
+    monkeypatch.setattr(projects.routes, "gemini_model", lambda: CannedModel())
+
+    from indexes import ensure_indexes
+    ensure_indexes()
+    yield client[name]
+
+    # Entries logged by this test belong to this database
+    from activity.log import buffer
+    buffer.flush()
+    client.drop_database(name)
+
+
+class CannedModel:
+
+    class Response:
+        text = '[{"task": "Wireframes", "hours": 4}, {"task": "Build pages", "hours": 12}]'
+
+    def generate_content(self, prompt):
+        return self.Response()
+
+
+@pytest.fixture
+def seed(db):
+    """One user with a realistic spread of data; returns the ids routes need."""
+    from clients.stats import empty_stats
+    from projects.suggestions import project_terms
+
+    now = datetime.utcnow()
+    user = ObjectId()
+    user_id = str(user)
+    db.users.insert_one({
+        "_id": user, "provider": "github", "oauth_id": "1", "username": "tester",
+        "email": "tester@example.com", "avatar_url": "", "calendar_token": "feed-token",
+        "created_at": now,
+    })
+    db.business_profile.insert_one({
+        "user_id": user_id, "business_name": "Studio", "address": "1 Street",
+        "phone": "123", "gstin": "GST", "created_at": now,
+    })
+
+    leads = db.leads.insert_many([{
+        "user_id": user_id, "name": f"Lead {i}", "company": f"Co {i}", "email": f"l{i}@x.com",
+        "source": "Referral", "status": ["Cold", "Warm", "Hot"][i % 3], "score": 10.0 * i,
+        "created_at": now - timedelta(days=i), "status_changed_at": now - timedelta(days=i),
+    } for i in range(8)]).inserted_ids
+    prospects = db.prospects.insert_many([{
+        "user_id": user_id, "name": f"Prospect {i}", "company": f"Co {i}", "email": f"p{i}@x.com",
+        "stage": "Discovery", "probability": 10, "value": 1000.0 * i, "created_at": now,
+    } for i in range(8)]).inserted_ids
+
+    clients = db.clients.insert_many([{
+        "user_id": user_id, "name": f"Client {i}", "company": f"Co {i}", "email": f"c{i}@x.com",
+        "contract_value": 5000.0, "status": "Active", "stats": empty_stats(), "created_at": now,
+    } for i in range(4)]).inserted_ids
+
+    projects = []
+    for i in range(8):
+        title, description = f"Website build {i}", "Landing page, payment gateway and CMS"
+        projects.append(db.projects.insert_one({
+            "user_id": user_id, "client_id": clients[i % 4], "client_name": f"Client {i % 4}",
+            "title": title, "description": description,
+            "status": "Completed" if i == 7 else "Planning",
+            "deadline": now + timedelta(days=7 * (i + 1)), "ai_generated": True,
+            "terms": project_terms(title, description), "created_at": now,
+        }).inserted_id)
+    tasks = db.tasks.insert_many([{
+        "user_id": user_id, "project_id": project_id, "description": f"Task {j}",
+        "hours": 2.0, "status": "Done" if j == 0 else "Pending", "created_at": now,
+    } for project_id in projects for j in range(6)]).inserted_ids
+    # No tasks yet, so suggested tasks and AI generation are still offered
+    empty_project = db.projects.insert_one({
+        "user_id": user_id, "client_id": clients[0], "client_name": "Client 0",
+        "title": "Shop build", "description": "Storefront and payment gateway",
+        "status": "Planning", "deadline": now + timedelta(days=30), "ai_generated": True,
+        "terms": project_terms("Shop build", "Storefront and payment gateway"), "created_at": now,
+    }).inserted_id
+
+    db.invoices.insert_many([{
+        "user_id": user_id, "invoice_number": f"INV-{i:04d}", "client_id": clients[i % 4],
+        "client_name": f"Client {i % 4}", "project_id": projects[i % 8], "project_title": f"Website build {i % 8}",
+        "amount": 1000.0 + i, "due_date": (now + timedelta(days=10 * (i - 5))).strftime("%Y-%m-%d"),
+        "payment_mode": "UPI", "status": "Paid" if i % 3 == 0 else "Unpaid", "created_at": now,
+    } for i in range(12)])
+    unpaid = db.invoices.find_one({"user_id": user_id, "status": "Unpaid"})["_id"]
+
+    db.running_timers.insert_one({
+        "user_id": user_id, "task_id": tasks[1], "project_id": projects[0],
+        "client_id": clients[0], "started_at": now - timedelta(minutes=30),
+    })
+    db.time_rollups.insert_many([
+        {"user_id": user_id, "kind": "task", "key": tasks[1], "seconds": 3600},
+        {"user_id": user_id, "kind": "project", "key": projects[0], "seconds": 3600},
+    ])
+
+    archived_project = ObjectId()
+    db.projects_archive.insert_one({
+        "_id": archived_project, "user_id": user_id, "client_id": clients[0], "client_name": "Client 0",
+        "title": "Old site", "description": "Landing page", "status": "Completed",
+        "deadline": now - timedelta(days=400), "completed_at": now - timedelta(days=300),
+        "archived_at": now - timedelta(days=100), "created_at": now - timedelta(days=420),
+    })
+    db.tasks_archive.insert_one({
+        "user_id": user_id, "project_id": archived_project, "description": "Old task",
+        "hours": 3.0, "status": "Done", "created_at": now - timedelta(days=420),
+    })
+    archived_invoice = db.invoices_archive.insert_one({
+        "user_id": user_id, "invoice_number": "INV-OLD", "client_id": clients[0], "client_name": "Client 0",
+        "project_title": "Old site", "amount": 500.0, "due_date": "2025-01-01", "payment_mode": "UPI",
+        "status": "Paid", "paid_at": now - timedelta(days=300), "archived_at": now - timedelta(days=100),
+        "created_at": now - timedelta(days=420),
+    }).inserted_id
+
+    db.activity.insert_many([{
+        "user_id": user_id, "entity_type": "project", "entity_id": projects[i % 8], "action": "task_added",
+        "summary": f"Task {i}", "refs": [clients[i % 4]], "created_at": now - timedelta(hours=i),
+    } for i in range(30)])
+
+    return {
+        "user_id": user_id,
+        "username": "tester",
+        "lead_id": leads[0],
+        "prospect_id": prospects[0],
+        "client_id": clients[0],
+        "project_id": projects[0],
+        "completed_project_id": projects[7],
+        "empty_project_id": empty_project,
+        "task_id": tasks[1],
+        "invoice_id": unpaid,
+        "archived_project_id": archived_project,
+        "archived_invoice_id": archived_invoice,
+        "token": "feed-token",
+        "entity_type": "project",
+        "entity_id": projects[0],
+    }
+
+
+@pytest.fixture
+def client(app, seed):
+    test_client = app.test_client()
+    with test_client.session_transaction() as session:
+        session["user_id"] = seed["user_id"]
+        session["username"] = seed["username"]
+        session["avatar"] = ""
+    return test_client
+
+
+@pytest.fixture
+def command_log():
+    log.thread = threading.get_ident()
+    log.commands = []
+    return log
+
+
+@pytest.fixture(scope="session")
+def budgets(request):
+    with open(BUDGET_FILE, encoding="utf-8") as f:
+        existing = json.load(f)
+    recorded = {}
+    yield existing, recorded
+
+    if request.config.getoption("--record-budgets"):
+        # Skipped routes keep their reason
+        merged = {key: value for key, value in existing.items() if "skip" in value}
+        merged.update(recorded)
+        with open(BUDGET_FILE, "w", encoding="utf-8", newline="\r\n") as f:
+            json.dump(dict(sorted(merged.items(), key=lambda item: item[0].split(" ", 1)[::-1])), f, indent=2)
+            f.write("\n")
@@ -0,0 +1,28 @@
+from datetime import datetime, timedelta
+
+from archive.store import archive_projects
+
+
+def test_archive_projects_moves_their_tasks(db, command_log):
+    old = datetime.utcnow() - timedelta(days=400)
+    for user_id in ("u1", "u2"):
+        done, live = db.projects.insert_many([
+            {"user_id": user_id, "title": "Old", "status": "Completed", "completed_at": old},
+            {"user_id": user_id, "title": "Live", "status": "Planning", "created_at": old},
+        ]).inserted_ids
+        db.tasks.insert_many([
+            {"user_id": user_id, "project_id": done, "description": "a"},
+            {"user_id": user_id, "project_id": done, "description": "b"},
+            {"user_id": user_id, "project_id": live, "description": "c"},
+        ])
+
+    command_log.active = True
+    assert archive_projects(days=180, batch_size=1) == 2
+    command_log.active = False
+
+    assert db.projects.distinct("title") == ["Live"]
+    assert sorted(t["description"] for t in db.tasks.find({"user_id": "u1"})) == ["c"]
+    assert db.tasks_archive.count_documents({"user_id": "u2", "archived_at": {"$exists": True}}) == 2
+    # Every task query stays on its owner's shard
+    task_commands = [c for c in command_log.commands if c.split()[1] == "tasks"]
+    assert task_commands and all('"user_id"' in c for c in task_commands)
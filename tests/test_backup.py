@@ -0,0 +1,80 @@
+import gzip
+import os
+
+import pytest
+from bson.objectid import ObjectId
+
+from backup.store import COLLECTIONS, iter_backup, restore_backup
+
+
+def write_backup(path, user_id, format):
+    with open(path, "wb") as f:
+        for chunk in iter_backup(user_id, batch_size=7, format=format):
+            f.write(chunk)
+
+
+def counts(db, user_id):
+    return {name: db[name].count_documents({"user_id": user_id}) for name in COLLECTIONS}
+
+
+@pytest.mark.parametrize("format", [
+    "json",
+    pytest.param("bson", marks=pytest.mark.skipif(
+        not os.getenv("TEST_MONGO_URI"), reason="mongomock can't return raw BSON documents"
+    )),
+])
+def test_restore_into_fresh_deployment(db, seed, tmp_path, format):
+    path = tmp_path / f"backup.{format}.gz"
+    write_backup(path, seed["user_id"], format)
+    before = counts(db, seed["user_id"])
+    for name in COLLECTIONS + ["users"]:
+        db[name].delete_many({})
+
+    user_id, restored = restore_backup(path)
+
+    assert user_id != seed["user_id"]
+    assert counts(db, user_id) == before
+    assert restored["users"] == 1
+    assert {name: restored.get(name, 0) for name in COLLECTIONS} == before
+
+    # The feed token is a secret of the old account
+    user = db.users.find_one({"_id": ObjectId(user_id)})
+    assert user["email"] == "tester@example.com"
+    assert "calendar_token" not in user
+
+    # References follow the remapped ids
+    projects = {p["_id"] for p in db.projects.find({"user_id": user_id}, {"_id": 1})}
+    assert seed["project_id"] not in projects
+    assert {t["project_id"] for t in db.tasks.find({"user_id": user_id})} <= projects
+
+
+def test_restore_into_same_account_adds_nothing(db, seed, tmp_path):
+    path = tmp_path / "backup.gz"
+    write_backup(path, seed["user_id"], "json")
+    before = counts(db, seed["user_id"])
+
+    user_id, restored = restore_backup(path)
+
+    assert user_id == seed["user_id"]
+    assert sum(restored.values()) == 0
+    assert counts(db, user_id) == before
+
+
+def test_restore_after_delete_brings_back_missing_documents(db, seed, tmp_path):
+    path = tmp_path / "backup.gz"
+    write_backup(path, seed["user_id"], "json")
+    db.tasks.delete_many({"project_id": seed["project_id"]})
+
+    _, restored = restore_backup(path)
+
+    assert restored["tasks"] == 6
+    assert db.tasks.count_documents({"project_id": seed["project_id"]}) == 6
+
+
+def test_restore_rejects_other_files(db, tmp_path):
+    path = tmp_path / "notes.gz"
+    with gzip.open(path, "wb") as f:
+        f.write(b'{"hello": "world"}\n')
+
+    with pytest.raises(ValueError):
+        restore_backup(path)
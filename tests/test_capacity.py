@@ -0,0 +1,76 @@
+from datetime import date, datetime
+
+from capacity.planner import plan
+
+MONDAY = date(2030, 1, 7)
+
+
+def project(name, deadline=None):
+    return {"_id": name, "title": name, "deadline": datetime.fromisoformat(deadline) if deadline else None}
+
+
+def rows(result):
+    return {row["_id"]: row for row in result["rows"]}
+
+
+def test_spreads_hours_over_working_days_to_the_deadline():
+    result = plan(
+        [project("a", "2030-01-11"), project("b", "2030-01-18")],
+        {"a": 10, "b": 20},
+        MONDAY, capacity=40, weeks=3
+    )
+
+    assert result["weeks"] == [date(2030, 1, 7), date(2030, 1, 14), date(2030, 1, 21)]
+    assert rows(result)["a"]["load"] == [10, 0, 0]
+    assert rows(result)["b"]["load"] == [10, 10, 0]
+    assert result["totals"] == [20, 10, 0]
+    assert result["overloaded"] == [False, False, False]
+    assert not any(row["at_risk"] for row in result["rows"])
+
+
+def test_flags_overdue_rushed_and_overloaded_projects():
+    result = plan(
+        [
+            project("late", "2030-01-01"),
+            project("rushed", "2030-01-08"),
+            project("steady", "2030-01-25"),
+        ],
+        {"late": 6, "rushed": 20, "steady": 15},
+        MONDAY, capacity=30, weeks=4
+    )
+    by_id = rows(result)
+
+    # Overdue work all lands today
+    assert by_id["late"]["load"][0] == 6
+    assert by_id["late"]["reason"] == "Overdue"
+    assert by_id["rushed"]["reason"] == "Needs 10.0 hrs/day"
+    assert result["overloaded"][0]
+    assert by_id["steady"]["reason"] == "In an overloaded week"
+    # At-risk projects first, then by deadline
+    assert [row["_id"] for row in result["rows"]] == ["late", "rushed", "steady"]
+
+
+def test_weekend_deadline_and_hours_beyond_the_horizon():
+    result = plan(
+        [project("weekend", "2030-01-06"), project("far", "2030-03-01")],
+        {"weekend": 4, "far": 40},
+        # Saturday: no working day left before Sunday's deadline
+        date(2030, 1, 5), capacity=40, weeks=2
+    )
+    by_id = rows(result)
+
+    assert by_id["weekend"]["load"] == [4, 0]
+    assert by_id["far"]["later"] > 0
+    assert sum(by_id["far"]["load"]) + by_id["far"]["later"] == 40
+
+
+def test_unscheduled_and_idle_projects():
+    result = plan(
+        [project("no-deadline"), project("done", "2030-01-11")],
+        {"no-deadline": 5},
+        MONDAY, capacity=40
+    )
+
+    assert result["rows"] == []
+    assert [p["_id"] for p in result["unscheduled"]] == ["no-deadline"]
+    assert result["unscheduled"][0]["hours"] == 5
@@ -0,0 +1,27 @@
+from clients.stats import rebuild_client_stats, refresh_overdue
+
+
+def test_rebuild_client_stats(db, seed):
+    db.time_rollups.insert_one({"user_id": seed["user_id"], "kind": "client", "key": seed["client_id"], "seconds": 5400})
+
+    assert rebuild_client_stats(seed["user_id"]) == 4
+
+    stats = db.clients.find_one({"_id": seed["client_id"]})["stats"]
+    # INV-0000 (paid), INV-0004, INV-0008 and the archived INV-OLD (paid)
+    assert stats["invoiced"] == 1000 + 1004 + 1008 + 500
+    assert stats["paid"] == 1500
+    assert stats["outstanding"] == 2012
+    # Two seeded, the empty one and the archived one
+    assert (stats["projects"], stats["projects_completed"]) == (4, 1)
+    assert stats["task_hours"] == 1.5
+
+
+def test_refresh_overdue_repairs_negative_counts(db, seed):
+    # An invoice that fell due since the last refresh was paid, and the
+    # route took one off a count that never included it
+    db.invoices.delete_many({"client_id": seed["client_id"]})
+    db.clients.update_one({"_id": seed["client_id"]}, {"$set": {"stats.overdue": -1}})
+
+    refresh_overdue()
+
+    assert db.clients.find_one({"_id": seed["client_id"]})["stats"]["overdue"] == 0
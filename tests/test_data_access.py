@@ -0,0 +1,33 @@
+import textwrap
+
+from flask import Blueprint, Flask
+
+from repositories import direct_access_violations
+
+
+def test_routes_go_through_repositories(app):
+    violations = direct_access_violations(app)
+    assert violations == [], "\n".join(f"{module}:{line}: {what}" for module, line, what in violations)
+
+
+def test_direct_access_is_reported(tmp_path, monkeypatch):
+    (tmp_path / "leaky_routes.py").write_text(textwrap.dedent("""
+        from extensions import mongo, read_db
+
+        def leads():
+            return str(mongo.db.leads.find_one() or read_db().leads.count_documents({}))
+    """))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    import leaky_routes
+
+    bp = Blueprint("leaky", __name__)
+    bp.add_url_rule("/leaky", view_func=leaky_routes.leads)
+    leaky = Flask(__name__)
+    leaky.register_blueprint(bp)
+
+    assert sorted(direct_access_violations(leaky)) == [
+        ("leaky_routes", 2, "import mongo"),
+        ("leaky_routes", 2, "import read_db"),
+        ("leaky_routes", 5, "mongo.db"),
+        ("leaky_routes", 5, "read_db()"),
+    ]
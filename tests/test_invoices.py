@@ -0,0 +1,21 @@
+import pytest
+
+
+@pytest.mark.parametrize("client_id,project_id", [
+    ("", ""),
+    ("not-an-id", "{project_id}"),
+    ("{client_id}", "zzzzzzzzzzzzzzzzzzzzzzzz"),
+])
+def test_create_invoice_ignores_malformed_ids(client, db, seed, client_id, project_id):
+    response = client.post("/invoices", data={
+        "client_id": client_id.format(**seed), "project_id": project_id.format(**seed),
+        "amount": "100", "due_date": "2030-01-01", "payment_mode": "UPI",
+    })
+
+    assert response.status_code == 302
+    invoice = db.invoices.find_one({"amount": 100})
+    assert invoice["project_id"] is None
+    if client_id == "{client_id}":
+        assert invoice["client_id"] == seed["client_id"]
+    else:
+        assert (invoice["client_id"], invoice["client_name"]) == (None, "Manual Client")
@@ -0,0 +1,15 @@
+from live.hub import hub
+
+
+def test_stream_over_the_cap_sends_state_and_closes(app, client, seed, monkeypatch):
+    monkeypatch.setitem(app.config, "LIVE_MAX_STREAMS", 0)
+
+    response = client.get("/live/stream")
+    body = response.get_data(as_text=True)
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    assert body.startswith("retry: 30000\n\n")
+    assert "event: stats\ndata: " in body
+    assert f'"project_id": "{seed["project_id"]}"' in body
+    assert hub.users() == []
@@ -0,0 +1,28 @@
+from bson.objectid import ObjectId
+
+from migrations import backfill_invoice_refs
+
+
+def test_backfill_invoice_refs(db):
+    first, second = ObjectId(), ObjectId()
+    db.clients.insert_many([
+        {"_id": first, "user_id": "u1", "name": "Acme"},
+        # Same name later on: the oldest record wins
+        {"_id": second, "user_id": "u1", "name": "Acme"},
+        {"user_id": "u2", "name": "Acme"},
+    ])
+    site = db.projects.insert_one({"user_id": "u1", "client_id": first, "title": "Site"}).inserted_id
+    db.invoices.insert_many([
+        {"user_id": "u1", "client_name": "Acme", "project_title": "Site"},
+        {"user_id": "u1", "client_name": "Acme", "project_title": "Gone"},
+        {"user_id": "u1", "client_name": "Nobody", "project_title": "Site"},
+        {"user_id": "u1", "client_name": "Acme", "client_id": second, "project_id": None},
+    ])
+
+    assert backfill_invoice_refs(batch_size=2) == 3
+
+    refs = [(inv["client_id"], inv["project_id"]) for inv in db.invoices.find().sort("_id", 1)]
+    assert refs == [(first, site), (first, None), (None, None), (second, None)]
+
+    # Unmatched invoices got explicit None references, so a rerun has nothing to do
+    assert backfill_invoice_refs() == 0
@@ -0,0 +1,157 @@
+import math
+import os
+import re
+import time
+from urllib.parse import urlsplit
+
+import pytest
+from bson.objectid import ObjectId
+
+from app import app
+
+
+# Every route, run with a logged-in session against the seeded database,
+# must stay within its budget in tests/query_budgets.json: a maximum number
+# of Mongo commands and a rough latency. Redirects are not followed, so a
+# form POST is measured on its own; the status and redirect target are
+# recorded too, so a route that bails out early (a bad seed id, an auth
+# bounce) fails instead of passing on a tiny budget. After a change that
+# legitimately moves a budget, rerun with --record-budgets and review the
+# diff.
+
+ROUTES = sorted(
+    (method, rule.rule, rule.endpoint)
+    for rule in app.url_map.iter_rules()
+    if rule.endpoint not in ("static", "dist_asset")
+    for method in rule.methods - {"HEAD", "OPTIONS"}
+)
+
+# URL arguments that need something other than the seed id of the same name
+ARGS = {
+    "/archive/projects/<project_id>/restore": {"project_id": "archived_project_id"},
+    "/archive/invoices/<invoice_id>/restore": {"invoice_id": "archived_invoice_id"},
+    "/projects/<project_id>/tasks/suggested": {"project_id": "empty_project_id"},
+    "/projects/<project_id>/tasks/generate": {"project_id": "empty_project_id"},
+}
+
+# POST bodies; "{name}" is replaced with that seed id
+FORMS = {
+    "/leads": {"name": "New lead", "company": "Acme", "email": "lead@acme.test", "source": "Referral"},
+    "/leads/update_status/<lead_id>": {"status": "Hot"},
+    "/prospects": {"name": "New prospect", "company": "Acme", "email": "p@acme.test", "value": "2500"},
+    "/prospects/update_stage/<prospect_id>": {"stage": "Proposal"},
+    "/prospects/update_value/<prospect_id>": {"value": "4000"},
+    "/clients": {"name": "New client", "company": "Acme", "email": "c@acme.test", "contract_value": "9000"},
+    "/clients/<client_id>/projects": {
+        "title": "Website build", "description": "Landing page and payment gateway", "deadline": "2030-01-31",
+    },
+    "/projects/<project_id>/tasks/add": {"description": "Write copy", "hours": "3"},
+    "/projects/<project_id>/tasks/suggested": {"source_id": "{completed_project_id}", "archived": ""},
+    "/tasks/<task_id>/edit": {"description": "Write more copy", "hours": "4"},
+    "/tasks/<task_id>/time": {"hours": "1.5", "date": "2030-01-02", "note": "Copy"},
+    "/business": {"business_name": "Studio", "address": "2 Street", "phone": "456", "gstin": "GST2"},
+    "/invoices": {
+        "client_id": "{client_id}", "project_id": "{project_id}", "amount": "1200",
+        "due_date": "2030-02-01", "payment_mode": "UPI",
+    },
+    "/capacity": {"weekly_capacity": "30"},
+    "/calendar/token": {"action": "reset"},
+}
+
+LATENCY_FACTOR = float(os.getenv("QUERY_BUDGET_LATENCY_FACTOR", "1"))
+
+# Recorded latency budgets never go below this; a cold first call on a
+# shared CI runner easily takes tens of milliseconds
+LATENCY_FLOOR_MS = 250
+
+
+def build_request(method, rule, endpoint, seed):
+    arguments = next(r.arguments for r in app.url_map.iter_rules(endpoint) if r.rule == rule)
+    names = ARGS.get(rule, {})
+    path = app.url_map.bind("localhost").build(
+        endpoint, {arg: str(seed[names.get(arg, arg)]) for arg in arguments}, method=method
+    )
+    data = None
+    if method == "POST":
+        data = {key: value.format(**seed) for key, value in FORMS.get(rule, {}).items()}
+    return path, data
+
+
+def redirect_target(response, seed):
+    """Where `response` redirects, with seed ids as "{name}" and new ones as "<id>".
+
+    Off-site redirects (OAuth) keep only their host and path.
+    """
+    if not response.location:
+        return None
+    parts = urlsplit(response.location)
+    if parts.netloc not in ("", "localhost"):
+        return parts.netloc + parts.path
+    target = parts.path + (f"?{parts.query}" if parts.query else "")
+    for name, value in seed.items():
+        if isinstance(value, ObjectId):
+            target = target.replace(str(value), "{%s}" % name)
+    return re.sub(r"[0-9a-f]{24}", "<id>", target)
+
+
+@pytest.mark.parametrize("method,rule,endpoint", ROUTES, ids=[f"{m} {r}" for m, r, _ in ROUTES])
+def test_route_within_budget(method, rule, endpoint, request, budgets):
+    existing, recorded = budgets
+    key = f"{method} {rule}"
+    budget = existing.get(key, {})
+    if "skip" in budget:
+        pytest.skip(budget["skip"])
+
+    recording = request.config.getoption("--record-budgets")
+    if not budget and not recording:
+        pytest.fail(f"{key} has no budget in tests/query_budgets.json; run pytest --record-budgets")
+
+    client = request.getfixturevalue("client")
+    seed = request.getfixturevalue("seed")
+    log = request.getfixturevalue("command_log")
+    path, data = build_request(method, rule, endpoint, seed)
+
+    log.active = True
+    started = time.perf_counter()
+    try:
+        response = client.open(path, method=method, data=data)
+        response.get_data()
+    finally:
+        elapsed = (time.perf_counter() - started) * 1000
+        log.active = False
+
+    assert response.status_code < 500, f"{key} returned {response.status_code}"
+    location = redirect_target(response, seed)
+
+    commands = len(log.commands)
+    if recording:
+        # Latency budgets are deliberately loose; they catch regressions in
+        # kind (a query per row), not noise
+        recorded[key] = {"status": response.status_code}
+        if location:
+            recorded[key]["location"] = location
+        recorded[key].update(
+            max_commands=commands, max_ms=max(LATENCY_FLOOR_MS, math.ceil(elapsed * 5 / 50) * 50)
+        )
+        return
+
+    assert response.status_code == budget["status"], (
+        f"{key} returned {response.status_code}, expected {budget['status']}"
+    )
+    assert location == budget.get("location"), (
+        f"{key} redirected to {location}, expected {budget.get('location')}"
+    )
+
+    assert commands <= budget["max_commands"], (
+        f"{key} sent {commands} Mongo commands, budget is {budget['max_commands']}:\n{log.summary()}"
+    )
+    assert elapsed <= budget["max_ms"] * LATENCY_FACTOR, (
+        f"{key} took {elapsed:.0f} ms, budget is {budget['max_ms'] * LATENCY_FACTOR:.0f} ms; "
+        f"its {commands} Mongo commands:\n{log.summary()}"
+    )
+
+
+def test_budget_file_has_no_stale_routes(budgets):
+    existing, _ = budgets
+    routes = {f"{method} {rule}" for method, rule, _ in ROUTES}
+    assert sorted(set(existing) - routes) == []
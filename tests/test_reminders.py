@@ -0,0 +1,84 @@
+import smtplib
+
+import pytest
+
+import reminders
+
+# The seed's overdue unpaid invoices
+DUE = {"INV-0001", "INV-0002", "INV-0004"}
+
+
+class FakeSMTP:
+
+    def __init__(self, fail=None):
+        self.fail = fail or {}
+        self.sent = []
+
+    def send_message(self, msg):
+        number = msg["Subject"].split()[3]
+        if number in self.fail:
+            raise self.fail[number]
+        self.sent.append(number)
+
+    def quit(self):
+        pass
+
+
+def reminded(db):
+    return {inv["invoice_number"] for inv in db.invoices.find({"last_reminded_at": {"$exists": True}})}
+
+
+def test_sends_one_reminder_per_overdue_invoice(app, db, seed, monkeypatch):
+    smtp = FakeSMTP()
+    monkeypatch.setattr(reminders, "_connect", lambda: smtp)
+
+    with app.app_context():
+        stats = reminders.dispatch_reminders()
+        again = reminders.dispatch_reminders()
+
+    assert sorted(smtp.sent) == sorted(DUE)
+    assert stats == {"sent": 3, "skipped": 0, "failed": 0}
+    assert again["sent"] == 0
+    assert reminded(db) == DUE
+
+
+def test_failed_message_is_unclaimed_and_retried(app, db, seed, monkeypatch):
+    smtp = FakeSMTP(fail={"INV-0002": smtplib.SMTPRecipientsRefused({})})
+    monkeypatch.setattr(reminders, "_connect", lambda: smtp)
+
+    with app.app_context():
+        stats = reminders.dispatch_reminders()
+        assert stats == {"sent": 2, "skipped": 0, "failed": 1}
+        assert reminded(db) == DUE - {"INV-0002"}
+
+        smtp.fail.clear()
+        assert reminders.dispatch_reminders()["sent"] == 1
+    assert reminded(db) == DUE
+
+
+def test_bad_invoice_does_not_stop_the_batch(app, db, seed, monkeypatch):
+    db.invoices.update_one({"invoice_number": "INV-0001"}, {"$set": {"due_date": "2020-1-1x"}})
+    smtp = FakeSMTP()
+    monkeypatch.setattr(reminders, "_connect", lambda: smtp)
+
+    with app.app_context():
+        stats = reminders.dispatch_reminders()
+
+    assert stats["failed"] == 1
+    assert reminded(db) == DUE - {"INV-0001"}
+
+
+def test_failed_reconnect_unclaims_the_rest_of_the_batch(app, db, seed, monkeypatch):
+    connections = [FakeSMTP(fail={"INV-0001": smtplib.SMTPServerDisconnected()})]
+
+    def connect():
+        if not connections:
+            raise ConnectionRefusedError()
+        return connections.pop()
+
+    monkeypatch.setattr(reminders, "_connect", connect)
+
+    with app.app_context(), pytest.raises(ConnectionRefusedError):
+        reminders.dispatch_reminders()
+
+    assert reminded(db) == set()
@@ -0,0 +1,100 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+import scheduler as scheduler_module
+from scheduler import Scheduler, next_run, parse_cron
+
+
+@pytest.mark.parametrize("expr,after,expected", [
+    ("*/15 * * * *", "2030-01-07 10:07:30", "2030-01-07 10:15"),
+    ("*/15 * * * *", "2030-01-07 23:59", "2030-01-08 00:00"),
+    # Strictly after, even on a matching minute
+    ("0 3 * * *", "2030-01-07 03:00", "2030-01-08 03:00"),
+    # Friday evening -> Monday morning
+    ("0 9 * * 1-5", "2030-01-04 10:00", "2030-01-07 09:00"),
+    # Sunday may be written as 7
+    ("30 6 * * 7", "2030-01-01 00:00", "2030-01-06 06:30"),
+    # Day of month OR day of week when both are restricted
+    ("0 0 13 * 5", "2030-01-01 00:00", "2030-01-04 00:00"),
+    ("0 0 1,15 * *", "2030-01-15 12:00", "2030-02-01 00:00"),
+    ("0 12 1 1-12/3 *", "2030-02-01 00:00", "2030-04-01 12:00"),
+    ("0 0 29 2 *", "2030-03-01 00:00", "2032-02-29 00:00"),
+])
+def test_next_run(expr, after, expected):
+    moment = datetime.fromisoformat(after)
+    assert next_run(parse_cron(expr), moment) == datetime.fromisoformat(expected)
+
+
+@pytest.mark.parametrize("expr", ["* * * *", "60 * * * *", "* 24 * * *", "0 0 0 * *", "5-1 * * * *"])
+def test_parse_cron_rejects(expr):
+    with pytest.raises(ValueError):
+        parse_cron(expr)
+
+
+def test_next_run_never_matching():
+    with pytest.raises(ValueError):
+        next_run(parse_cron("0 0 31 2 *"), datetime(2030, 1, 1))
+
+
+@pytest.fixture
+def jobs(app, db, monkeypatch):
+    """A scheduler with a quick job and a slow one that waits for `release`."""
+    release = threading.Event()
+    started = threading.Event()
+
+    def slow(config):
+        started.set()
+        release.wait(5)
+        return "slow"
+
+    monkeypatch.setitem(scheduler_module.JOBS, "quick", lambda config: "quick")
+    monkeypatch.setitem(scheduler_module.JOBS, "slow", slow)
+    monkeypatch.setitem(app.config, "SCHEDULER_POLL_INTERVAL", 0.05)
+    monkeypatch.setitem(app.config, "SCHEDULER_JOBS", {
+        "quick": {"cron": "* * * * *", "timeout": 60},
+        "slow": {"cron": "* * * * *", "timeout": 60},
+    })
+    jobs = Scheduler()
+    jobs.init_app(app)
+    jobs.sync()
+    db.scheduler_locks.update_many({}, {"$set": {"next_run_at": datetime.utcnow() - timedelta(minutes=1)}})
+    yield jobs, started, release
+    release.set()
+
+
+def test_slow_job_does_not_hold_up_the_others(db, jobs):
+    jobs, started, release = jobs
+    runners = jobs.tick()
+
+    assert started.wait(5)
+    quick = next(runner for runner in runners if runner.name == "run-quick")
+    quick.join(5)
+    assert db.scheduler_runs.find_one({"job": "quick"})["status"] == "ok"
+    assert db.scheduler_runs.find_one({"job": "slow"})["status"] == "running"
+
+    release.set()
+    for runner in runners:
+        runner.join(5)
+    assert db.scheduler_runs.find_one({"job": "slow"})["status"] == "ok"
+
+
+def test_lease_is_renewed_while_the_job_runs(db, jobs):
+    jobs, started, release = jobs
+    runner = threading.Thread(target=jobs.run, args=("slow",))
+    runner.start()
+    assert started.wait(5)
+
+    lease = db.scheduler_locks.find_one({"_id": "slow"})
+    first = lease["locked_until"]
+    assert first == lease["started_at"] + timedelta(seconds=60)
+    time.sleep(0.2)
+    assert db.scheduler_locks.find_one({"_id": "slow"})["locked_until"] > first
+    # Still held: no other run can take it
+    assert jobs.run("slow", trigger="manual") is None
+
+    release.set()
+    runner.join(5)
+    assert db.scheduler_locks.find_one({"_id": "slow"})["locked_until"] <= datetime.utcnow()
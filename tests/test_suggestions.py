@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from projects.suggestions import hash_terms, index_projects, project_terms, rank, suggest_tasks
+
+
+def test_hash_terms_skips_stop_words_and_keeps_pairs():
+    terms = hash_terms("The landing page for a shop")
+    # landing, page, shop, "landing page", "page shop"
+    assert len(terms) == 5
+    assert terms.dtype == np.uint16
+    assert list(terms) == sorted(terms)
+
+
+def test_project_terms_round_trip():
+    stored = project_terms("Shop build", "Payment gateway")
+    assert np.array_equal(np.frombuffer(stored, dtype=np.uint16), hash_terms("Shop build Payment gateway"))
+
+
+def test_rank_orders_by_similarity():
+    docs = [
+        hash_terms("Logo and brand identity"),
+        hash_terms("Shopify store with payment gateway"),
+        hash_terms("Shopify theme tweaks"),
+    ]
+    query = hash_terms("New Shopify store and payment gateway")
+    ranked = rank(query, docs, min_score=0)
+
+    assert [i for i, _ in ranked] == [1, 2, 0]
+    assert ranked[0][1] > ranked[1][1] > ranked[2][1] == 0
+    assert ranked[0][1] <= 1
+    assert rank(query, docs, limit=1) == ranked[:1]
+    assert [i for i, _ in rank(query, docs)] == [1]
+
+
+def test_rank_drops_weak_and_empty_matches():
+    docs = [hash_terms("Logo and brand identity")]
+    assert rank(hash_terms("Shopify store"), docs) == []
+    assert rank(hash_terms(""), docs) == []
+    assert rank(hash_terms("Shopify store"), []) == []
+    assert [i for i, _ in rank(hash_terms("Logo identity"), docs)] == [0]
+
+
+def test_suggest_tasks_from_completed_projects(db, seed):
+    project = db.projects.find_one({"_id": seed["empty_project_id"]})
+    suggestions = suggest_tasks(seed["user_id"], project)
+
+    assert [s["project"]["_id"] for s in suggestions] == [seed["completed_project_id"]]
+    assert len(suggestions[0]["tasks"]) == 6
+    assert suggestions[0]["hours"] == 12
+
+
+def test_index_projects_fills_missing_terms(db, seed):
+    db.projects.update_many({}, {"$unset": {"terms": ""}})
+    db.projects_archive.update_many({}, {"$unset": {"terms": ""}})
+
+    assert index_projects(seed["user_id"]) == db.projects.count_documents({}) + db.projects_archive.count_documents({})
+    assert index_projects(seed["user_id"]) == 0
+    assert db.projects.count_documents({"terms": {"$exists": False}}) == 0
+
+
+@pytest.mark.parametrize("form", [{}, {"source_id": ""}, {"source_id": "not-an-id"}])
+def test_use_suggested_tasks_rejects_malformed_source(client, db, seed, form):
+    project_id = seed["empty_project_id"]
+    response = client.post(f"/projects/{project_id}/tasks/suggested", data=form)
+
+    assert response.status_code == 302
+    assert response.location.endswith(f"/projects/{project_id}")
+    assert db.tasks.count_documents({"project_id": project_id}) == 0
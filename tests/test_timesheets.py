@@ -0,0 +1,23 @@
+from datetime import datetime, timedelta
+
+
+def test_dashboard_shows_weekly_tracked_time(client, seed):
+    last_week = (datetime.utcnow() - timedelta(days=7)).strftime("%Y-%m-%d")
+    client.post(f"/tasks/{seed['task_id']}/time", data={"hours": "1.5"})
+    client.post(f"/tasks/{seed['task_id']}/time", data={"hours": "2", "date": last_week})
+
+    page = client.get("/dashboard").get_data(as_text=True)
+
+    assert "1.5 hrs tracked this week &middot; 2.0 last week" in page
+
+
+def test_stopping_a_timer_adds_to_every_rollup(client, db, seed):
+    client.post(f"/tasks/{seed['task_id']}/timer/stop")
+
+    totals = {doc["kind"]: doc["seconds"] for doc in db.time_rollups.find({"user_id": seed["user_id"]})}
+    # The seed's timer started 30 minutes ago, on top of an hour already tracked
+    assert 5400 <= totals["task"] < 5460
+    assert 5400 <= totals["project"] < 5460
+    assert 1800 <= totals["client"] < 1860
+    assert 1800 <= totals["week"] < 1860
+    assert db.running_timers.count_documents({"user_id": seed["user_id"]}) == 0
@@ -0,0 +1,90 @@
+from flask import session, redirect, url_for, request
+from bson.objectid import ObjectId
+from datetime import datetime
+
+from repositories import projects as projects_repo, tasks as tasks_repo
+from versions import bump_versions
+from activity.log import log_activity
+from clients.stats import inc_client_stats
+from .store import record_entry, start_running_timer, pop_timer
+from . import timesheets_bp
+
+
+def load_task(task_id):
+    task = tasks_repo.get(session["user_id"], ObjectId(task_id), {"project_id": 1})
+    if not task:
+        return None, None
+
+    project = projects_repo.get(session["user_id"], task["project_id"], {"client_id": 1, "status": 1})
+    return task, project
+
+
+@timesheets_bp.route("/tasks/<task_id>/timer/start", methods=["POST"])
+def start_timer(task_id):
+    if "user_id" not in session:
+        return redirect(url_for("auth.index"))
+
+    task, project = load_task(task_id)
+    if not task:
+        return redirect(url_for("dashboard.dashboard"))
+
+    if project and project["status"] != "Completed":
+        start_running_timer(session["user_id"], task, project.get("client_id"))
+        bump_versions(session["user_id"], "time")
+        log_activity("project", task["project_id"], "timer_started")
+
+    return redirect(url_for("projects.project_detail", project_id=task["project_id"]))
+
+
+@timesheets_bp.route("/tasks/<task_id>/timer/stop", methods=["POST"])
+def stop_timer(task_id):
+    if "user_id" not in session:
+        return redirect(url_for("auth.index"))
+
+    timer = pop_timer(session["user_id"], ObjectId(task_id))
+    if not timer:
+        return redirect(url_for("dashboard.dashboard"))
+
+    seconds = record_entry(
+        user_id=session["user_id"],
+        task_id=timer["task_id"],
+        project_id=timer["project_id"],
+        client_id=timer.get("client_id"),
+        started_at=timer["started_at"],
+        seconds=(datetime.utcnow() - timer["started_at"]).total_seconds()
+    )
+    inc_client_stats(session["user_id"], timer.get("client_id"), task_hours=seconds / 3600)
+    bump_versions(session["user_id"], "time", "clients")
+    log_activity("project", timer["project_id"], "timer_stopped")
+
+    return redirect(url_for("projects.project_detail", project_id=timer["project_id"]))
+
+
+@timesheets_bp.route("/tasks/<task_id>/time", methods=["POST"])
+def log_time(task_id):
+    if "user_id" not in session:
+        return redirect(url_for("auth.index"))
+
+    task, project = load_task(task_id)
+    if not task:
+        return redirect(url_for("dashboard.dashboard"))
+
+    date_raw = request.form.get("date")
+    started_at = datetime.fromisoformat(date_raw) if date_raw else datetime.utcnow()
+
+    if project and project["status"] != "Completed":
+        seconds = record_entry(
+            user_id=session["user_id"],
+            task_id=task["_id"],
+            project_id=task["project_id"],
+            client_id=project.get("client_id"),
+            started_at=started_at,
+            seconds=float(request.form.get("hours", 0)) * 3600,
+            source="manual",
+            note=request.form.get("note") or None
+        )
+        inc_client_stats(session["user_id"], project.get("client_id"), task_hours=seconds / 3600)
+        bump_versions(session["user_id"], "time", "clients")
+        log_activity("project", task["project_id"], "time_logged", f"{request.form.get('hours')} hrs")
+
+    return redirect(url_for("projects.project_detail", project_id=task["project_id"]))
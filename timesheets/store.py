@@ -0,0 +1,114 @@
+from datetime import datetime
+
+from bson.objectid import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from extensions import mongo, read_db
+
+
+# Time entries live in per-user, per-day bucket documents (`time_buckets`),
+# so logging time is a single $push. Totals by task, project, client and ISO
+# week are kept in `time_rollups` with $inc at write time, so pages never
+# scan raw entries.
+
+BUCKET_SIZE = 200
+
+
+def week_key(moment):
+    year, week, _ = moment.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def record_entry(user_id, task_id, project_id, client_id, started_at, seconds,
+                 source="timer", note=None):
+    """Store one entry and roll it up; returns the seconds recorded."""
+    seconds = int(seconds)
+    if seconds <= 0:
+        return 0
+
+    entry = {
+        "_id": ObjectId(),
+        "task_id": task_id,
+        "project_id": project_id,
+        "client_id": client_id,
+        "started_at": started_at,
+        "seconds": seconds,
+        "source": source,
+        "note": note,
+        "created_at": datetime.utcnow(),
+    }
+
+    mongo.db.time_buckets.update_one(
+        {
+            "user_id": user_id,
+            "day": started_at.strftime("%Y-%m-%d"),
+            "count": {"$lt": BUCKET_SIZE}
+        },
+        {
+            "$push": {"entries": entry},
+            "$inc": {"count": 1, "seconds": seconds}
+        },
+        upsert=True
+    )
+
+    keys = [
+        ("task", task_id),
+        ("project", project_id),
+        ("client", client_id),
+        ("week", week_key(started_at)),
+    ]
+    mongo.db.time_rollups.bulk_write([
+        UpdateOne(
+            {"user_id": user_id, "kind": kind, "key": key},
+            {"$inc": {"seconds": seconds}},
+            upsert=True
+        )
+        for kind, key in keys if key is not None
+    ], ordered=False)
+    return seconds
+
+
+def rollups(user_id, kind, keys):
+    return {
+        doc["key"]: doc["seconds"]
+        for doc in read_db().time_rollups.find(
+            {"user_id": user_id, "kind": kind, "key": {"$in": list(keys)}},
+            {"key": 1, "seconds": 1}
+        )
+    }
+
+
+def running_timers(user_id, project_id):
+    return {
+        doc["task_id"]: doc["started_at"]
+        for doc in read_db().running_timers.find(
+            {"user_id": user_id, "project_id": project_id},
+            {"task_id": 1, "started_at": 1}
+        )
+    }
+
+
+def start_running_timer(user_id, task, client_id):
+    """Returns False when the task's timer was already running."""
+    try:
+        mongo.db.running_timers.insert_one({
+            "user_id": user_id,
+            "task_id": task["_id"],
+            "project_id": task["project_id"],
+            "client_id": client_id,
+            "started_at": datetime.utcnow()
+        })
+    except DuplicateKeyError:
+        return False
+    return True
+
+
+def pop_timer(user_id, task_id):
+    """Remove a task's running timer and return it, if there was one."""
+    return mongo.db.running_timers.find_one_and_delete({"user_id": user_id, "task_id": task_id})
+
+
+def drop_timers(user_id, project_ids):
+    """Discard running timers on deleted projects without recording them."""
+    mongo.db.running_timers.delete_many({"user_id": user_id, "project_id": {"$in": list(project_ids)}})
@@ -0,0 +1,86 @@
+import hashlib
+from datetime import datetime
+from functools import wraps
+
+from flask import current_app, g, make_response, request, session
+
+from extensions import mark_write, mongo, read_db
+
+
+# ---------- Data Versions ----------
+# One document per user in `data_versions`, holding a counter per collection.
+# Every write route bumps the counters of the collections it touches.
+
+def bump_versions(user_id, *collections):
+    mongo.db.data_versions.update_one(
+        {"_id": user_id},
+        {"$inc": {name: 1 for name in collections}},
+        upsert=True
+    )
+    mark_write()
+
+
+def get_versions(user_id, collections):
+    # Read first, in the same causal session as the page data (see
+    # extensions.read_db), so the data is never older than the versions
+    doc = read_db().data_versions.find_one(
+        {"_id": user_id},
+        {name: 1 for name in collections}
+    ) or {}
+    return [doc.get(name, 0) for name in collections]
+
+
+def clear_versions(user_id):
+    mongo.db.data_versions.delete_one({"_id": user_id})
+
+
+def data_version(*collections):
+    """Version string for the current user, reusing what @conditional loaded."""
+    known = g.setdefault("data_versions", {})
+    missing = [name for name in collections if name not in known]
+    if missing:
+        known.update(zip(missing, get_versions(session["user_id"], missing)))
+    return "-".join(str(known[name]) for name in collections)
+
+
+# ---------- Conditional GET ----------
+
+def conditional(*collections):
+    """Serve 304 when none of `collections` changed for the current user.
+
+    The ETag also covers the page URL, the sidebar identity, the UTC date
+    (overdue flags move daily) and RELEASE_VERSION (templates change on deploy).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method != "GET" or "user_id" not in session:
+                return view(*args, **kwargs)
+
+            user_id = session["user_id"]
+            versions = get_versions(user_id, collections)
+            g.data_versions = dict(zip(collections, versions))
+            raw = "|".join([
+                current_app.config.get("RELEASE_VERSION", ""),
+                user_id,
+                session.get("username") or "",
+                session.get("avatar") or "",
+                request.full_path,
+                datetime.utcnow().strftime("%Y-%m-%d"),
+                ",".join(str(v) for v in versions),
+            ])
+            etag = hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+            if request.if_none_match.contains(etag):
+                response = current_app.response_class(status=304)
+                response.set_etag(etag)
+                return response
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                response.set_etag(etag)
+                response.headers["Cache-Control"] = "private, no-cache"
+            return response
+
+        return wrapper
+    return decorator